@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+"""
+Concurrent processing of courses using asyncio.
+
+The webdriver (and the requests library) are blocking, therefore each
+course is processed in a worker thread with a webdriver leased from a
+driver pool (see driverpool.DriverPool). The event loop limits the
+amount of courses in flight and collects the results. All callbacks
+(on_result) are executed in the thread running the event loop, i.e.,
+writing logfiles or inserting data into the database does not need
+any further locking.
+
+Politeness is not handled here but by the rate limiter shared by the
+crawler instances (see ratelimit.HostRateLimiter).
+"""
+
+class AsyncCrawler:
+    """Run a function for a list of items with at most N items in flight.
+
+    For each item, a slot (crawler instance, webdriver) is leased from
+    the driver pool and passed to the work function together with the
+    item: work(slot, item).
+    """
+    def __init__(self, driver_pool, max_in_flight = 4):
+        self.driver_pool = driver_pool
+        self.max_in_flight = max_in_flight
+        self.executor = ThreadPoolExecutor(max_workers = max_in_flight)
+
+    def call_work(self, work, item):
+        with self.driver_pool.lease() as slot:
+            return work(slot, item)
+
+    async def process(self, items, work, on_result):
+        loop = asyncio.get_running_loop()
+        semaphore = asyncio.Semaphore(self.max_in_flight)
+
+        async def process_item(item):
+            async with semaphore:
+                try:
+                    result = await loop.run_in_executor(self.executor, self.call_work, work, item)
+                    error = None
+                except Exception as e:
+                    result = None
+                    error = e
+
+            on_result(item, result, error)
+
+        await asyncio.gather(*(process_item(item) for item in items))
+
+    def run(self, items, work, on_result):
+        """Process all items and block until all of them are finished.
+
+        on_result(item, result, error) is called for every item as soon
+        as it is finished. error is the raised exception (or None).
+        """
+        asyncio.run(self.process(items, work, on_result))
+
+    def close(self):
+        '''stop the worker threads (the driver pool is closed by its owner)'''
+        self.executor.shutdown()
@@ -9,11 +9,13 @@ import time
 from dataclasses import dataclass
 import pandas as pd
 
+from config import *
+
 # TODO: adapt code for other browsers
 service = SafariService('/usr/bin/safaridriver')
 driver = webdriver.Safari(service=service)
 
-driver.get("https://tiss.tuwien.ac.at/curriculum/public/curriculum.xhtml?dswid=7871&dsrid=370&key=67853")
+driver.get(tiss_url + "/curriculum/public/curriculum.xhtml?dswid=7871&dsrid=370&key=67853")
 time.sleep(5)  # wait 5 seconds to let the page load
 driver.implicitly_wait(0.5)
 # Language of the page is German by default, switch it to English
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+
+"""
+Content-addressed store for downloaded course materials (deduplication).
+
+The same slides and PDFs are published again every semester (and in every
+academic program listing the course). Instead of keeping a full copy in
+every downloads/<program>/<course>/<semester>/ folder, each file is hashed
+(SHA-256) once and stored as a blob:
+
+downloads
+├── blobs
+│   ├── manifest.jsonl	(one record per file in the tree)
+│   └── 3f
+│       └── 3fa4...	(content of the file, named after its hash)
+└── academic_program_name - studycode
+    └── course_number course_title
+        └── semester
+            └── file name	(hard link to the blob)
+
+The files in the tree are hard links to their blob, i.e., every content is
+only stored once on disk (if hard links are not possible, e.g., on another
+file system, the file is copied instead). The manifest records (course,
+semester, file name, hash, size) for every file. A download whose name and
+size (Content-Disposition, Content-Length) match an already stored file of
+the same course (e.g., the slides of an earlier semester) is not transferred
+again but linked from the store (see lookup(...)). Files of other courses
+are only deduplicated after the download, by their hash: a name like
+Folien.pdf with the same size says nothing about the content of another
+course.
+"""
+
+hash_chunk_size = 1024 * 1024
+
+
+def hash_file(file_path):
+    '''SHA-256 of the content of a file (hex)'''
+    sha256 = hashlib.sha256()
+
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(hash_chunk_size), b""):
+            sha256.update(chunk)
+
+    return sha256.hexdigest()
+
+
+class BlobStore:
+    """Thread-safe content-addressed file store with a manifest.
+
+    store_dir:		folder of the blobs (should be on the same file system as the downloads)
+    manifest_path:	manifest file (JSON lines, default: <store_dir>/manifest.jsonl)
+    """
+    def __init__(self, store_dir, manifest_path = ""):
+        self.store_dir = store_dir
+        self.manifest_path = manifest_path if manifest_path else os.path.join(store_dir, "manifest.jsonl")
+        self.lock = threading.Lock()
+
+        self.blob_sizes = {}			# {hash: size}
+        self.name_size_index = {}		# {(course, file name, size): hash}
+        self.amt_deduplicated = 0		# amount of files linked to an already stored blob
+        self.bytes_saved = 0			# bytes not stored (or not transferred) again
+
+        os.makedirs(store_dir, exist_ok = True)
+        self.load_manifest()
+
+        self.f_manifest = open(self.manifest_path, "a", encoding = "utf-8")
+
+    def load_manifest(self):
+        '''build the indices from the records of an existing manifest'''
+        if not os.path.isfile(self.manifest_path):
+            return
+
+        with open(self.manifest_path, encoding = "utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+
+                self.blob_sizes[record["hash"]] = record["size"]
+                self.name_size_index[(record["course"], record["file"], record["size"])] = record["hash"]
+
+    def blob_path(self, file_hash):
+        return os.path.join(self.store_dir, file_hash[:2], file_hash)
+
+    def has_blob(self, file_hash):
+        return file_hash in self.blob_sizes and os.path.isfile(self.blob_path(file_hash))
+
+    def lookup(self, course, file_name, size):
+        """Hash of an already stored file of course with the same name and size.
+
+        Returns None if no such file is known (or its blob is missing).
+        """
+        with self.lock:
+            file_hash = self.name_size_index.get((course, file_name, size))
+
+        if file_hash is None or not self.has_blob(file_hash):
+            return None
+
+        return file_hash
+
+    def link_blob(self, file_hash, file_path):
+        '''replace file_path with a hard link to the blob (copy if linking is not possible)'''
+        link_path = file_path + ".link"
+
+        try:
+            os.link(self.blob_path(file_hash), link_path)
+        except OSError:
+            shutil.copyfile(self.blob_path(file_hash), link_path)
+
+        os.replace(link_path, file_path)
+
+    def add_file(self, file_path, course, semester):
+        """Store a downloaded file and replace it with a link to its blob.
+
+        If the content is already stored, the file is replaced by a link to
+        the existing blob (deduplicated). Returns the hash of the file.
+        """
+        file_hash = hash_file(file_path)
+        size = os.path.getsize(file_path)
+
+        with self.lock:
+            if self.has_blob(file_hash):
+                self.link_blob(file_hash, file_path)
+                self.amt_deduplicated += 1
+                self.bytes_saved += size
+            else:
+                blob_path = self.blob_path(file_hash)
+                os.makedirs(os.path.dirname(blob_path), exist_ok = True)
+
+                try:
+                    os.link(file_path, blob_path + ".tmp")
+                except OSError:
+                    shutil.copyfile(file_path, blob_path + ".tmp")
+
+                os.replace(blob_path + ".tmp", blob_path)
+
+            self.record(course, semester, file_path, file_hash, size)
+
+        return file_hash
+
+    def add_linked(self, file_hash, file_path, course, semester):
+        '''link an already stored blob to file_path (download skipped)'''
+        with self.lock:
+            size = self.blob_sizes[file_hash]
+            self.link_blob(file_hash, file_path)
+            self.amt_deduplicated += 1
+            self.bytes_saved += size
+
+            self.record(course, semester, file_path, file_hash, size)
+
+    def record(self, course, semester, file_path, file_hash, size):
+        '''write a manifest record and update the indices (call with self.lock held)'''
+        file_name = os.path.basename(file_path)
+
+        self.blob_sizes[file_hash] = size
+        self.name_size_index[(course, file_name, size)] = file_hash
+
+        self.f_manifest.write(json.dumps({
+            "time": time.strftime("%Y-%m-%d_%H:%M:%S"),
+            "course": course,
+            "semester": semester,
+            "file": file_name,
+            "path": file_path,
+            "hash": file_hash,
+            "size": size,
+        }, ensure_ascii = False) + "\n")
+        self.f_manifest.flush()
+
+    def close(self):
+        self.f_manifest.close()
@@ -8,6 +8,15 @@ import time
 
 from config import *
 import crawl
+import coursepipeline
+import crawldelay
+import httpfetch
+import pageclass
+import probe
+import probeplan
+import probestate
+import pylogs
+import ratelimit
 import sqlhandler
 
 # https://tiss.tuwien.ac.at/course/courseDetails.xhtml?courseNr=017A02|Universitätslehrgang
@@ -111,10 +120,10 @@ def check_course_processed(process_course_number):
 	return course_already_in_DB, found_in_table
 
 def write_to_file(filepointer, msg):
+	# no fsync per line: the probe state (checkpoints) is the record to resume from
 	filepointer.write(msg + "\n")
 
 	filepointer.flush()
-	os.fsync(filepointer)
 
 # create a list (of dicts) containing the processed courses
 processed_courses_list = fetch_processed_courses()
@@ -122,55 +131,224 @@ processed_courses_list = fetch_processed_courses()
 # variable declaration / (web)driver initation
 crawl_delay = 10
 
-# check course numbers (brute force) in the range between these two variables
-check_course_start = 511079
+# check course numbers (brute force) in the range between these two variables. Numbers
+# which have already been probed are skipped (see probeStateFile), i.e., after a restart
+# the probing continues where it stopped without changing check_course_start. The results
+# of earlier runs are taken over with: python3 probestate.py import-logs logs/probe_state.npz
+# logs/courses_to_process.txt logs/courses_invalid.txt
+check_course_start = 0
 check_course_end = 1000000
 
-driver_instance = crawl.crawler(False, 800, 600, crawl_delay)
-driver = driver_instance.init_driver()
+# adapt the crawl delay to the observed latency and errors of TISS (crawl_delay is
+# the starting value), see crawldelay.py
+adaptiveCrawlDelay = True
+minCrawlDelay = 2
+maxCrawlDelay = 480
+
+# True -> probe the course numbers via plain HTTP (see probe.py): probeConcurrency
+# probes are in flight at once, all together at most probeRequestsPerSecond requests
+# per second (slowed down on errors if adaptiveCrawlDelay is True, but never faster
+# than one request per minCrawlDelay). The default budget is the same as the one of
+# the browser (one request per crawl_delay), the concurrency only hides the latency.
+# The results are appended to probeResultsFile.
+# False -> check one course after another in the browser (crawl_delay in between).
+useHttpProbing = True
+probeConcurrency = 2
+probeRequestsPerSecond = 1 / crawl_delay
+
+# True (only with useHttpProbing) -> the page of a course found by probing is extracted right
+# away (without fetching it again) and inserted into the table pipelineTableName, i.e., no
+# second run of tiss_crawler.py is needed (see coursepipeline.py). Only courses which fail
+# in the pipeline are written to courses_to_process.txt. The extraction fetches the other
+# semesters and languages within the same budget as the probes (probeRequestsPerSecond).
+# pipelineWriteInsertToFile: write the INSERT statements into a file instead of the DB
+# (see writeInsertToFile, tiss_crawler.py).
+usePipeline = True
+pipelineTableName = "NoCurricula"
+pipelineWriteInsertToFile = False
+pipelinePoolSize = 4
+
+# split the range into probeShardCount shards and only probe shard probeShardIndex, e.g.,
+# four workers: python3 bruteforce.py 0 4, python3 bruteforce.py 1 4, ...
+probeShardIndex = 0
+probeShardCount = 1
+if len(sys.argv) == 3:
+	probeShardIndex = int(sys.argv[1])
+	probeShardCount = int(sys.argv[2])
+
+check_course_start, check_course_end = probe.shard_range(check_course_start, check_course_end,
+	probeShardIndex, probeShardCount)
+probeResultsFile = "logs/probe_results_" + str(probeShardIndex) + "of" + str(probeShardCount) + ".jsonl"
+
+# state of the probed numbers (bitmaps, see probestate.py) of this worker, saved every
+# probeCheckpointInterval seconds. The merged state of all workers (python3 probestate.py
+# merge logs/probe_state.npz logs/probe_state_*.npz) is loaded too, if it exists.
+probeStateFile = "logs/probe_state_" + str(probeShardIndex) + "of" + str(probeShardCount) + ".npz"
+probeMergedStateFile = "logs/probe_state.npz"
+probeCheckpointInterval = 60
+
+probe_state = probestate.ProbeState(probeStateFile, probeCheckpointInterval)
+if os.path.isfile(probeMergedStateFile):
+	probe_state.merge_file(probeMergedStateFile)
+print ( "probe state: " + str(probe_state.stats()) )
+
+# True -> probe the prefixes (first three digits) with the highest density of known courses
+# (database, hits of the probe state) first instead of the range from start to end. A share
+# of probeExploration probes goes to sparse prefixes (see probeplan.py).
+usePlanner = True
+probeExploration = 0.1
+
+if usePlanner == True:
+	known_course_numbers = [course_number for tables in processed_courses_list
+		for course_numbers in tables.values() for course_number in course_numbers]
+	probe_planner = probeplan.ProbePlanner(probeplan.known_prefix_counts(known_course_numbers),
+		"K", probe_state, probeExploration)
+	course_candidates = probe_planner.plan(check_course_start, check_course_end)
+	print ( "planner: " + str(probe_planner.state_summary()) )
+else:
+	course_candidates = probe.course_number_candidates(check_course_start, check_course_end)
+
+print ( "checking range: " + str(check_course_start) + " - " + str(check_course_end) +
+	" (shard " + str(probeShardIndex) + " of " + str(probeShardCount) + ")" )
 
 # open (log)files
 f_courses_to_process = open("logs/courses_to_process.txt", "a")
 f_invalid_courses = open("logs/courses_invalid.txt", "a")
 f_courses_in_DB = open("logs/courses_already_in_DB.txt", "a")
 
-for _ in range(check_course_start, check_course_end):
-	# generate course number (zerofill) - 000000 -> 999999
-	#check_course_number = str(_).zfill(6)
 
-	# generate course number (zerofill) - 000A00 -> 999A99
-	_zfill = list(str(_).zfill(6) )
-
-	# skip duplicates where [3] = 1, 2, ..., 9´ (don't process redundant duplicates)
-	if (int(_zfill[3]) > 0):
-		continue
+def courses_to_check(course_numbers):
+	"""
+	filter the course numbers to check: numbers which have already been probed
+	(probe state) are skipped, courses which are already in the database are
+	written to f_courses_in_DB and skipped
+	"""
+	for check_course_number in course_numbers:
+		if probe_state.is_probed(check_course_number):
+			continue
 
-	_zfill[3] = 'K'
-	check_course_number = ''.join(_zfill)
+		check_course_db = check_course_number[:3] + "." + check_course_number[3:]
+		course_already_in_DB, found_in_table = check_course_processed(check_course_db)
 
-	print ( "checking: " + str(check_course_number) )
+		if course_already_in_DB:
+			print( str(check_course_db) + "	already in DB" )
+			write_to_file(f_courses_in_DB, str(check_course_db) + " / "+ str(found_in_table))
+		else:
+			yield check_course_number
 
-	# check if the course has already been processed
-	check_course_db = check_course_number[:3] + "." + check_course_number[3:]
-	course_already_in_DB, found_in_table = check_course_processed(check_course_db)
 
-	if course_already_in_DB:
-		print( "	already in DB" )
-		write_to_file(f_courses_in_DB, str(check_course_db) + " / "+ str(found_in_table))
-	else:
-		check_url = "https://tiss.tuwien.ac.at/course/courseDetails.xhtml?courseNr=" + check_course_number
-		course_exists = driver_instance.check_course_exists(driver, check_url)
+def write_probe_result(record):
+	"""
+	write the result of a probe to the (log)files (called for every probe)
+	"""
+	print ( "checked: " + record["course"] + " -> " + record["verdict"] )
+
+	# with the pipeline, the course is queued for tiss_crawler.py only if it fails there
+	if record["verdict"] == probe.PROBE_EXISTS and course_pipeline is None:
+		write_to_file(f_courses_to_process, record["url"] + "|NoCurricula")
+	elif record["verdict"] == probe.PROBE_MISSING:
+		write_to_file(f_invalid_courses, record["url"])
+
+
+if useHttpProbing == True:
+	rate_limiter = ratelimit.HostRateLimiter(probeRequestsPerSecond)
+	delay_controller = None
+	if adaptiveCrawlDelay == True:
+		delay_controller = crawldelay.AdaptiveCrawlDelay(1 / probeRequestsPerSecond,
+			min_delay = max(minCrawlDelay, 1 / probeRequestsPerSecond), max_delay = maxCrawlDelay)
+
+	http_fetcher = httpfetch.HttpFetcher(crawl.crawler(True, 800, 600, crawl_delay).user_agent,
+		pool_size = probeConcurrency)
+	prober = probe.Prober(http_fetcher, rate_limiter, probeConcurrency, delay_controller)
+	probe_results = probe.ProbeResults(probeResultsFile, read_existing = False)
+
+	course_pipeline = None
+	if usePipeline == True:
+		pipeline_instance = crawl.crawler(True, 800, 600, crawl_delay)
+		pipeline_driver = pipeline_instance.init_driver()
+		pipeline_instance.enable_http_backend(pipelinePoolSize)
+		# probes and extraction draw from the same budget (and the same adaptive delay)
+		pipeline_instance.rate_limiter = rate_limiter
+		pipeline_instance.delay_controller = delay_controller
+
+		pipeline_time = pylogs.get_time()
+		f_pipeline_log = pylogs.open_logfile(logging_folder + "pipeline_log_" + pipeline_time)
+		f_pipeline_failed_downloads = pylogs.open_logfile(logging_folder + "pipeline_failed_downloads_" + pipeline_time)
+		f_pipeline_insertions = None
+		if pipelineWriteInsertToFile == True:
+			f_pipeline_insertions = pylogs.open_logfile(logging_folder + "insertion_statements" + pipeline_time)
+
+		course_pipeline = coursepipeline.CoursePipeline(
+			pipeline_instance,
+			pipeline_driver,
+			pipelineTableName,
+			f_pipeline_log,
+			f_pipeline_failed_downloads,
+			f_pipeline_insertions,
+			lambda url: write_to_file(f_courses_to_process, url + "|NoCurricula")
+		)
 
-		if course_exists:
+	time_start = time.time()
+	probe_counts = prober.run(
+		courses_to_check(course_candidates),
+		probe_results,
+		write_probe_result,
+		probe_state,
+		course_pipeline.submit_probe if course_pipeline is not None else None
+	)
+
+	print ( "probes: " + str(probe_counts) + " | time: " + str(round(time.time() - time_start, 2)) + "s" )
+	if usePlanner == True:
+		print ( "planner: " + str(probe_planner.state_summary()) )
+
+	if course_pipeline is not None:
+		course_pipeline.close()
+		print ( "pipeline: " + str(course_pipeline.stats()) )
+
+		pipeline_instance.close_driver(pipeline_driver, f_pipeline_log)
+		pylogs.close_logfile(f_pipeline_log)
+		pylogs.close_logfile(f_pipeline_failed_downloads)
+		if f_pipeline_insertions is not None:
+			pylogs.close_logfile(f_pipeline_insertions)
+
+	prober.close()
+	probe_results.close()
+	http_fetcher.close()
+else:
+	driver_instance = crawl.crawler(False, 800, 600, crawl_delay)
+	driver = driver_instance.init_driver()
+
+	if adaptiveCrawlDelay == True:
+		driver_instance.enable_adaptive_delay(minCrawlDelay, maxCrawlDelay)
+
+	for check_course_number in courses_to_check(course_candidates):
+		print ( "checking: " + str(check_course_number) )
+
+		check_url = tiss_url + "/course/courseDetails.xhtml?courseNr=" + check_course_number
+		page_verdict = driver_instance.classify_course_page(driver, check_url)
+
+		if driver_instance.delay_controller is not None:
+			print( "	crawl delay: " + str(driver_instance.delay_controller.state()) )
+
+		if page_verdict == pageclass.PageVerdict.EXISTS:
 			print( "	exists (not in DB)" )
 			write_to_file(f_courses_to_process, check_url + "|NoCurricula")
-		else:
-			print( "	does not exist" )
+		elif pageclass.course_missing(page_verdict):
+			print( "	does not exist (" + page_verdict.value + ")" )
 			write_to_file(f_invalid_courses, check_url)
+		else:
+			# no final verdict (JS error, login page) -> probe again in the next run
+			print( "	" + page_verdict.value + " -> skip" )
+			continue
+
+		probe_state.record(check_course_number, page_verdict == pageclass.PageVerdict.EXISTS)
+		probe_state.checkpoint_if_due()
+
+	probe_state.save()
 
-# close the (web)driver
-driver.close()	# close the current browser window
-driver.quit()	# calls driver.dispose which closes all the browser windows and ends the webdriver session properly
+	# close the (web)driver
+	driver.close()	# close the current browser window
+	driver.quit()	# calls driver.dispose which closes all the browser windows and ends the webdriver session properly
 
 # close filehandler
 f_courses_to_process.close()
@@ -17,3 +17,7 @@ root_dir = '.../tiss-crawler/'
 download_folder = root_dir + 'downloads/'
 logging_folder = 'logs/'
 study_prgms_folder = 'study_prgms/'
+
+# base URL of TISS. Set to the address of the local stand-in server
+# (see stubserver.py), e.g., 'http://localhost:8080', to crawl without network.
+tiss_url = 'https://tiss.tuwien.ac.at'
@@ -0,0 +1,566 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+import re
+import warnings
+
+import numpy as np
+
+"""
+Parsing of fetched TISS pages (no webdriver involved).
+
+The functions in this file take the source (HTML) of a page and return
+the extracted information. They are used by crawl.crawler during crawling
+as well as by replay.py, which parses the archived page sources again
+(e.g., after a parser has been changed) without fetching any page.
+"""
+
+# options of the semester select element (see parse_semester_options(...))
+re_semester_option = re.compile(r'<option[^>]*value="(\d{4}[SW])"')
+# the selected option (the semester the page is displayed for), attributes in any order
+re_selected_semester_option = re.compile(r'<option(?=[^>]*\bselected\b)[^>]*value="(\d{4}[SW])"')
+
+# links to courses, e.g., href="/course/courseDetails.xhtml?courseNr=251169&amp;semester=2022S"
+re_course_link = re.compile(r'href="[^"]*courseDetails\.xhtml\?[^"]*?courseNr=([0-9A-Za-z]+)')
+
+# language dict so that en and de versions have the same index in
+# the returned dict. This is essential for insertion into the database
+index_dict_en = {
+    "Properties": "Merkmale",
+    "Learning outcomes": "Lernergebnisse",
+    "Additional information": "Weitere Informationen",
+    "Subject of course": "Inhalt der Lehrveranstaltung",
+    "Teaching methods": "Methoden",
+    "Mode of examination": "Prüfungsmodus",
+    "Examination modalities": "Leistungsnachweis",
+    "Course registration": "LVA-Anmeldung",
+    "Literature": "Literatur",
+    "Previous knowledge": "Vorkenntnisse",
+    "Preceding courses": "Vorausgehende Lehrveranstaltungen",
+    "Lecturers": "Vortragende Personen",
+    "Language": "Sprache",
+    "Institute": "Institut",
+    "Group dates": "Gruppentermine",
+    "Exams": "Prüfungen",
+    "Group Registration": "Gruppen-Anmeldung",
+    "Course dates": "LVA Termine",
+    "Curricula": "Curricula",
+    "Aim of course": "Ziele der Lehrveranstaltung"
+}
+
+
+def parse_course_number(course_raw_info):
+    """Extract the course number from the content of a course page.
+
+    Returns the course number (e.g., '104.590') and the remaining content
+    after the course number. The remaining content is also what is written
+    into the archived page sources (see crawler.extract_course_info(...)).
+    """
+    needle1 = '<span class="light">'
+    pos1 = course_raw_info.find(needle1)
+    needle2 = "</span>"
+    pos2 = course_raw_info.find(needle2)
+    course_number = course_raw_info[pos1 + len(needle1):pos2].strip()
+
+    return course_number, course_raw_info[pos2 + len(needle2):]
+
+
+def parse_course_title(course_raw_info):
+    '''course title (course_raw_info is the content after the course number)'''
+    needle3 = "<"
+    pos3 = course_raw_info.find(needle3)
+
+    return course_raw_info[:pos3].strip()
+
+
+def parse_language(page_source):
+    """Determine the language (de/en) of a page from its source.
+
+    The page contains the link to switch to the other language, i.e., if
+    the link to english is present, the page is displayed in german (and
+    vice versa). Returns "" if neither link is found.
+    """
+    # different needles for different pages
+    language_en_find = page_source.find("language_en")
+    language_en_find2 = page_source.find('<a href="/?locale=en">English</a>')
+
+    language_de_find = page_source.find("language_de")
+    language_de_find2 = page_source.find('<a href="/?locale=de">Deutsch</a>')
+
+    if (language_en_find != -1 or language_en_find2 != -1):
+        return "de"
+    elif (language_de_find != -1 or language_de_find2 != -1):
+        return "en"
+
+    return ""
+
+
+def parse_semester_options(page_source):
+    """Extract the semesters of the semester select element of a course page.
+
+    The select element (semesterForm:j_id_25, semesterForm:j_id_26, etc. and
+    j_id_2d:j_id_2l on pages of unavailable semesters) lists all semesters
+    of the course, e.g., <option value="2022W">2022W</option>. Returns the
+    semesters in the order of the select element, e.g., ['2023S', '2022W', ...].
+    """
+    return list(dict.fromkeys(re_semester_option.findall(page_source)))
+
+
+def parse_selected_semester(page_source):
+    '''semester the course page is displayed for (selected option, "" if none is selected)'''
+    match = re_selected_semester_option.search(page_source)
+
+    return match.group(1) if match is not None else ""
+
+
+def parse_course_details(course_raw_info, language, course_number, academic_program_name):
+    """Extract the information of a course page.
+
+    course_raw_info is the content of the page after the course number (see
+    parse_course_number(...)) and language the language of the page (de/en).
+    course_number and academic_program_name are only used for the list of
+    unknown fields.
+
+    Returns a dict with the course title, the quickinfo (semester, type,
+    sws, ECTS, add_info) and the sections of the page (indices are always
+    the german headers) as well as a list of unknown sections.
+    """
+    extract_dict = {}
+    unknown_fields = []
+
+    course_title = parse_course_title(course_raw_info)
+    extract_dict["course title"] = course_title
+
+    # quickinfo
+    needle4 = '<div id="subHeader" class="clearfix">'
+    pos4 = course_raw_info.find(needle4)
+    needle5 = "</div>"
+    pos5 = course_raw_info.find(needle5)
+    quickinfo = course_raw_info[pos4 + len(needle4):pos5].strip()
+    #print("quickinfo: |" + quickinfo + "|")
+
+    quickinfo_split = quickinfo.split(',')
+    extract_dict["semester"] = quickinfo_split[0].strip()
+    extract_dict["type"] = quickinfo_split[1].strip()
+    extract_dict["sws"] = quickinfo_split[2].strip()
+    extract_dict["ECTS"] = quickinfo_split[3].strip()
+    # quickinfo examples:
+    # 2014W, PR, 3.0h, 3.0EC, to be held in blocked form
+    # 2015W, UE, 1.0h, 2.0EC
+    # the last entry is optional
+    if len(quickinfo_split) > 4:
+        extract_dict["add_info"] = quickinfo_split[4].strip()
+    else:
+        extract_dict["add_info"]  = ""
+
+    # certain sections may be present multiple times in the page. Therefore, count
+    # how many times they are present and add the integer count to the dict index.
+    count_entry_dict = {header_titletext: 0 for header_titletext in numbered_sections}
+
+    # "<h2>-extraction" - each information is separated by an h2 element
+    for header_titletext, extract_info in iter_sections(course_raw_info):
+        # html cleanup
+        extract_info = extract_info.replace(' class="encode"', '')
+        extract_info = extract_info.replace(' class="bulletList"', '')
+
+        # en and de versions have the same index in the returned dict (see index_dict_en)
+        if language == "en":
+            if header_titletext in index_dict_en:
+                header_titletext = index_dict_en[header_titletext]
+            else:
+                warnings.warn("Error key is missing: " + header_titletext)
+
+        if header_titletext in section_parsers:
+            parse_section = section_parsers[header_titletext]
+
+            # None -> known section which is not extracted (yet)
+            if parse_section is None:
+                continue
+
+            if header_titletext in numbered_sections:
+                past_entries = count_entry_dict[header_titletext]
+                extract_dict[header_titletext + str(past_entries)] = parse_section(extract_info)
+                count_entry_dict[header_titletext] += 1
+            else:
+                extract_dict[header_titletext] = parse_section(extract_info)
+
+        elif extract_info != "":
+            warnings.warn("Error processing course description (unkown field) " + header_titletext)
+            unknown_fields.append(header_titletext + "|" + course_number + "|" +
+                language + "|" + academic_program_name + "|" + course_title
+            )
+
+    return extract_dict, unknown_fields
+
+
+def course_not_available(course_raw_info):
+    '''True, if the course is not available in the semester of the page ("the course is not public in this semester")'''
+    return (course_raw_info.find("Bitte wählen Sie ein anderes Semester aus") != -1 or
+        course_raw_info.find("Please select an other semester") != -1 or
+        course_raw_info.find("The Course is not public in semester") != -1
+    )
+
+
+def course_has_materials(course_raw_info):
+    '''True, if the page links the course materials (documents.xhtml)'''
+    return (course_raw_info.find("Zu den Lehrunterlagen") != -1 or
+        course_raw_info.find("Go to Course Materials") != -1
+    )
+
+
+def parse_course_record(course_raw_info, language, academic_program_name):
+    """Extract the record of a course page (one semester in one language).
+
+    course_raw_info is the content of the page (contentInner). Returns the
+    record (page_fetch_lang, course number and the information of
+    parse_course_details(...)) and the list of unknown sections. This is
+    the unit of work of the parser pool (see parsepool.py).
+    """
+    course_number, course_raw_info_rest = parse_course_number(course_raw_info)
+
+    extract_dict = {}
+    extract_dict["page_fetch_lang"] = language
+    extract_dict["course number"] = course_number
+
+    course_details, unknown_fields = parse_course_details(
+        course_raw_info_rest, language, course_number, academic_program_name
+    )
+    extract_dict.update(course_details)
+
+    return extract_dict, unknown_fields
+
+
+def parse_hrefs(haystack, superior_title, url_prefix):
+    """Extract the links of a list of academic programs.
+
+    <a href="/curriculum/public/curriculum.xhtml?key=41934">Masterstudium Architektur </a>
+    ->
+    [https://tiss.tuwien.ac.at/curriculum/public/curriculum.xhtml?key=41934|superior_title|Masterstudium Architektur]
+    """
+    divider1 = '<a href="'
+    divider2 = '">'
+    divider3 = '</a>'
+
+    return_data = []
+
+    while haystack.find(divider1) != -1:
+        position1 = haystack.find(divider1)
+
+        haystack = haystack[position1 + len(divider1):]
+
+        position2 = haystack.find(divider2)
+        position3 = haystack.find(divider3)
+
+        string_part1 = url_prefix + haystack[:position2]
+        string_part2 = haystack[position2 + len(divider2):position3].strip()
+
+        return_data.append(string_part1 + "|" + superior_title + "|" + string_part2)
+
+        haystack = haystack[position3 + len(divider3):]
+
+    return return_data
+
+
+def parse_academic_programs(fetched_page, url_prefix):
+    """Extract the links to the academic programs of studyCodes.xhtml.
+
+    The programs are grouped by h2 headers (e.g., Bachelorstudium), see
+    parse_hrefs(...) for the returned entries.
+    """
+    divider1 = "<h2>"
+    divider2 = "</h2>"
+
+    position1 = fetched_page.find(divider1)
+
+    fetched_page = fetched_page[position1 + len(divider1):]
+
+    return_collected_data = []
+
+    while fetched_page.find(divider1) != -1:
+        position1 = fetched_page.find(divider1)
+        position2 = fetched_page.find(divider2)
+
+        superior_title = fetched_page[:position2]
+
+        haystack = fetched_page[:fetched_page.find(divider1)]
+        extracted_links = parse_hrefs(haystack, superior_title, url_prefix)
+        return_collected_data.extend(extracted_links)
+
+        fetched_page = fetched_page[position1 + len(divider1):]
+
+    # process rest of the string
+    fetched_page = fetched_page[:fetched_page.find('<div id="footer">')]
+    position2 = fetched_page.find(divider2)
+    superior_title = fetched_page[:position2]
+    extracted_links = parse_hrefs(fetched_page, superior_title, url_prefix)
+    return_collected_data.extend(extracted_links)
+
+    return return_collected_data
+
+
+def parse_lecturers(extract_info):
+    '''extract the names of the lecturers (section "Vortragende Personen")'''
+    cutstr1 = '<span>'
+    cutstr2 = '</span>'
+
+    extract_lecturer = []
+
+    while extract_info.find(cutstr1) != -1:
+        cutpos1 = extract_info.find(cutstr1)
+        cutpos2 = extract_info.find(cutstr2)
+
+        if cutpos2 > cutpos1:
+            extract_lecturer.append(extract_info[cutpos1 + len(cutstr1):cutpos2])
+
+        extract_info = extract_info[cutpos2 + len(cutstr2):]
+
+    return extract_lecturer
+
+
+def parse_curricula(extract_info):
+    '''extract the study codes and semester/precondition/info of the section "Curricula"'''
+    curricula_return_list = []
+    needle = ''
+
+    if extract_info.find('semester=NEXT">') != -1:
+        needle = 'semester=NEXT">'
+    elif extract_info.find('semester=CURRENT">') != -1:
+        needle = 'semester=CURRENT">'
+    else:
+        warnings.warn("Error processing curricula")
+
+    if needle != "":
+        while extract_info.find(needle) != -1:
+            pos = extract_info.find(needle)
+            extract_info = extract_info[pos + len(needle):]
+
+            if extract_info.find(needle) != -1:
+                pos1 = extract_info.find(needle)
+                extract_info_temp = extract_info[:pos1]
+            else:
+                extract_info_temp = extract_info
+
+            sempreconinfo_list = []
+            study_code = extract_info_temp[:extract_info_temp.find('</a>')]
+            curricula_return_list.append(study_code)
+
+            # Semester,	Precon.	and Info
+            for j in range(0, 3):
+                needle2 = 'td role="gridcell">'
+                pos2 = extract_info_temp.find(needle2)
+                extract_info_temp = extract_info_temp[pos2 + len(needle2):]
+                pos3 = extract_info_temp.find('</td>')
+                extract_print = extract_info_temp[:pos3]
+                # check steop condition
+                steop_str1 = 'Studieneingangs- und Orientierungsphase'
+
+                if j == 2 and (extract_print.find(steop_str1) != -1 or extract_print.find("STEOP") != -1):
+                    extract_print = "STEOP"
+
+                #print(extract_print + "|", end = " ")
+                sempreconinfo_list.append(extract_print)
+
+            curricula_return_list.append(sempreconinfo_list)
+    return curricula_return_list
+
+
+def iter_sections(course_raw_info):
+    """Yield (header, html) of every <h2> section of a course page.
+
+    Each information of the page is separated by an h2 element, i.e., a
+    section reaches from its <h2> to the next <h2> (or the end of the page).
+    The page is scanned once from left to right (positions instead of
+    slicing the rest of the page after every section).
+    """
+    needle = "<h2>"
+    header_needle = "</h2>"
+
+    pos = course_raw_info.find(needle)
+
+    while pos != -1:
+        section_start = pos + len(needle)
+        pos = course_raw_info.find(needle, section_start)
+        section_end = pos if pos != -1 else len(course_raw_info)
+
+        header_pos = course_raw_info.find(header_needle, section_start, section_end)
+
+        if header_pos != -1:
+            yield (course_raw_info[section_start:header_pos],
+                course_raw_info[header_pos + len(header_needle):section_end])
+        else:
+            # no closing tag: same result as slicing the section with find(...) == -1
+            section = course_raw_info[section_start:section_end]
+            yield section[:-1], section[len(header_needle) - 1:]
+
+
+def parse_section_text(extract_info):
+    '''text sections (Merkmale, Methoden, Literatur, ...) without line breaks'''
+    return extract_info.replace('\n', '').strip()
+
+
+def parse_section_language(extract_info):
+    '''section "Sprache" (up to the hidden input of the form)'''
+    cut_str = '<input type="hidden" name='
+    cut_pos = extract_info.find(cut_str)
+
+    return extract_info[:cut_pos]
+
+
+def parse_section_institute(extract_info):
+    '''name of the institute (text of the first link of the section "Institut")'''
+    needle = '<li><a href='
+    pos1 = extract_info.find(needle)
+    extract_info = extract_info[pos1 + len(needle):]
+    extract_info = extract_info[extract_info.find('>') + 1:]
+
+    return extract_info[:extract_info.find('<')].replace('\n', '').strip()
+
+
+# {german header: parser of the section}, see parse_course_details(...). None: the
+# section is known but not extracted (yet). Sections which are neither in this
+# table nor empty are reported as unknown fields (e.g., "Gruppentermine").
+section_parsers = {
+    "Merkmale": parse_section_text,
+    "Ziele der Lehrveranstaltung": parse_section_text,
+    "Lernergebnisse": parse_section_text,
+    "Inhalt der Lehrveranstaltung": parse_section_text,
+    "Methoden": parse_section_text,
+    "Prüfungsmodus": parse_section_text,
+    "Leistungsnachweis": parse_section_text,
+    "LVA-Anmeldung": parse_section_text,
+    "Literatur": parse_section_text,
+    "Vorkenntnisse": parse_section_text,
+    "Vorausgehende Lehrveranstaltungen": parse_section_text,
+    "Vortragende Personen": parse_lecturers,
+    "Weitere Informationen": parse_section_text,
+    "Sprache": parse_section_language,
+    "Curricula": parse_curricula,
+    "Institut": parse_section_institute,
+    #TODO: extract these sections
+    "Prüfungen": None,
+    "Gruppen-Anmeldung": None,
+    "LVA Termine": None,
+}
+
+# sections which may be present multiple times (index: header + count, e.g., "Weitere Informationen0")
+numbered_sections = ("Weitere Informationen",)
+
+
+def parse_course_links(page_source):
+    """Extract the course numbers of all links to courses (courseDetails.xhtml).
+
+    Returns the (unique) course numbers in the order of the page, e.g.,
+    ['253G61', '251866', ...].
+    """
+    return list(dict.fromkeys(re_course_link.findall(page_source)))
+
+
+def find_all(haystack, needle, start = 0):
+    '''positions of all occurrences of needle in haystack[start:] (left to right, not overlapping)'''
+    positions = []
+    pos = haystack.find(needle, start)
+
+    while pos != -1:
+        positions.append(pos)
+        pos = haystack.find(needle, pos + len(needle))
+
+    return positions
+
+
+def parse_curriculum_page(raw_page_source):
+    """Extract the courses of a curriculum page (curriculumSemester.xhtml).
+
+    Returns the program code (e.g., 033261) and a dict with indices being
+    the semesters of the curriculum and the data the (unique) course numbers:
+
+    collected_courses
+    {
+        '1. Semester': ['253G61', ..., '251866'],
+        '2. Semester': ['264220', ..., '259606'],
+        .
+        .
+        .
+    }
+
+    The positions of all semester headers (<h2>...</h2>) and course links
+    (courseNr=...) are collected in one pass each (find_all(...), no slicing
+    of the rest of the page). The courses are assigned to the semesters by
+    their position (np.searchsorted on the sorted positions).
+    """
+    collected_courses = {}
+
+    # extract (academic program) course number, e.g., 033261, 033241 from the title.
+    # This information extraction is not (set) language dependent.
+    search_pos_prgm_code = "<title>Curriculum "
+    find_pos1 = raw_page_source.find(search_pos_prgm_code)
+    program_code = raw_page_source[
+        find_pos1 + len(search_pos_prgm_code):
+        (find_pos1 + len(search_pos_prgm_code) + 7)
+    ]
+
+    # extract the courses depending on the semester. Each semester is
+    # marked using a <h2>...</h2> (with the first h2 being skipped over).
+    semester_divider_start = "<h2>"
+    semester_divider_end = "</h2>"
+    extract_course_div = "courseNr="
+
+    # skip first <h2> (does not denote a semester)
+    page_start = raw_page_source.find(semester_divider_end) + len(semester_divider_end)
+    page_end = len(raw_page_source)
+
+    # positions of all markers (sorted)
+    starts = np.array(find_all(raw_page_source, semester_divider_start, page_start), dtype = np.int64)
+    ends = np.array(find_all(raw_page_source, semester_divider_end, page_start), dtype = np.int64)
+    courses = np.array(find_all(raw_page_source, extract_course_div, page_start), dtype = np.int64)
+
+    # semester blocks: header and the range (block_start, block_end) of its course links
+    headers = []
+    block_starts = []
+    block_ends = []
+
+    cursor = page_start
+    i_start = np.searchsorted(starts, cursor)
+    while i_start < len(starts):
+        sem_start_div = int(starts[i_start])
+
+        i_end = np.searchsorted(ends, cursor)
+        if i_end < len(ends):
+            sem_end_div = int(ends[i_end])
+            headers.append(raw_page_source[sem_start_div + len(semester_divider_start):sem_end_div])
+            cursor = sem_end_div + len(semester_divider_end)
+        else:
+            # no closing </h2> (same result as slicing with find(...) == -1)
+            headers.append(raw_page_source[sem_start_div + len(semester_divider_start):page_end - 1])
+            cursor = cursor - 1 + len(semester_divider_end)
+
+        # the block reaches to the next <h2> (to the last character of the page without one)
+        i_start = np.searchsorted(starts, cursor)
+        block_starts.append(cursor)
+        block_ends.append(int(starts[i_start]) if i_start < len(starts) else page_end - 1)
+
+    block_starts = np.array(block_starts, dtype = np.int64)
+    block_ends = np.array(block_ends, dtype = np.int64)
+
+    # course links of each block: the whole needle lies within the block
+    first_course = np.searchsorted(courses, block_starts)
+    last_course = np.searchsorted(courses, block_ends - len(extract_course_div), side = "right")
+
+    number_starts = (courses + len(extract_course_div)).tolist()
+
+    for header, block_end, i_first, i_last in zip(headers, block_ends.tolist(), first_course, last_course):
+        # create list for the semester in the dict 'collected_courses'
+        semester_courses = collected_courses.setdefault(header, [])
+
+        # a course number reaches to the next & (within its block)
+        for number_start in number_starts[i_first:i_last]:
+            number_end = raw_page_source.find("&", number_start, block_end)
+            if number_end == -1:
+                number_end = block_end - 1
+
+            semester_courses.append(raw_page_source[number_start:number_end])
+
+    # remove duplicates from the lists (in the dict)
+    for semester in collected_courses:
+        collected_courses[semester] = list(dict.fromkeys(collected_courses[semester]))
+
+    return program_code, collected_courses
@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+import os
+import queue
+import threading
+
+try:
+    from config import *
+except ModuleNotFoundError:
+    from src.config import *
+
+try:
+    import pylogs
+    import sqlhandler
+except ModuleNotFoundError:
+    from src import pylogs
+    from src import sqlhandler
+
+"""
+Streaming pipeline probe -> extract -> insert (see bruteforce.py).
+
+Without the pipeline, a course found by probing is written to
+logs/courses_to_process.txt and fetched again by a later run of
+tiss_crawler.py. With the pipeline, the page of the probe (which has
+already been fetched) is handed over to the extraction right away:
+
+probe (Prober.run, on_page)		page of an existing course
+  -> extract (one thread)		crawler.extract_course_info(..., prefetched_page = page)
+  -> insert (one thread)		INSERT into the table (or the insertion statements file)
+
+The stages are connected by bounded queues, i.e., probing, extraction and
+insertion overlap, and a slow stage holds the earlier ones back instead of
+piling up pages in memory. Courses which fail in extraction or insertion
+are passed to on_failed(url) (e.g., to queue them for tiss_crawler.py as
+before).
+"""
+
+
+class CoursePipeline:
+    """Extract and insert courses whose page has already been fetched.
+
+    crawler_instance, driver:	crawl.crawler and its webdriver (fallback for pages
+								which cannot be fetched via HTTP)
+    table_name:					table the courses are inserted into (created if missing)
+    pylogs_filepointer:			logfile of the extraction
+    f_failed_downloads:			logfile of failed downloads (see extract_course_info(...))
+    f_insertion_statements:		write the INSERT statements into this file instead of the DB
+    on_failed:					called with the URL of a course which could not be processed
+    queue_size:					maximum amount of courses waiting per stage
+    """
+    def __init__(
+        self,
+        crawler_instance,
+        driver,
+        table_name,
+        pylogs_filepointer,
+        f_failed_downloads,
+        f_insertion_statements = None,
+        on_failed = None,
+        academic_program_name = "NoCurricula",
+        acad_prgm_studycode = "NoCurricula",
+        queue_size = 64
+    ):
+        self.crawler_instance = crawler_instance
+        self.driver = driver
+        self.table_name = table_name
+        self.pylogs_filepointer = pylogs_filepointer
+        self.f_failed_downloads = f_failed_downloads
+        self.f_insertion_statements = f_insertion_statements
+        self.on_failed = on_failed
+        self.academic_program_name = academic_program_name
+        self.acad_prgm_studycode = acad_prgm_studycode
+
+        self.extract_queue = queue.Queue(maxsize = queue_size)
+        self.insert_queue = queue.Queue(maxsize = queue_size)
+        self.lock = threading.Lock()
+
+        self.amt_extracted = 0			# courses extracted from the handed over page
+        self.amt_inserted = 0			# courses inserted (or written to the statements file)
+        self.amt_failed = 0				# courses passed to on_failed(...)
+
+        # extract_course_info(...) archives the page sources in this folder
+        os.makedirs(root_dir + logging_folder + academic_program_name + ' - ' + acad_prgm_studycode, exist_ok = True)
+
+        self.sqlhandler = None
+        if f_insertion_statements is None:
+            self.sqlhandler = sqlhandler.SqlHandler()
+            self.sqlhandler.create_table(dbDatabase, table_name, sqlhandler.course_table_columns(), 0)
+
+        self.extract_thread = threading.Thread(target = self.extract_worker, daemon = True)
+        self.insert_thread = threading.Thread(target = self.insert_worker, daemon = True)
+        self.extract_thread.start()
+        self.insert_thread.start()
+
+    def submit(self, url, html):
+        '''hand over the fetched page of a course (blocks while the extraction queue is full)'''
+        self.extract_queue.put((url, html))
+
+    def submit_probe(self, record, html):
+        '''on_page callback for probe.Prober.run(...)'''
+        self.submit(record["url"], html)
+
+    def failed(self, url, reason):
+        pylogs.write_to_logfile(self.pylogs_filepointer, "pipeline: " + url + " failed (" + reason + ")")
+
+        with self.lock:
+            self.amt_failed += 1
+
+        if self.on_failed is not None:
+            self.on_failed(url)
+
+    def extract_worker(self):
+        while True:
+            item = self.extract_queue.get()
+            if item is None:
+                self.insert_queue.put(None)
+                return
+
+            url, html = item
+            try:
+                return_info_dict, amount_downloads, amt_of_semesters_processed, unknown_fields = \
+                    self.crawler_instance.extract_course_info(
+                        self.driver,
+                        url,
+                        self.academic_program_name,
+                        self.acad_prgm_studycode,
+                        self.pylogs_filepointer,
+                        self.f_failed_downloads,
+                        False,
+                        False,
+                        html
+                    )
+            except Exception as e:
+                self.failed(url, "extraction: " + str(e))
+                continue
+
+            with self.lock:
+                self.amt_extracted += 1
+
+            self.insert_queue.put((url, return_info_dict))
+
+    def insert_worker(self):
+        insertStatement, connectorAddStr = sqlhandler.course_insert_statement(self.table_name)
+
+        while True:
+            item = self.insert_queue.get()
+            if item is None:
+                return
+
+            url, return_info_dict = item
+            try:
+                for chosen_semester_dict in return_info_dict.values():
+                    insertData = sqlhandler.course_insert_data(chosen_semester_dict)
+
+                    if self.f_insertion_statements is None:
+                        self.sqlhandler.insert_into_table(dbDatabase, insertStatement + connectorAddStr, insertData, 0)
+                    else:
+                        pylogs.write_to_logfile(self.f_insertion_statements,
+                            insertStatement + " VALUES " + str(insertData) + ";\n", False, False)
+            except Exception as e:
+                self.failed(url, "insertion: " + str(e))
+                continue
+
+            with self.lock:
+                self.amt_inserted += 1
+
+    def stats(self):
+        with self.lock:
+            return {
+                "extracted": self.amt_extracted,
+                "inserted": self.amt_inserted,
+                "failed": self.amt_failed,
+                "queued": self.extract_queue.qsize() + self.insert_queue.qsize(),
+            }
+
+    def close(self):
+        '''process all handed over courses and stop the workers'''
+        self.extract_queue.put(None)
+        self.extract_thread.join()
+        self.insert_thread.join()
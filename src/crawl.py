@@ -1,8 +1,8 @@
 # -*- coding: utf-8 -*-
 #!/usr/bin/python3
 
+from concurrent.futures import ThreadPoolExecutor
 import os
-import random
 from selenium import webdriver
 from selenium.webdriver.support.ui import Select
 from selenium.webdriver.support.select import Select
@@ -10,6 +10,7 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver import Firefox, FirefoxOptions
 from selenium.common.exceptions import NoSuchElementException
 import sys
+import threading
 import time
 import warnings
 
@@ -18,11 +19,71 @@ try:
 except ModuleNotFoundError:
     from src.config import *
 
+try:
+    import pagecache
+except ModuleNotFoundError:
+    from src import pagecache
+
 try:
     import pylogs
 except ModuleNotFoundError:
     from src import pylogs
 
+try:
+    import readiness
+except ModuleNotFoundError:
+    from src import readiness
+
+try:
+    import courseparser
+except ModuleNotFoundError:
+    from src import courseparser
+
+try:
+    import crawldelay
+except ModuleNotFoundError:
+    from src import crawldelay
+
+try:
+    import downloads
+except ModuleNotFoundError:
+    from src import downloads
+
+try:
+    import blobstore
+except ModuleNotFoundError:
+    from src import blobstore
+
+try:
+    import dirwatch
+except ModuleNotFoundError:
+    from src import dirwatch
+
+try:
+    import driverpool
+except ModuleNotFoundError:
+    from src import driverpool
+
+try:
+    import httpfetch
+except ModuleNotFoundError:
+    from src import httpfetch
+
+try:
+    import pageclass
+except ModuleNotFoundError:
+    from src import pageclass
+
+try:
+    import pagesnapshot
+except ModuleNotFoundError:
+    from src import pagesnapshot
+
+try:
+    import parsepool
+except ModuleNotFoundError:
+    from src import parsepool
+
 class crawler:
     """This class contains all functions responsible for crawling webpages.
 
@@ -42,13 +103,26 @@ class crawler:
         self.headless = run_headless							# True ... run in headless mode
         self.non_headless_height = non_headless_height	# height of the browser window (if run_headless == False)
         self.non_headless_width = non_headless_width		# width of the browser window (if run_headless == False)
-        self.sleeptime_fetchpage = sleeptime				# used in the function fetch_page() to ensure JS has been loaded
+        self.sleeptime_fetchpage = sleeptime				# base waiting time of the retry loops (e.g., failed language switch)
+        self.page_timeout = 60									# max. time (in seconds) to wait for a page to become ready (see readiness.py)
         self.language = ""										# set language (de/en) used by extract_course_info(...)
         self.crawl_delay = sleeptime							# crawl delay in seconds
         self.last_crawltime = time.time()					# last time a page has been fetched (t_init = t_start)
+        self.crawl_delay_lock = threading.Lock()				# reserves the next fetch slot (concurrent fetches of one instance)
         self.download_path_root = download_folder			# dir for download folder (set in config.py)
         self.download_path_temp = "temp/"					# dir where files will be downloaded temporarily
         self.logged_in = False									# login-state, manipulated by self.tiss_login(...)
+        self.user_agent = "userAgent = Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36"
+        self.http_fetcher = None								# HTTP fetch backend, set by self.enable_http_backend(...)
+        self.rate_limiter = None								# shared rate limiter (ratelimit.HostRateLimiter), replaces crawl_delay if set
+        self.delay_controller = None							# adaptive crawl delay (crawldelay.AdaptiveCrawlDelay), set by self.enable_adaptive_delay(...)
+        self.page_cache = None									# on-disk page cache (pagecache.ResponseCache), set by self.enable_page_cache(...)
+        self.fetch_executor = None								# threads for concurrent HTTP fetches, set by self.enable_http_backend(...)
+        self.download_manager = None							# direct downloads (downloads.DownloadManager), set by self.enable_download_manager(...)
+        self.blob_store = None									# deduplication of downloads (blobstore.BlobStore), set by self.enable_blob_store(...)
+        self.download_stall_timeout = 60						# browser downloads without growth for this time (in seconds) are stalled
+        self.download_stall_retries = 2						# how often a stalled browser download is started again
+        self.parser_pool = None								# worker processes of the parsers (parsepool.ParserPool), set by self.enable_parser_pool(...)
 
     def init_driver(self):
         """Initiate the webdriver (as defined by the user).
@@ -87,7 +161,7 @@ class crawler:
         opts.set_preference("browser.helperApps.neverAsk.saveToDisk", ",".join(mime_types))
 
         # set the user agent
-        opts.set_preference("general.useragent.override", "userAgent = Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/90.0.4430.212 Safari/537.36")
+        opts.set_preference("general.useragent.override", self.user_agent)
 
         # option for running headless (opening a visible browser window or not)
         if self.headless == True:
@@ -98,7 +172,8 @@ class crawler:
             opts.add_argument("--width=" + str(self.non_headless_width))
             opts.add_argument("--height=" + str(self.non_headless_height))
 
-        driver = Firefox(options = opts)
+        # page_source is read once per loaded page (see pagesnapshot.py)
+        driver = pagesnapshot.SnapshotDriver(Firefox(options = opts))
 
         """
         Return the handle to keep the browser open over the span
@@ -107,6 +182,162 @@ class crawler:
         """
         return driver
 
+    def init_driver_pool(self, pool_size, page_load_timeout = 120):
+        """Initiate a pool of crawler instances, each with its own webdriver.
+
+        Every slot of the pool (driverpool.DriverPool) is a tuple (crawler
+        instance, webdriver). The instances are set up like this one (window
+        size, crawl delay, rate limiter, adaptive delay, page cache, HTTP
+        backend, download manager, blob store, parser pool) but keep their
+        own login state (logged_in) and language. Each webdriver downloads
+        into its own temp folder (temp/<slot number>/), in which every
+        download job gets its own staging folder (see
+        self.download_semester_browser(...)).
+
+        Note: without a shared rate limiter (self.rate_limiter), each
+        instance respects the crawl delay on its own.
+        """
+        def create_slot(slot_number):
+            slot_instance = crawler(self.headless, self.non_headless_width,
+                self.non_headless_height, self.crawl_delay)
+            slot_instance.sleeptime_fetchpage = self.sleeptime_fetchpage
+            slot_instance.rate_limiter = self.rate_limiter
+            slot_instance.delay_controller = self.delay_controller
+            slot_instance.page_cache = self.page_cache
+            slot_instance.blob_store = self.blob_store
+            slot_instance.parser_pool = self.parser_pool
+            slot_instance.download_stall_timeout = self.download_stall_timeout
+            slot_instance.download_stall_retries = self.download_stall_retries
+            slot_instance.download_path_temp = self.download_path_temp + str(slot_number) + "/"
+
+            if not os.path.isdir(slot_instance.download_path_root + slot_instance.download_path_temp):
+                os.makedirs(slot_instance.download_path_root + slot_instance.download_path_temp)
+
+            if self.http_fetcher is not None:
+                slot_instance.enable_http_backend()
+
+            # own session (login) per slot, limits and progress file are shared
+            if self.download_manager is not None:
+                slot_instance.download_manager = self.download_manager.with_fetcher(
+                    httpfetch.HttpFetcher(slot_instance.user_agent))
+
+            slot_driver = slot_instance.init_driver()
+            slot_driver.set_page_load_timeout(page_load_timeout)
+
+            return slot_instance, slot_driver
+
+        def close_slot(slot):
+            slot[1].quit()
+
+        return driverpool.DriverPool(create_slot, close_slot, pool_size)
+
+    def enable_adaptive_delay(self, min_delay = 1.0, max_delay = 480.0):
+        """Adapt the crawl delay to the observed latency and errors.
+
+        The controller (crawldelay.AdaptiveCrawlDelay) starts at the crawl
+        delay of this instance. Every request reports its latency and
+        whether it failed (see record_fetch(...)). The current delay is used
+        by respect_crawl_delay(...) and by the retry loops instead of the
+        fixed waiting times. If a rate limiter is set, its rate is adapted
+        to the delay.
+        """
+        self.delay_controller = crawldelay.AdaptiveCrawlDelay(self.crawl_delay,
+            min_delay = min_delay, max_delay = max_delay)
+
+        return self.delay_controller
+
+    def record_fetch(self, latency, error):
+        '''report the outcome of a request to the adaptive crawl delay (if enabled)'''
+        if self.delay_controller is not None:
+            new_delay = self.delay_controller.record(latency, error)
+
+            if self.rate_limiter is not None:
+                self.rate_limiter.set_rate(1 / new_delay)
+
+    def backoff_time(self, sleep_time):
+        """Time to wait before retrying a failed request.
+
+        With the adaptive crawl delay, this is the current delay of the
+        controller (which has been increased by the error). Otherwise the
+        given (fixed) sleep_time is returned.
+        """
+        if self.delay_controller is not None:
+            return self.delay_controller.delay
+
+        return sleep_time
+
+    def enable_page_cache(self, cache_dir, ttl = 7 * 24 * 3600):
+        """Keep fetched pages in an on-disk cache (pagecache.ResponseCache).
+
+        The cache is consulted by fetch_content(...) before any request is
+        made, i.e., restarting the crawler replays already fetched pages
+        from disk. ttl is the time (in seconds) until a page is revalidated.
+        """
+        self.page_cache = pagecache.ResponseCache(cache_dir, ttl)
+
+        return self.page_cache
+
+    def enable_download_manager(
+        self,
+        per_host_limit = 2,
+        bytes_per_second = 0,
+        progress_path = "",
+        manifest_path = "",
+        resume_attempts = 3
+    ):
+        """Download course materials via direct requests instead of the browser.
+
+        The download actions of the documents pages are resolved to requests
+        which are performed by a downloads.DownloadManager with the cookies
+        of the (logged in) webdriver. Broken off downloads are resumed and
+        downloads recorded in the manifest (manifest_path) are skipped. See
+        the class for the parameters.
+        """
+        self.download_manager = downloads.DownloadManager(httpfetch.HttpFetcher(self.user_agent),
+            per_host_limit, bytes_per_second, self.rate_limiter, progress_path,
+            blob_store = self.blob_store, manifest_path = manifest_path,
+            resume_attempts = resume_attempts)
+
+        return self.download_manager
+
+    def enable_blob_store(self, store_dir, manifest_path = ""):
+        """Deduplicate downloaded files in a content-addressed store.
+
+        Every downloaded file is hashed and replaced by a hard link to its
+        blob in store_dir (see blobstore.BlobStore); downloads which are
+        already stored for the same course (same name and size) are not
+        transferred again.
+        """
+        self.blob_store = blobstore.BlobStore(store_dir, manifest_path)
+
+        if self.download_manager is not None:
+            self.download_manager.blob_store = self.blob_store
+
+        return self.blob_store
+
+    def enable_parser_pool(self, max_workers = None):
+        """Parse the fetched course pages in worker processes (see parsepool.py).
+
+        The workers are forked when the pool is created, i.e., call this
+        function before any threads are started (HTTP backend, driver pool).
+        max_workers = None: amount of CPUs.
+        """
+        self.parser_pool = parsepool.ParserPool(max_workers)
+
+        return self.parser_pool
+
+    def enable_http_backend(self, pool_size = 10):
+        """Fetch public pages via plain HTTP (webdriver as fallback).
+
+        After calling this function, fetch_content(...) tries to fetch pages
+        using httpfetch.HttpFetcher first. The webdriver is only used if
+        the HTTP fetch does not yield valid content.
+        """
+        self.http_fetcher = httpfetch.HttpFetcher(self.user_agent, pool_size = pool_size)
+        self.fetch_executor = ThreadPoolExecutor(max_workers = pool_size)
+
+        return self.http_fetcher
+
     def tiss_login(self, driver):
         """Log in into TISS with the provided user credentials.
 
@@ -132,8 +363,8 @@ class crawler:
         self.fetch_page(driver, page_to_fetch)
 
         # verify the login (search for logout string in the page source)
-        self.fetch_page(driver, "https://tiss.tuwien.ac.at")
-        search_logout = driver.page_source.find("/admin/authentifizierung/logout")
+        self.fetch_page(driver, tiss_url)
+        search_logout = self.page_snapshot(driver).html.find("/admin/authentifizierung/logout")
         #login_page_source = self.fetch_page(driver, page_to_fetch)
 
         if (search_logout == -1):
@@ -142,6 +373,10 @@ class crawler:
             print("login successful")
             self.logged_in = True
 
+    def page_snapshot(self, driver):
+        '''snapshot of the page loaded in the webdriver (see pagesnapshot.py)'''
+        return pagesnapshot.page_snapshot(driver)
+
     def get_language(self, driver):
         """Function to retrieve the set language.
 
@@ -151,26 +386,16 @@ class crawler:
 
         # if the user initiates the driver and calls this function
         # immediately, no page is loaded and this if statement returns true
-        if driver.page_source == "<html><head></head><body></body></html>":
+        if self.page_snapshot(driver).is_blank():
             print("no previous page loaded")
             # load the default (tiss)page to determine the language
-            self.fetch_page(driver, "https://tiss.tuwien.ac.at/curriculum/studyCodes.xhtml")
-
-        # different needles for different pages
-        language_en_find = driver.page_source.find("language_en")
-        language_en_find2 = driver.page_source.find('<a href="/?locale=en">English</a>')
+            self.fetch_page(driver, tiss_url + "/curriculum/studyCodes.xhtml")
 
-        language_de_find = driver.page_source.find("language_de")
-        language_de_find2 = driver.page_source.find('<a href="/?locale=de">Deutsch</a>')
+        language = self.page_snapshot(driver).language
 
-        if (language_en_find != -1 or language_en_find2 != -1):
-            language = "de"
-        elif (language_de_find != -1 or language_de_find2 != -1):
-            language = "en"
-        else:
+        if language == "":
             # TODO: increase wait time to ensure page loading / retry!
             print("unable to determine language")
-            language = ""
 
         return language
 
@@ -186,32 +411,30 @@ class crawler:
         """
         set_language = self.get_language(driver)
 
-        # different needles for different pages
-        language_en_find = driver.page_source.find("language_en")
-        language_en_find2 = driver.page_source.find('<a href="/?locale=en">English</a>')
-
-        language_de_find = driver.page_source.find("language_de")
-        language_de_find2 = driver.page_source.find('<a href="/?locale=de">Deutsch</a>')
+        # different needles for different pages (read from the snapshot before
+        # the first click, which invalidates it)
+        snapshot = self.page_snapshot(driver)
+        language_links = snapshot.language_links
 
         # language changed successfully
         lang_changed = False
 
-        if (set_language == "de" and language_en_find != -1):
+        if (set_language == "de" and "language_en" in language_links):
             driver.find_element("id", "language_en").click()
             self.language = "en"
             lang_changed = True
 
-        if (set_language == "de" and language_en_find2 != -1):
+        if (set_language == "de" and '<a href="/?locale=en">English</a>' in language_links):
             driver.find_element(By.XPATH,'//a[contains(@href,"/?locale=en")]').click()
             self.language = "en"
             lang_changed = True
 
-        if (set_language == "en" and language_de_find != -1):
+        if (set_language == "en" and "language_de" in language_links):
             driver.find_element("id", "language_de").click()
             self.language = "de"
             lang_changed = True
 
-        if (set_language == "en" and language_de_find2 != -1):
+        if (set_language == "en" and '<a href="/?locale=de">Deutsch</a>' in language_links):
             driver.find_element(By.XPATH,'//a[contains(@href,"/?locale=de")]').click()
             self.language = "de"
             lang_changed = True
@@ -219,11 +442,12 @@ class crawler:
         # change of language failed -> write info into logfile
         if lang_changed == False and f_logfile != "":
             pylogs.write_to_logfile(f_logfile, "lang change failed (" +
-                lang_changed + "). Source: " + driver.page_source
+                str(lang_changed) + "). Source: " + snapshot.html
             )
 
-        # wait for the page to be loaded correctly (JS)
-        time.sleep(self.sleeptime_fetchpage)
+        # wait for the page to be loaded correctly (JS) in the new language
+        if lang_changed == True:
+            readiness.wait_for_language(driver, self.language, self.page_timeout)
 
     def process_acad_prgm(self, driver, process_info, fetch_single_semester = False):
         """Takes the output from extract_academic_programs(...) and processes it.
@@ -349,7 +573,7 @@ class crawler:
         # with key being 'program_url_key', le set to 'false' and semesterCode is the semester:
         # semesterCode = chosen semester (2011W, 2011S, etc.)
         # le = quereinsteiger (late enrollers)
-        base_url = "https://tiss.tuwien.ac.at/curriculum/public/curriculumSemester.xhtml?le=false&key=" + program_url_key
+        base_url = tiss_url + "/curriculum/public/curriculumSemester.xhtml?le=false&key=" + program_url_key
 
         # go through all semesters, e.g.:
         # START -> 2023S, 2022W, 2022S, 2021W, 2021S, 2020W, 2020S, ... <- END
@@ -372,17 +596,12 @@ class crawler:
             if page_exists == False:
                 break
 
-            # no break -> continue with data extraction
-            raw_page_source = driver.page_source
-
-            # extract (academic program) course number, e.g., 033261, 033241 from the title.
-            # This information extraction is not (set) language dependent.
-            search_pos_prgm_code = "<title>Curriculum "
-            find_pos1 = raw_page_source.find(search_pos_prgm_code)
-            program_code = raw_page_source[
-                find_pos1 + len(search_pos_prgm_code):
-                (find_pos1 + len(search_pos_prgm_code) + 7)
-            ]
+            # no break -> continue with data extraction (snapshot of the check above)
+            raw_page_source = self.page_snapshot(driver).html
+
+            # extract the program code (e.g., 033261) and the courses depending on the
+            # semester (see courseparser.parse_curriculum_page(...))
+            program_code, collected_courses = courseparser.parse_curriculum_page(raw_page_source)
             print("code|" + str(program_code) + "|")
 
             # write source of page into a file on disk
@@ -396,80 +615,6 @@ class crawler:
             f.write(raw_page_source)
             f.close()
 
-            # extract the courses depending on the semester. Each semester is
-            # marked using a <h2>...</h2> (with the first h2 being skipped over).
-
-            # semester dividers (used to slice the string)
-            semester_divider_start = "<h2>"
-            semester_divider_end = "</h2>"
-
-            # skip first <h2> (does not denote a semester)
-            semester_position_end = raw_page_source.find(semester_divider_end)
-            raw_page_source = raw_page_source[semester_position_end + len(semester_divider_end):]
-
-            # process the page source (slices between <h2>)
-            while raw_page_source.find(semester_divider_start) != -1:
-                sem_start_div = raw_page_source.find(semester_divider_start)
-                sem_end_div = raw_page_source.find(semester_divider_end)
-
-                process_semester = raw_page_source[sem_start_div + len(semester_divider_start):sem_end_div]
-                #print("PROCESS SEM: " + process_semester + "\n")
-
-                # create list for the semester in the dict 'collected_courses'
-                if process_semester not in collected_courses:
-                    collected_courses[process_semester] = []
-
-                raw_page_source = raw_page_source[sem_end_div + len(semester_divider_end):]
-
-                sem_start_div = raw_page_source.find(semester_divider_start)
-
-                extract_urls_source = raw_page_source[:sem_start_div]
-
-                #print("EXTRACT TEXT: " + extract_urls_source)
-
-                # extract course numbers for this semester. These come in the form of links, e.g.,
-                # https://tiss.tuwien.ac.at/course/courseDetails.xhtml?courseNr=251169&semester=2022S.
-                extract_course_div = "courseNr="
-                i = 0
-                while extract_urls_source.find(extract_course_div) != -1:
-                    course_pos1 = extract_urls_source.find(extract_course_div)
-                    extract_urls_source = extract_urls_source[course_pos1 + len(extract_course_div):]
-                    found_course_number = extract_urls_source[:extract_urls_source.find("&")]
-                    #print("found course: " + found_course_number)
-
-                    # append the course to the list in the dict (with the index being the semester)
-                    collected_courses[process_semester].append(found_course_number)
-                    i += 1
-                #print("i: " + str(i) + "\n\n")
-
-            """
-            print("\n\n\n")
-            print(collected_courses)
-            print("\n\n\n")
-            """
-
-            collected_courses_keys = list( collected_courses.keys() )
-
-            """
-            print("KEYS: ")
-            print(collected_courses_keys)
-            print("\n\n\n")
-
-            for _ in collected_courses_keys:
-                print( len ( collected_courses[_] ) )
-            """
-
-            # remove duplicates from the lists (in the dict)
-            for _ in collected_courses_keys:
-                collected_courses[_] = list(dict.fromkeys(collected_courses[_]))
-
-            """
-            print("\n")
-
-            for _ in collected_courses_keys:
-                print( len ( collected_courses[_] ) )
-            """
-
             # add the extracted courses to the collected-div
             return_collected_courses_list[select_process_semester] = collected_courses
 
@@ -508,7 +653,18 @@ class crawler:
         variable 'page', for example:
         https://tiss.tuwien.ac.at/course/courseDetails.xhtml?courseNr=160208
 
-        Returns 'True' or 'False', whether the course exists or not, respectively.
+        Returns 'True' or 'False', whether the course exists or not, respectively
+        (see classify_course_page(...)).
+        """
+        return not pageclass.course_missing(self.classify_course_page(driver, page))
+
+    def classify_course_page(self, driver, page):
+        """Fetch a course page and classify it (pageclass.PageVerdict).
+
+        The page source is read once from the webdriver and scanned once for
+        all markers (see pageclass.py). A JS error page is fetched again (at
+        most amt_retries times), i.e., JS_ERROR is only returned if all
+        attempts failed.
         """
 
         print ("checking page: " + page)
@@ -517,6 +673,9 @@ class crawler:
         sleep_time = 30
         amt_retries = 5
         for x in range(0, amt_retries):
+            self.respect_crawl_delay(page)
+
+            time_request_start = time.time()
             try:
                 driver.get(page)
                 resulting_error = None
@@ -525,51 +684,64 @@ class crawler:
                 print ( "error" + str(resulting_error) )
 
             if resulting_error:
+                self.record_fetch(time.time() - time_request_start, True)
+                sleep_time = self.backoff_time(sleep_time)
                 print ( "sleeptime set to: " + str(sleep_time) )
                 time.sleep(sleep_time)
                 sleep_time *= 2
-            else:
-                break
+                continue
+
+            # wait until the page (or the error page) has been loaded
+            page_loaded = readiness.wait_for_page(driver, self.page_timeout)
+
+            # a single snapshot of the page source (each read serialises the whole DOM)
+            verdict = pageclass.classify_page(self.page_snapshot(driver).html)
+            self.record_fetch(time.time() - time_request_start, not page_loaded or
+                verdict == pageclass.PageVerdict.JS_ERROR)
 
-        time.sleep(self.crawl_delay)
+            if verdict != pageclass.PageVerdict.JS_ERROR:
+                return verdict
 
-        # determine, whether the course exists or not
-        not_found_ger1 = driver.page_source.find('Ressource nicht gefunden')
-        not_found_ger2 = driver.page_source.find('Die angeforderte Ressource wurde nicht gefunden')
-        # Die LVA ist im Semester 2004S noch nicht veröffentlicht.
-        not_found_ger3 = driver.page_source.find('noch nicht veröffentlicht')
+            print ( "JS error page -> fetching again" )
 
+        return pageclass.PageVerdict.JS_ERROR
 
-        not_found_en1 = driver.page_source.find('Bad request')
-        not_found_en2 = driver.page_source.find('The requested resource could not be found')
-        # The Course is not public in semester 2004S.
-        not_found_en3 = driver.page_source.find('The Course is not public')
+    def respect_crawl_delay(self, page):
+        """Wait until the crawl delay since the last fetched page has passed.
 
-        # study program:
-        # The requested page could not be found
+        Used by both fetch backends (webdriver and HTTP), i.e., every
+        request to TISS is counted against the same crawl delay.
 
-        # courses:
-        # The requested resource could not be found
+        With the adaptive crawl delay (see enable_adaptive_delay(...)), the
+        current delay of the controller is used instead of self.crawl_delay.
 
-        # -> check also for title "Error page" (which could cover both cases (study program and courses)
-        not_found__error_page = driver.page_source.find('Error page')
+        If a rate limiter is set (self.rate_limiter), a token is taken from
+        it instead. The limiter may be shared between several crawler
+        instances (concurrent crawling) so that all of them together
+        respect the same amount of requests per second.
 
-        course_exist = True
+        Without a rate limiter, the fetch threads of this instance (see
+        self.fetch_pages(...)) reserve their slot under a lock: every call
+        moves self.last_crawltime to the time it may fetch and sleeps until
+        then outside the lock, i.e., concurrent calls are spaced by the
+        crawl delay instead of passing together.
+        """
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(page)
+            self.last_crawltime = time.time()
+            return
 
-        #print ( str(not_found_ger1) + "|" + str(not_found_ger2) + "|" + str(not_found_en1) + "|" + str(not_found_en2) )
+        crawl_delay = self.crawl_delay
+        if self.delay_controller is not None:
+            crawl_delay = self.delay_controller.delay
 
-        if (
-                not_found_ger1 != -1 or
-                not_found_ger2 != -1 or
-                not_found_ger3 != -1 or
-                not_found_en1 != -1 or
-                not_found_en2 != -1 or
-                not_found_en3 != -1 or
-                not_found__error_page != -1
-            ):
-            course_exist = False
+        with self.crawl_delay_lock:
+            now = time.time()
+            t_wait = max(0, self.last_crawltime + crawl_delay - now)
+            self.last_crawltime = now + t_wait
 
-        return course_exist
+        if t_wait > 0:
+            time.sleep(t_wait)
 
     def get_page(self, driver, page):
         """Fetch a single page while respecting time delay between crawls.
@@ -579,17 +751,13 @@ class crawler:
         respect other interactions (e.g., select events) but since a lot relies
         on JS to be fetched, the delay is considered inherently in these cases.
         """
-        t_diff = time.time() - self.last_crawltime
-
-        if t_diff < self.crawl_delay:
-            time.sleep(self.crawl_delay - t_diff)
-
-        self.last_crawltime = time.time()
+        self.respect_crawl_delay(page)
 
         # try to fetch the page (retry in case an error occurs)
         sleep_time = 30
         amt_retries = 5
         for x in range(0, amt_retries):
+            time_request_start = time.time()
             try:
                 driver.get(page)
                 resulting_error = None
@@ -598,6 +766,8 @@ class crawler:
                 print ( "error" + str(resulting_error) )
 
             if resulting_error:
+                self.record_fetch(time.time() - time_request_start, True)
+                sleep_time = self.backoff_time(sleep_time)
                 print ( "sleeptime set to: " + str(sleep_time) )
                 time.sleep(sleep_time)
                 sleep_time *= 2
@@ -614,25 +784,32 @@ class crawler:
         print ('fetching page: ', page)
 
         # fetch the page (open the headless browser)
+        time_request_start = time.time()
         self.get_page(driver, page)
 
         """
-        Wait until the javascript code has been delivered. If this
-        waiting time is not set, the retrieved page is faulty, i.e., it
-        will contain a warning to 'enable JS'. This is due to the fact that
-        the page sets a JS cookie, reloads/redirects and this must be resolved
-        before fetching the page or it (the fetching) will not succeed!
+        Wait until the javascript code has been delivered. If the page is
+        read too early, the retrieved page is faulty, i.e., it will contain
+        a warning to 'enable JS'. This is due to the fact that the page sets
+        a JS cookie, reloads/redirects and this must be resolved before
+        fetching the page or it (the fetching) will not succeed! Therefore,
+        wait until the div contentInner exists (at most self.page_timeout).
         """
-        time.sleep(self.sleeptime_fetchpage)
+        readiness.wait_for_content(driver, self.page_timeout)
 
         inner_div_content = self.verify_page_crawl(driver, page)
+        self.record_fetch(time.time() - time_request_start, inner_div_content == "" or
+            inner_div_content.find("Something went seriously wrong Please try refreshing the page") != -1)
 
         # no page loading at all
         i = 2
         while inner_div_content == "":
-            time.sleep(i * self.sleeptime_fetchpage)
+            self.respect_crawl_delay(page)
+            time_request_start = time.time()
             driver.refresh()
+            readiness.wait_for_content(driver, self.page_timeout)
             inner_div_content = self.verify_page_crawl(driver, page)
+            self.record_fetch(time.time() - time_request_start, inner_div_content == "")
             i = i + 2
             print("failed to load content -> " + str(i))
             if i > 20:
@@ -641,9 +818,13 @@ class crawler:
         # error loading javascript
         i = 2
         while inner_div_content.find("Something went seriously wrong Please try refreshing the page") != -1:
-            time.sleep(i * self.sleeptime_fetchpage)
+            self.respect_crawl_delay(page)
+            time_request_start = time.time()
             driver.refresh()
+            readiness.wait_for_content(driver, self.page_timeout)
             inner_div_content = self.verify_page_crawl(driver, page)
+            self.record_fetch(time.time() - time_request_start,
+                inner_div_content.find("Something went seriously wrong Please try refreshing the page") != -1)
             i = i + 2
             print("failed to load (JS) content -> " + str(i))
             if i > 20:
@@ -651,6 +832,169 @@ class crawler:
 
         return inner_div_content
 
+    def fetch_content(self, driver, page, locale = None):
+        """Fetch the content (div contentInner) of a page, HTTP first.
+
+        If the HTTP backend is enabled (see enable_http_backend(...)), the
+        page is fetched via plain HTTP. Only when this fails (exception,
+        missing contentInner or JS error page), the page is fetched via
+        the webdriver using fetch_page(...). The returned string is the
+        same as the one returned by fetch_page(...).
+
+        Only use this function for pages where the caller needs nothing
+        but the returned content, i.e., no interaction with the webdriver
+        (page_source, select elements, etc.) afterwards.
+
+        locale (de/en) is passed as URL parameter to the HTTP request since
+        the HTTP session does not share the language setting of the webdriver.
+        If not set, the language of this crawler (self.language) is used.
+
+        If the page cache is enabled (see enable_page_cache(...)), a fresh
+        cached copy of the page is returned without any request. Expired
+        copies are revalidated using a conditional GET.
+        """
+        if locale is None:
+            locale = self.language
+
+        html, content = self.fetch_http_document(page, locale)
+
+        if content is not None:
+            return content
+
+        return self.fetch_page(driver, page)
+
+    def fetch_http_document(self, page, locale, verify_language = False):
+        """Fetch a page via the page cache or the HTTP backend (no webdriver).
+
+        Returns the complete page source and the content (div contentInner)
+        or (None, None) if neither the cache nor the HTTP backend yields a
+        valid page. With verify_language = True, pages which are not
+        displayed in the language locale count as failed (and are not
+        cached). This function does not change the state of this instance
+        apart from the crawl delay, i.e., it can be called from several
+        threads at once (see fetch_pages(...)).
+        """
+        cache_entry = None
+        if self.page_cache is not None:
+            cache_entry = self.page_cache.get(page, locale)
+
+            if cache_entry is not None and self.page_cache.is_fresh(cache_entry):
+                cached_content = httpfetch.extract_content_inner(cache_entry["html"])
+
+                if cached_content != "":
+                    print ('fetching page (cache): ', page)
+                    return cache_entry["html"], cached_content
+
+        if self.http_fetcher is None:
+            return None, None
+
+        fetch_url = page
+        if locale != "":
+            fetch_url = httpfetch.set_url_params(page, {"locale": locale})
+
+        print ('fetching page (http): ', fetch_url)
+        self.respect_crawl_delay(fetch_url)
+
+        request_headers = None
+        if cache_entry is not None:
+            request_headers = self.page_cache.conditional_headers(cache_entry)
+
+        time_request_start = time.time()
+        try:
+            fetch_result = self.http_fetcher.fetch(fetch_url, request_headers)
+        except Exception as e:
+            self.record_fetch(time.time() - time_request_start, True)
+            print("http fetch error " + str(e) + " -> falling back to webdriver")
+            return None, None
+
+        language_mismatch = (verify_language and fetch_result.status == 200 and
+            courseparser.parse_language(fetch_result.html) != locale)
+
+        self.record_fetch(time.time() - time_request_start,
+            fetch_result.status >= 500 or language_mismatch or
+            fetch_result.content.find(httpfetch.js_error_needle) != -1)
+
+        # cached page is still valid
+        if fetch_result.status == 304 and cache_entry is not None:
+            self.page_cache.touch(cache_entry)
+            return cache_entry["html"], httpfetch.extract_content_inner(cache_entry["html"])
+
+        if fetch_result.is_valid() and not language_mismatch:
+            if self.page_cache is not None:
+                self.page_cache.put(page, locale, fetch_result.html, fetch_result.headers)
+
+            return fetch_result.html, fetch_result.content
+
+        print("http fetch failed (status " + str(fetch_result.status) + ", language mismatch: " +
+            str(language_mismatch) + ") -> falling back to webdriver")
+
+        return None, None
+
+    def fetch_localized(self, driver, page, locale, f_logfile = ""):
+        """Fetch the content of a page in the language locale (de/en).
+
+        Instead of switching the language by clicking the language link
+        (see switch_language(...)), the language is requested via the URL
+        parameter locale and verified from the fetched page. The page is
+        fetched via the cache/HTTP backend first and via the webdriver
+        as fallback (which sets the language of the webdriver session).
+        """
+        html, content = self.fetch_http_document(page, locale, True)
+
+        if content is not None:
+            return content
+
+        localized_page = httpfetch.set_url_params(page, {"locale": locale})
+
+        sleep_time = 30
+        amt_retries = 5
+        for x in range(0, amt_retries):
+            content = self.fetch_page(driver, localized_page)
+            page_language = self.page_snapshot(driver).language
+
+            if page_language == locale:
+                break
+
+            if f_logfile != "":
+                pylogs.write_to_logfile(f_logfile, "language mismatch (requested: " + locale +
+                    ", page: " + page_language + ") -> refetch " + localized_page)
+
+            self.record_fetch(0, True)
+            time.sleep(self.backoff_time(sleep_time))
+            sleep_time *= 2
+
+        self.language = page_language
+
+        return content
+
+    def fetch_pages(self, driver, page_requests, f_logfile = ""):
+        """Fetch several pages (each in a given language) at once.
+
+        page_requests is a list of tuples (page, locale). Returns a dict with
+        indices being these tuples and the data the content of the page
+        (see fetch_localized(...)). With the HTTP backend enabled, all pages
+        are requested concurrently (the rate limiter/crawl delay still applies
+        to every single request). Pages which could not be fetched via HTTP
+        are fetched one after another via the webdriver.
+        """
+        documents = {}
+
+        if self.fetch_executor is not None:
+            futures = {(page, locale): self.fetch_executor.submit(self.fetch_http_document, page, locale, True)
+                for page, locale in page_requests}
+            documents = {page_request: future.result() for page_request, future in futures.items()}
+
+        contents = {}
+        for page, locale in page_requests:
+            html, content = documents.get((page, locale), (None, None))
+
+            if content is None:
+                content = self.fetch_localized(driver, page, locale, f_logfile)
+
+            contents[(page, locale)] = content
+
+        return contents
+
     def verify_page_crawl(self, driver, page):
         """Check if the retrieved source code (incl. JS) has been fetched properly
 
@@ -676,167 +1020,79 @@ class crawler:
         return inner_div_content
 
     def extract_hrefs(self, haystack, superior_title):
-        """
-
-        <a href="/curriculum/public/curriculum.xhtml?key=41934">Masterstudium Architektur </a>
-        ->
-        [https://tiss.tuwien.ac.at/curriculum/public/curriculum.xhtml?key=41934|superior_title|Masterstudium Architektur]
-        """
-        divider1 = '<a href="'
-        divider2 = '">'
-        divider3 = '</a>'
-
-        url_prefix = 'https://tiss.tuwien.ac.at'
-        return_data = []
-
-        while haystack.find(divider1) != -1:
-            position1 = haystack.find(divider1)
-
-            haystack = haystack[position1 + len(divider1):]
-
-            position2 = haystack.find(divider2)
-            position3 = haystack.find(divider3)
-
-            string_part1 = url_prefix + haystack[:position2]
-            string_part2 = haystack[position2 + len(divider2):position3].strip()
-
-            return_data.append(string_part1 + "|" + superior_title + "|" + string_part2)
-
-            haystack = haystack[position3 + len(divider3):]
-
-        return return_data
+        '''see courseparser.parse_hrefs(...)'''
+        return courseparser.parse_hrefs(haystack, superior_title, tiss_url)
 
     def extract_academic_programs(self, driver, URL):
         """Extract links and informations to academic programs.
 
+        see courseparser.parse_academic_programs(...)
         """
-        fetched_page = self.fetch_page(driver, URL)
-
-        divider1 = "<h2>"
-        divider2 = "</h2>"
-
-        position1 = fetched_page.find(divider1)
-
-        fetched_page = fetched_page[position1 + len(divider1):]
-
-        return_collected_data = []
+        fetched_page = self.fetch_content(driver, URL, self.get_language(driver))
 
-        while fetched_page.find(divider1) != -1:
-            position1 = fetched_page.find(divider1)
-            position2 = fetched_page.find(divider2)
-
-            superior_title = fetched_page[:position2]
-
-            haystack = fetched_page[:fetched_page.find(divider1)]
-            extracted_links = self.extract_hrefs(haystack, superior_title)
-            return_collected_data.extend(extracted_links)
-
-            fetched_page = fetched_page[position1 + len(divider1):]
-
-        # process rest of the string
-        fetched_page = fetched_page[:fetched_page.find('<div id="footer">')]
-        position2 = fetched_page.find(divider2)
-        superior_title = fetched_page[:position2]
-        extracted_links = self.extract_hrefs(fetched_page, superior_title)
-        return_collected_data.extend(extracted_links)
-
-        return return_collected_data
+        return courseparser.parse_academic_programs(fetched_page, tiss_url)
 
     def extract_courses(self, driver, URL, pylogs_filepointer, fetchSingleSem):
         """Extract courses from the (study) program.
 
-        This function loops through all years (HTML select element)
-        and extracts all the links (URLs) to the courses from the
+        This function loops through all years (semesters of the HTML select
+        element) and extracts all the links (URLs) to the courses from the
         course program / overview.
 
-        To do this, the function takes the URL to a academic program
-        and extracts the URLs to the courses for each semester. Finally,
-        duplicates are removed from the list (extracted_course_URLs) and
-        it is being returned by the function.
+        To do this, the function takes the URL to a academic program, e.g.,
+        https://tiss.tuwien.ac.at/curriculum/public/curriculum.xhtml?key=37047
+        and reads the available semesters from the page source. The courses
+        of each semester are extracted from the raw HTML of the page
+        curriculumSemester.xhtml?semesterCode=2022W&key=37047&le=false (the
+        same pages as in process_acad_prgm(...)), i.e., no select element has
+        to be driven. All semester pages are independent requests (fetched
+        concurrently with the HTTP backend). Finally, duplicates are removed
+        from the list (extracted_course_URLs) and it is being returned by the
+        function.
         """
-        # fetch the online academic program
-        self.fetch_page(driver, URL)
-        time.sleep(self.sleeptime_fetchpage)
-
-        # selector element for year(semester) selection
-        search_selector1 = driver.page_source.find("j_id_2d:semesterSelect")
-        search_selector2 = driver.page_source.find("j_id_2e:semesterSelect")
+        extracted_course_URLs = []
 
-        if search_selector1 != -1:
-            selector = Select(driver.find_element("name", "j_id_2d:semesterSelect"))
-            pylogs.write_to_logfile(pylogs_filepointer, 'selected selector1: j_id_2d:semesterSelect')
-        elif search_selector2 != -1:
-            selector = Select(driver.find_element("name", "j_id_2e:semesterSelect"))
-            pylogs.write_to_logfile(pylogs_filepointer, 'selected selector2: j_id_2e:semesterSelect')
-        else:
-            pylogs.write_to_logfile(pylogs_filepointer, 'no selector1 found (2d/2e)')
+        # "url key" of the program (used to generate the URL to access the program)
+        program_url_key = httpfetch.url_param(URL, "key")
 
-        extracted_course_URLs = []
+        # fetch the online academic program (to get the option informations)
+        html, content = self.fetch_http_document(URL, self.language)
+        if html is None:
+            self.fetch_page(driver, URL)
+            html = self.page_snapshot(driver).html
 
-        # get the values of the select dropdown element
-        semester_list = {}
-        # loop through all semesters, extract the desired information
-        for option in selector.options:
-            semester_option_text = option.text
-            semester_option_attribute = option.get_attribute('value')
-            semester_list[semester_option_attribute] = ""
-            #print(semester_option_text + "|" + semester_option_attribute)
+        # get the values of the select dropdown element (j_id_2d:semesterSelect/j_id_2e:semesterSelect)
+        semester_iterate_list = courseparser.parse_semester_options(html)
 
-        semester_iterate_list = list(semester_list.keys())
+        if len(semester_iterate_list) == 0:
+            pylogs.write_to_logfile(pylogs_filepointer, 'no semester options found (' + URL + ')')
 
         # if the (single) semester is not in the course list -> skip to the end of the function
-        if fetchSingleSem not in semester_iterate_list:
+        if fetchSingleSem != False and fetchSingleSem not in semester_iterate_list:
             pylogs.write_to_logfile(pylogs_filepointer, 'fetchSingleSem (' + str(fetchSingleSem) + ') not in list -> skip')
             return extracted_course_URLs
 
-        # loop through all semesters and store all links to the courses
-        for index in range(len(selector.options)):
-            # fetch single semester -> jump to this semester (extract only this one).
-            # Set variable index to the index of the list corresponding to fetchSingleSem.
-            if fetchSingleSem != False:
-                index = semester_iterate_list.index(fetchSingleSem)
-                pylogs.write_to_logfile(pylogs_filepointer, 'single semester override: ' + str(index) )
-
-            search_selector1 = driver.page_source.find("j_id_2d:semesterSelect")
-            search_selector2 = driver.page_source.find("j_id_2e:semesterSelect")
-
-            if search_selector1 != -1:
-                #selector = Select(driver.find_element("name", "j_id_2d:semesterSelect"))
-                pylogs.write_to_logfile(pylogs_filepointer, 'selected selector2: j_id_2d:semesterSelect')
-                select = Select(driver.find_element("name", "j_id_2d:semesterSelect"))
-            elif search_selector2 != -1:
-                selector = Select(driver.find_element("name", "j_id_2e:semesterSelect"))
-                pylogs.write_to_logfile(pylogs_filepointer, 'selected selector2: j_id_2e:semesterSelect')
-                select = Select(driver.find_element("name", "j_id_2e:semesterSelect"))
-            else:
-                pylogs.write_to_logfile(pylogs_filepointer, 'no selector2 found (2d/2e)')
-
-            select.select_by_index(index)
-
-            """
-            TODO:	handle the fetching of links via a try block (or explicit wait)
+        # fetch single semester -> extract only this one
+        if fetchSingleSem != False:
+            semester_iterate_list = [fetchSingleSem]
+            pylogs.write_to_logfile(pylogs_filepointer, 'single semester override: ' + str(fetchSingleSem))
 
-                    In case the following wait time is to low, an error will result
-                    due to the DOM elements not being attached.
-            """
-            time.sleep(3*self.sleeptime_fetchpage)
+        # one page per semester, e.g.,
+        # https://tiss.tuwien.ac.at/curriculum/public/curriculumSemester.xhtml?semesterCode=2022W&key=37047&le=false
+        locale = self.language if self.language in ("de", "en") else "de"
+        page_requests = [(tiss_url + "/curriculum/public/curriculumSemester.xhtml?semesterCode=" +
+            semester + "&key=" + program_url_key + "&le=false", locale) for semester in semester_iterate_list]
 
-            # extract all links foundstarting downloading files
-            elems = driver.find_elements(By.XPATH, "//a[@href]")
+        pylogs.write_to_logfile(pylogs_filepointer, 'program key: ' + program_url_key +
+            ' | semesters: ' + str(semester_iterate_list))
 
-            for elem in elems:
-                href_element = elem.get_attribute("href")
-                if href_element.find("courseDetails") != -1:
-                    extracted_course_URLs.append(href_element)
+        semester_pages = self.fetch_pages(driver, page_requests, pylogs_filepointer)
 
-            if fetchSingleSem != False:
-                break
-
-        # remove years so that only the courses remain. Later on, years
-        # will be crawled individually.
-        for i in range(len(extracted_course_URLs)):
-            cut_pos = extracted_course_URLs[i].find("&semester=")
-            extracted_course_URLs[i] = extracted_course_URLs[i][:cut_pos]
+        # store all links to the courses. Years are not part of the URLs since
+        # later on, years will be crawled individually.
+        for page_request in page_requests:
+            for course_number in courseparser.parse_course_links(semester_pages[page_request]):
+                extracted_course_URLs.append(tiss_url + "/course/courseDetails.xhtml?courseNr=" + course_number)
 
         # remove duplicate URLs from the links
         extracted_course_URLs = list( dict.fromkeys(extracted_course_URLs) )
@@ -853,8 +1109,14 @@ class crawler:
         f_failed_downloads,
         fetchSingleSem,
         download_files = False,
+        prefetched_page = None,
     ):
         """Process a single course and extract relevenat information.
+
+        prefetched_page is the source of URL if it has already been fetched
+        (e.g., by a probe in bruteforce.py). It is used to read the semester
+        options and as the page of the semester (and language) it displays,
+        i.e., only the other pages are fetched.
         """
 
         # number of processed semesters for this course (e.g., processing: 2021W, 2021S yields 2)
@@ -890,202 +1152,105 @@ class crawler:
         return_info_dict = {}
 
         ## fetch semester option info
-        # fetch page (to get the option informations)
-        self.fetch_page(driver, URL)
-
-        course_not_available1 = driver.page_source.find("The Course is not public in semester")
-        course_not_available2 = driver.page_source.find("Bitte wählen Sie ein anderes Semester aus")
-
-        if course_not_available1 == -1 and course_not_available2 == -1:
-            source_selector_j25 = driver.page_source.find("semesterForm:j_id_25")
-            source_selector_j26 = driver.page_source.find("semesterForm:j_id_26")
-
-            if source_selector_j25 != -1:
-                selector = Select(driver.find_element("name", "semesterForm:j_id_25"))
-            elif source_selector_j26 != -1:
-                selector = Select(driver.find_element("name", "semesterForm:j_id_26"))
-            else:
-                print("neither j_id_25 nor j_id_26 selector was found")
-
+        # fetch page (to get the option informations). The options are read from the
+        # page source, i.e., no select element of the webdriver is needed.
+        if prefetched_page is not None:
+            html = prefetched_page
         else:
-            # Caused by not being logged in ?! - not likely
-            # course not available, selector is therefore not to be found -> try refreshing
-            pylogs.write_to_logfile(pylogs_filepointer, 'course not available1 (' + str(course_not_available1) +
-                '); course not available2 ( ' + str(course_not_available2) + ') -> rerouting'
-            )
-            #driver.refresh()
-            #time.sleep(self.sleeptime_fetchpage)
-
-            source_selector_jid2n = driver.page_source.find("sj_id_2c:j_id_2n")
-            source_selector_jid2o = driver.page_source.find("j_id_2d:j_id_2o")
-
-            if source_selector_jid2n != -1:
-                driver.find_element("id", "j_id_2c:j_id_2n").click()
-            elif source_selector_jid2o != -1:
-                driver.find_element("id", "j_id_2d:j_id_2o").click()
-            else:
-                pylogs.write_to_logfile(pylogs_filepointer, "neither source_selector_jid2n nor source_selector_jid2o button id was found")
-                pylogs.write_to_logfile(pylogs_filepointer, str(driver.page_source))
-
-            time.sleep(self.sleeptime_fetchpage)
-            #selector = Select(driver.find_element("name", "semesterForm:j_id_25"))
-
-            # reroute to selector j_id_26
-            source_selector_j_26 = driver.page_source.find("semesterForm:j_id_26")
-            source_selector_j_27 = driver.page_source.find("semesterForm:j_id_27")
-
-            pylogs.write_to_logfile(pylogs_filepointer, 'source_selector_j_26: ' + str(source_selector_j_26))
-
-            if source_selector_j_26 != -1:
-                selector = Select(driver.find_element("name", "semesterForm:j_id_26"))
-            elif source_selector_j_27 != -1:
-                selector = Select(driver.find_element("name", "semesterForm:j_id_27"))
-            else:
-                pylogs.write_to_logfile(pylogs_filepointer, str(driver.page_source))
+            html, content = self.fetch_http_document(URL, self.language)
+        if html is None:
+            self.fetch_page(driver, URL)
+            html = self.page_snapshot(driver).html
 
         # used for download folder names. Should always be set to german.
         course_title_download_ger = ""
 
         unknown_fields = []
 
-        # loop through all semesters, extract the desired information
-        for option in selector.options:
-            semester_option_text = option.text
-            semester_option_attribute = option.get_attribute('value')
+        # all semesters (2012W, 2013W, etc.) of the semester select element
+        for semester_option_attribute in courseparser.parse_semester_options(html):
             semester_list[semester_option_attribute] = ""
-            #print(semester_option_text + "|" + semester_option_attribute)
 
         semester_iterate_list = list(semester_list.keys())
 
         # abort if desired semester (to extract) is not in the select list
-        if fetchSingleSem not in semester_iterate_list:
+        if fetchSingleSem != False and fetchSingleSem not in semester_iterate_list:
             pylogs.write_to_logfile(pylogs_filepointer, 'fetchSingleSem (' + str(fetchSingleSem) + ') not in list -> skip')
             return return_info_dict, amount_downloads, amt_of_semesters_processed, unknown_fields
 
         pylogs.write_to_logfile(pylogs_filepointer, 'semester_iterate_list: ' + str(semester_iterate_list))
 
-        for select_semester in range(len(semester_iterate_list)):
-            #print("selecting: " + semester_iterate_list[select_semester])
-
-            """
-            Sometimes the course is not available ("the course is not public in this semester").
-            This can occur at any time during fetching of the options (semester) list.
+        # fetch single semester -> extract only this one
+        if fetchSingleSem != False:
+            semester_iterate_list = [fetchSingleSem]
+            pylogs.write_to_logfile(pylogs_filepointer, 'single semester override: ' + str(fetchSingleSem))
+
+        # always start with the same language (download folder name)
+        first_language = self.language if self.language in ("de", "en") else "de"
+        page_languages = [first_language, "en" if first_language == "de" else "de"]
+
+        # every semester (and language) is addressed directly via the URL, e.g.,
+        # courseDetails.xhtml?courseNr=104590&semester=2022W&locale=en, instead of
+        # selecting it in the semester select element. All pages are independent
+        # requests (fetched concurrently with the HTTP backend).
+        semester_URLs = {selected_semester: httpfetch.set_url_params(URL, {"semester": selected_semester})
+            for selected_semester in semester_iterate_list}
+
+        page_requests = [(semester_URL, page_language)
+            for semester_URL in semester_URLs.values() for page_language in page_languages]
+
+        # the prefetched page (e.g., of the probe) is one of these pages: the semester
+        # it is displayed for (selected option or semester of the URL) in its language
+        # -> use it instead of fetching it again
+        prefetched_pages = {}
+        if prefetched_page is not None:
+            prefetched_semester = (courseparser.parse_selected_semester(prefetched_page) or
+                httpfetch.get_url_param(URL, "semester"))
+            prefetched_language = courseparser.parse_language(prefetched_page)
+            prefetched_content = httpfetch.extract_content_inner(prefetched_page)
+
+            if prefetched_semester in semester_URLs and prefetched_language in page_languages and prefetched_content:
+                prefetched_pages[(semester_URLs[prefetched_semester], prefetched_language)] = prefetched_content
+
+        pylogs.write_to_logfile(pylogs_filepointer, 'open URL: ' + URL +
+            ' | lang: ' + "/".join(page_languages) +
+            ' | semesters: ' + str(semester_iterate_list) +
+            ' | prefetched: ' + str(len(prefetched_pages))
+        )
+        semester_pages = self.fetch_pages(driver,
+            [page_request for page_request in page_requests if page_request not in prefetched_pages],
+            pylogs_filepointer
+        )
+        semester_pages.update(prefetched_pages)
 
-            In that case, select the next semester and click on "Next/Weiter". Proceed, until
-            the course becomes available.
-            """
-            while (driver.page_source.find("Bitte wählen Sie ein anderes Semester aus") != -1 or
-                driver.page_source.find("Please select an other semester") != -1
-            ):
-                pylogs.write_to_logfile(pylogs_filepointer, "skip -> " + str(select_semester) + " | " +
-                    "semester_iterate_list[select_semester]:" + str(semester_iterate_list[select_semester]))
-
-                if select_semester < len(semester_iterate_list):
-                    select_semester += 1
-                else:
-                    break
+        # pages to parse: (semester, language, content of the page)
+        parse_jobs = []
 
-                selector_skip = Select(driver.find_element("name", "j_id_2d:j_id_2l"))
-                selector_skip.select_by_visible_text(semester_iterate_list[select_semester])
-                time.sleep(self.sleeptime_fetchpage)
-                driver.find_element("id", "j_id_2d:j_id_2o").click()
-                time.sleep(2*self.sleeptime_fetchpage)
-
-            # fetch single semester -> jump to this semester (extract only this one).
-            # Set variable select_semester to the index of the list corresponding to fetchSingleSem.
-            if fetchSingleSem != False:
-                select_semester = semester_iterate_list.index(fetchSingleSem)
-                pylogs.write_to_logfile(pylogs_filepointer, 'single semester override: ' + str(select_semester) )
-
-            # handling the select element
-            #
-            # determine which semesterFrom selector should be called.
-            # These change, e.g., semesterForm:j_id_25, semesterForm:j_id_26,
-            # semesterForm:j_id_27 ...
-            try:
-                sel_string = "semesterForm:j_id_"
-                query_source_sel = 'name="' + sel_string
-                # determine the position in the source for the selector (startpoint)
-                search_sel_startpoint = driver.page_source.find(query_source_sel)
-                cut_str = driver.page_source[search_sel_startpoint + len(query_source_sel):]
-                # determine the position in the source for the selector (endpoint)
-                search_sel_endpoint = cut_str.find('"')
-                selector_endnumber = cut_str[:search_sel_endpoint]
-                # compose the selector (string + number)
-                compose_selector = sel_string + selector_endnumber
-                # call the selector
-                pylogs.write_to_logfile(pylogs_filepointer, "semesterForm selector: "
-                    + compose_selector)
-                select = Select(driver.find_element("name", compose_selector))
-            except NoSuchElementException:
-                pylogs.write_to_logfile(pylogs_filepointer, "no element: " + compose_selector)
-                pylogs.write_to_logfile(pylogs_filepointer, str(driver.page_source))
-
-            select.select_by_visible_text(semester_iterate_list[select_semester])
-            time.sleep(self.sleeptime_fetchpage)
-
-            selected_semester = semester_iterate_list[select_semester]
+        for selected_semester in semester_iterate_list:
+            semester_URL = semester_URLs[selected_semester]
 
             # get both languages
-            for i in range(0, 2):
-                # always start with the same language (download folder name)
-                if i == 1:
-                    # sometimes language seems to not switch -> try again then
-                    sleep_time = 30
-                    amt_retries = 5
-                    for x in range(0, amt_retries):
-                        # old language
-                        old_language = self.language
-                        self.switch_language(driver, pylogs_filepointer)
-                        new_language = self.language
-                        print("old lang: " + old_language + " | new lang: " + new_language)
-
-                        if old_language == new_language:
-                            time.sleep(sleep_time)
-                            sleep_time *= 2
-                            driver.refresh()
-                            time.sleep(sleep_time)
-                        else:
-                            break
-
-                pylogs.write_to_logfile(pylogs_filepointer, 'open URL: ' + URL +
-                    ' | lang: ' + self.language +
-                    ' | selected_semester: ' + str(selected_semester)
-                )
-                course_raw_info = self.fetch_page(driver, URL)
+            for i, page_language in enumerate(page_languages):
+                course_raw_info = semester_pages[(semester_URL, page_language)]
                 amt_of_semesters_processed += 1
 
-                # check if materials are available for download
-                #found_materials = False
+                """
+                Sometimes the course is not available ("the course is not public in this semester").
+                There is no information to be extracted -> continue with the next semester.
+                """
+                if courseparser.course_not_available(course_raw_info):
+                    pylogs.write_to_logfile(pylogs_filepointer, "skip -> " + selected_semester +
+                        " | lang: " + page_language + " (course not available)")
+                    continue
 
                 # in case there are downloads -> save the links to them in the dict
-                if course_raw_info.find("Zu den Lehrunterlagen") != -1 and i == 0:
-                    #pos_LU = course_raw_info.find("Zu den Lehrunterlagen")
-                    #print("materialsDE")
-                    semester_list[selected_semester] = ("https://tiss.tuwien.ac.at/education/course/documents.xhtml?courseNr=" +
-                        str(course_number_URL) + "&semester=" + str(semester_iterate_list[select_semester])
+                if courseparser.course_has_materials(course_raw_info) and i == 0:
+                    semester_list[selected_semester] = (tiss_url + "/education/course/documents.xhtml?courseNr=" +
+                        str(course_number_URL) + "&semester=" + str(selected_semester)
                     )
-                    #found_materials = True
-                if course_raw_info.find("Go to Course Materials") != -1 and i == 0:
-                    #pos_LU = course_raw_info.find("Go to Course Materials")
-                    #print("materialsEN")
-                    semester_list[selected_semester] = ("https://tiss.tuwien.ac.at/education/course/documents.xhtml?courseNr=" +
-                        str(course_number_URL) + "&semester=" + str(semester_iterate_list[select_semester])
-                    )
-                    #found_materials = True
-
-                # clear all data in the dict
-                extract_dict = {}
-
-                ## extract the data
-                extract_dict["page_fetch_lang"] = self.language
 
                 # course number and course title
-                needle1 = '<span class="light">'
-                pos1 = course_raw_info.find(needle1)
-                needle2 = "</span>"
-                pos2 = course_raw_info.find(needle2)
-                course_number = course_raw_info[pos1 + len(needle1):pos2].strip()
+                course_number, course_raw_info_rest = courseparser.parse_course_number(course_raw_info)
 
                 # sometimes fetching of the page fails which results
                 # in an JS error page (course number = "<noscri" but
@@ -1101,251 +1266,49 @@ class crawler:
                         )
 
                         pylogs.write_to_logfile(pylogs_filepointer, "FP1: " + course_raw_info)
-                        time.sleep(sleep_time)
+                        self.record_fetch(0, True)
+                        time.sleep(self.backoff_time(sleep_time))
                         sleep_time *= 2
-                        driver.refresh()
-                        time.sleep(sleep_time)
-                        course_raw_info = self.fetch_page(driver, URL)
+                        course_raw_info = self.fetch_localized(driver, semester_URL, page_language, pylogs_filepointer)
                         pylogs.write_to_logfile(pylogs_filepointer, "FP2: " + course_raw_info)
 
                         # refetch the course number after failure to load page
-                        pos1 = course_raw_info.find(needle1)
-                        pos2 = course_raw_info.find(needle2)
-                        course_number = course_raw_info[pos1 + len(needle1):pos2].strip()
-                        #print("course nmbr: |" +  course_number + "|")
+                        course_number, course_raw_info_rest = courseparser.parse_course_number(course_raw_info)
                         pylogs.write_to_logfile(pylogs_filepointer, "course_number: " + course_number)
 
-                        # (re)set language -> missing page load = missing (set) language change ?!
-                        self.language = self.get_language(driver)
-                        pylogs.write_to_logfile(pylogs_filepointer, "(re)set lang: " + self.language)
-                        extract_dict["page_fetch_lang"] = self.language
                     # course number valid -> continue
                     else:
                         break
 
-                #print("course nmbr: |" +  course_number + "|")
-                extract_dict["course number"] = course_number
-
-                course_raw_info = course_raw_info[pos2 + len(needle2):]
-                #print(course_raw_info)
-
-                needle3 = "<"
-                pos3 = course_raw_info.find(needle3)
-                course_title = course_raw_info[:pos3].strip()
-                #print("course title: |" + course_title + "|")
-                extract_dict["course title"] = course_title
-
-                pylogs.dump_to_log(acad_program_page_sources_path + '/' + course_number_URL + '|' + self.language + '|' + selected_semester + '|' + pylogs.get_time() + '|'+ course_title.replace("/", "") + '.txt', course_number_URL + '|' + self.language + '|' + selected_semester + '|' + pylogs.get_time() + '|'+ course_title + '\n\n\n' + course_raw_info)
-
-                if (course_title_download_ger == "" and self.language == "de"):
-                    course_title_download_ger = course_title
-
-                # quickinfo
-                needle4 = '<div id="subHeader" class="clearfix">'
-                pos4 = course_raw_info.find(needle4)
-                needle5 = "</div>"
-                pos5 = course_raw_info.find(needle5)
-                quickinfo = course_raw_info[pos4 + len(needle4):pos5].strip()
-                #print("quickinfo: |" + quickinfo + "|")
-
-                quickinfo_split = quickinfo.split(',')
-                extract_dict["semester"] = quickinfo_split[0].strip()
-                extract_dict["type"] = quickinfo_split[1].strip()
-                extract_dict["sws"] = quickinfo_split[2].strip()
-                extract_dict["ECTS"] = quickinfo_split[3].strip()
-                # quickinfo examples:
-                # 2014W, PR, 3.0h, 3.0EC, to be held in blocked form
-                # 2015W, UE, 1.0h, 2.0EC
-                # the last entry is optional
-                if len(quickinfo_split) > 4:
-                    extract_dict["add_info"] = quickinfo_split[4].strip()
-                else:
-                    extract_dict["add_info"]  = ""
-
-                # certain sections may be present multiple times in the page. Therefore, count
-                # how many times they are present and add the integer count to the dict index.
-                count_entry_dict = {}
-                count_entry_dict["Additional information"] = 0
-                count_entry_dict["Weitere Informationen"] = 0
-
-                # language dict so that en and de versions have the same index in
-                # the returned dict. This is essential for insertion into the database
-                index_dict_en = {
-                    "Properties": "Merkmale",
-                    "Learning outcomes": "Lernergebnisse",
-                    "Additional information": "Weitere Informationen",
-                    "Subject of course": "Inhalt der Lehrveranstaltung",
-                    "Teaching methods": "Methoden",
-                    "Mode of examination": "Prüfungsmodus",
-                    "Examination modalities": "Leistungsnachweis",
-                    "Course registration": "LVA-Anmeldung",
-                    "Literature": "Literatur",
-                    "Previous knowledge": "Vorkenntnisse",
-                    "Preceding courses": "Vorausgehende Lehrveranstaltungen",
-                    "Lecturers": "Vortragende Personen",
-                    "Language": "Sprache",
-                    "Institute": "Institut",
-                    "Group dates": "Gruppentermine",
-                    "Exams": "Prüfungen",
-                    "Group Registration": "Gruppen-Anmeldung",
-                    "Course dates": "LVA Termine",
-                    "Curricula": "Curricula",
-                    "Aim of course": "Ziele der Lehrveranstaltung"
-                }
-
-                # "<h2>-extraction" - each information is separated by an h2 element
-                needle6 = "<h2>"
-
-                i = 0
-
-                while course_raw_info.find(needle6) != -1:
-                    pos6 = course_raw_info.find(needle6)
-                    course_raw_info = course_raw_info[pos6 + len(needle6):]
-
-                    #print(str(i) + "########################################")
-
-                    if course_raw_info.find(needle6) != -1:
-                        pos7 = course_raw_info.find(needle6)
-                        extract_info = course_raw_info[:pos7]
-                    else:
-                        extract_info = course_raw_info
+                parse_jobs.append((selected_semester, page_language, course_raw_info, course_raw_info_rest))
 
-                    #header
-                    header_needle = "</h2>"
-                    header_pos = extract_info.find(header_needle)
-                    header_titletext = extract_info[:header_pos]
+        # the sections of all pages are parsed in the parser pool (see parsepool.py)
+        # while the page sources are archived
+        parser_pool = self.parser_pool if self.parser_pool is not None else parsepool.inline_pool
+        parse_results = parser_pool.map(courseparser.parse_course_record,
+            [(course_raw_info, page_language, academic_program_name)
+                for selected_semester, page_language, course_raw_info, course_raw_info_rest in parse_jobs])
 
-                    #print(header_titletext + ":")
+        for selected_semester, page_language, course_raw_info, course_raw_info_rest in parse_jobs:
+            course_title = courseparser.parse_course_title(course_raw_info_rest)
 
-                    extract_info = extract_info[header_pos + len(header_needle):]
+            # archive the page source (replay.py parses these files again without crawling)
+            pylogs.dump_to_log(acad_program_page_sources_path + '/' + course_number_URL + '|' + page_language + '|' + selected_semester + '|' + pylogs.get_time() + '|'+ course_title.replace("/", "") + '.txt', course_number_URL + '|' + page_language + '|' + selected_semester + '|' + pylogs.get_time() + '|'+ course_title + '\n\n\n' + course_raw_info_rest)
 
-                    # html cleanup
-                    extract_info = extract_info.replace(' class="encode"', '')
-                    extract_info = extract_info.replace(' class="bulletList"', '')
+            if (course_title_download_ger == "" and page_language == "de"):
+                course_title_download_ger = course_title
 
-                    if self.language == "en":
-                        #print("Searching for in dict: " + header_titletext)
-                        if header_titletext in index_dict_en:
-                            header_titletext = index_dict_en[header_titletext]
-                        else:
-                            warnings.warn("Error key is missing: " + header_titletext)
-
-                    if header_titletext == "Merkmale":
-                        extract_dict[header_titletext] = extract_info.replace('\n', '').strip()
-                        extract_info = ""
-
-                    if header_titletext == "Ziele der Lehrveranstaltung":
-                        extract_dict[header_titletext] = extract_info.replace('\n', '').strip()
-                        extract_info = ""
-
-                    if header_titletext == "Lernergebnisse":
-                        extract_dict[header_titletext] = extract_info.replace('\n', '').strip()
-                        extract_info = ""
-
-                    if header_titletext == "Inhalt der Lehrveranstaltung":
-                        extract_dict[header_titletext] = extract_info.replace('\n', '').strip()
-                        extract_info = ""
-
-                    if header_titletext == "Methoden":
-                        extract_dict[header_titletext] = extract_info.replace('\n', '').strip()
-                        extract_info = ""
-
-                    if header_titletext == "Prüfungsmodus":
-                        extract_dict[header_titletext] = extract_info.replace('\n', '').strip()
-                        extract_info = ""
-
-                    if header_titletext == "Leistungsnachweis":
-                        extract_dict[header_titletext] = extract_info.replace('\n', '').strip()
-                        extract_info = ""
-
-                    if header_titletext == "LVA-Anmeldung":
-                        extract_dict[header_titletext] = extract_info.replace('\n', '').strip()
-                        extract_info = ""
-
-                    if header_titletext == "Literatur":
-                        extract_dict[header_titletext] = extract_info.replace('\n', '').strip()
-                        extract_info = ""
-
-                    if header_titletext == "Vorkenntnisse":
-                        extract_dict[header_titletext] = extract_info.replace('\n', '').strip()
-                        extract_info = ""
-
-                    if header_titletext == "Vorausgehende Lehrveranstaltungen":
-                        extract_dict[header_titletext] = extract_info.replace('\n', '').strip()
-                        extract_info = ""
-
-                    if header_titletext == "Vortragende Personen":
-                        extract_dict[header_titletext] = self.extract_course_info_lecturers(extract_info)
-                        extract_info = ""
-
-                    add_info_flag = False
-                    if header_titletext == "Weitere Informationen":
-                        add_info_flag = True
-                        past_entries = count_entry_dict["Weitere Informationen"]
-
-                        extract_dict[header_titletext + str(past_entries)] = extract_info.replace('\n', '').strip()
-                        extract_info = ""
-                        count_entry_dict["Weitere Informationen"] += 1
-
-                    if header_titletext == "Sprache":
-                        cut_str = '<input type="hidden" name='
-                        cut_pos = extract_info.find(cut_str)
-                        extract_dict[header_titletext] = extract_info[:cut_pos]
-                        extract_info = ""
-
-                    if header_titletext == "Curricula":
-                        extract_dict[header_titletext] = self.extract_course_info_curricula(extract_info)
-                        extract_info = ""
-
-                    if header_titletext == "Institut":
-                        needle = '<li><a href='
-                        pos1 = extract_info.find(needle)
-                        extract_info = extract_info[pos1 + len(needle):]
-                        extract_info = extract_info[extract_info.find('>') + 1:]
-                        extract_dict[header_titletext] = extract_info[:extract_info.find('<')].replace('\n', '').strip()
-                        extract_info = ""
-
-                    if header_titletext == "Gruppentermine":
-                        #TODO: extract this information
-                        course_exams_info = ""
-                        #extract_info = ""
-
-                    if header_titletext == "Prüfungen":
-                        #TODO: extract this information
-                        course_exams_info = ""
-                        extract_info = ""
-
-                    if header_titletext == "Gruppen-Anmeldung":
-                        #TODO: extract this information
-                        course_exams_info = ""
-                        extract_info = ""
-
-                    if header_titletext == "LVA Termine":
-                        #TODO: extract this information
-                        course_coursedate_info = ""
-                        extract_info = ""
-
-                    if extract_info != "":
-                        warnings.warn("Error processing course description (unkown field) " + header_titletext)
-                        unknown_fields.append(header_titletext + "|" + course_number + "|" +
-                            self.language + "|" + academic_program_name + "|" + course_title
-                        )
+        for (selected_semester, page_language, course_raw_info, course_raw_info_rest), parse_result in zip(parse_jobs, parse_results):
+            # course number, course title, quickinfo and all sections of the page (see courseparser.py)
+            extract_dict, course_unknown_fields = parse_result
+            unknown_fields += course_unknown_fields
 
-                    i += 1
-
-                    if i > 100:
-                        break
-
-                # write both (extracted) semesters into the logfile
-                pylogs.write_to_logfile(pylogs_filepointer, 'semester1: ' + extract_dict["semester"] +
-                    ' | semester2: ' + selected_semester
-                )
-
-                return_info_dict[selected_semester + self.language] = extract_dict
+            # write both (extracted) semesters into the logfile
+            pylogs.write_to_logfile(pylogs_filepointer, 'semester1: ' + extract_dict["semester"] +
+                ' | semester2: ' + selected_semester
+            )
 
-            # get only a single semester -> break here if not False
-            if fetchSingleSem != False:
-                break
+            return_info_dict[selected_semester + page_language] = extract_dict
 
         # download files
         amount_downloads = self.download_course_files(
@@ -1407,6 +1370,10 @@ class crawler:
             #print("logged in")
 
         if self.logged_in == True and course_number_URL != "" and download_files == True:
+            # the download manager uses the session (cookies) of the logged in webdriver
+            if self.download_manager is not None:
+                self.download_manager.http_fetcher.set_cookies_from_driver(driver)
+
             #print("course number: " + course_number_URL)
             #print("course title: " + course_title)
             #print("academic program name: " + academic_program_name)
@@ -1415,12 +1382,11 @@ class crawler:
             for i in range(len(semester_list_key_dict)):
                 pylogs.write_to_logfile(pylogs_filepointer, 'processing: ' + semester_list_key_dict[i])
                 materials_download_link = semester_list[semester_list_key_dict[i]]
-                process_semester = semester_list[semester_list_key_dict[i]]
+                process_semester = semester_list_key_dict[i]
 
                 if materials_download_link != "":
                     #print("semester: " + semester_list_key_dict[i] + " -> " + "download url: " + materials_download_link)
 
-                    download_temp_path = self.download_path_root + self.download_path_temp
                     download_move_path_courseNr = (self.download_path_root +
                         academic_program_name + " - " + acad_prgm_studycode +
                         "/" + course_number_URL + " " + course_title.replace("/", "-") + "/"
@@ -1458,144 +1424,28 @@ class crawler:
                         warnings.warn("Error creating folders: " +
                         download_move_path_courseNr + " or " + download_move_path_semester)
                     else:
-                        # queue the files to download
-                        download_source_raw = self.fetch_page(driver, materials_download_link)
-                        i_amount_downloads = 0
-                        str_download_needle = 'onclick="'
-
-                        ## wait for downloads to finish (and move them afterwards):
-                        # count the downloads in the *temp/-folder. When All downloads are
-                        # finished (no file with *.part ending), move them to the final location.
-                        download_first_iteration = True
-                        downloads_finished = False
-                        i_downloads = 0
-                        time_download_start = time.time()
-                        time_abort = 1000
-
-                        while download_source_raw.find(str_download_needle) != -1:
-                            download_source_raw = download_source_raw[download_source_raw.find(str_download_needle) + len(str_download_needle):]
-                            download_source_extract = download_source_raw[:download_source_raw.find('ui-widget"')]
-
-                            if (download_source_extract.find("Download all files as ZIP-File") != -1 or
-                                download_source_extract.find("Alle Dateien als ZIP-Datei herunterladen") != -1):
-                                break
-
-                            download_link = download_source_extract[:download_source_extract.find('"')]
-                            driver.execute_script(download_link)
-                            time.sleep(random.uniform(10.0, 15.0))
-
-                            i_amount_downloads += 1
-
-                        #print("Downloads queued: " + str(i_amount_downloads))
-
-                        # fetch all files in the /temp folder and check, whether the file ending
-                        # is ".part". All these files are being downloaded at the moment.
-                        # Check the file size difference after a certain amount of time.
-                        while downloads_finished == False:
-                            #print("iteration number: " + str(i_downloads))
-
-                            amt_finished_dwnload = 0
-                            amt_not_finished_dwnload = 0
-                            #max_filesize_found = 0
-
-                            i = 0
-
-                            for entry in os.scandir(download_temp_path):
-                                #print("~~~~~~~~~~~~~~~~~~")
-                                if entry.is_file():
-                                    #print(str(i) + " -> " + entry.name)
-                                    if entry.name[-5:] == ".part":
-                                        #print("   path: " + download_temp_path + entry.name + " -> size: " + str(os.path.getsize(download_temp_path + entry.name)/1000 ))
-                                        amt_not_finished_dwnload += 1
-                                        #max_filesize_found = max(max_filesize_found, os.path.getsize(download_temp_path + entry.name))
-                                    else:
-                                        amt_finished_dwnload += 1
-                                #print("~~~~~~~~~~~~~~~~~~")
-                                #print("\n\n")
-                                i += 1
-
-                            if amt_not_finished_dwnload == 0:
-                                downloads_finished = True
-
-                            # download takes too long -> abort
-                            # TODO: if the download failed by any chance (browser download stall),
-                            # the file stops downloading and progress is made, the full time_abort is used.
-                            # Determine if all files are not downloading anymore (delta size check) and
-                            # abort/retry in that case.
-                            delta_t = time.time() - time_download_start
-                            if delta_t > time_abort:
-                                pylogs.write_to_logfile(f_failed_downloads, "time_abort_reached for: " +
-                                    course_title + "; academic program: " + academic_program_name +
-                                    "; semester: " + process_semester
-                                )
-                                break
-
-                            #print("max filesize: " + str(max_filesize_found/(1000*1000)))
-                            time.sleep(1)
-                            i_downloads += 1
-
-                        #print("amt_finished_dwnload: " + str(amt_finished_dwnload))
-                        #print("amt_not_finished_dwnload: " + str(amt_not_finished_dwnload))
-                        #print("downloads_finished: " + str(downloads_finished))
-                        #print("download time: " + str(delta_t))
-
-                        pylogs.write_to_logfile(pylogs_filepointer,
-                            'amt_finished_dwnload: ' + str(amt_finished_dwnload) +
-                            ' ; amt_not_finished_dwnload: ' + str(amt_not_finished_dwnload) +
-                            ' ; downloads_finished: ' + str(downloads_finished) +
-                            ' ; time: ' + str(delta_t) +
-                            ' ; downloads queued: ' + str(i_amount_downloads)
-                        )
-
-                        # in case all downloads are private (e.g. only available if enrolled),
-                        # remove the folder since it is only empty
-                        if i_amount_downloads == 0:
-                            if os.path.isdir(download_move_path_semester):
-                                os.rmdir(download_move_path_semester)
-
-                        # download successful -> move files to final location
-                        if downloads_finished == True and i_amount_downloads > 0 and amt_finished_dwnload > 0:
-                            if amt_finished_dwnload == i_amount_downloads:
-                                amount_downloads += i_amount_downloads
-                                for entry in os.scandir(download_temp_path):
-                                    if entry.is_file():
-                                        #print("move file: " + download_temp_path + entry.name + " into: " + download_move_path_semester + entry.name)
-                                        if os.path.isdir(download_move_path_semester):
-                                            os.rename(download_temp_path + entry.name, download_move_path_semester + entry.name)
-                                        #else:
-                                            #print("path: " + download_move_path_semester + " does not exists")
-                            else:
-                                pylogs.write_to_logfile(pylogs_filepointer,
-                                    'Amount of queued files and amount of downloaded files differs!'
-                                )
-                                pylogs.write_to_logfile(f_failed_downloads,
-                                    'Amount of queued files and amount of downloaded files differs: '+
-                                    course_title + "; academic program: " + academic_program_name +
-                                    "; semester: " + process_semester + "; downloads_finished: " +
-                                    str(downloads_finished) + "; i_amount_downloads: " +
-                                    str(i_amount_downloads) + "; amt_finished_dwnload: " +
-                                    str(amt_finished_dwnload)
-                                )
-
-                        # clear temp folder of files in any way so that future downloads
-                        # will not fail (this folder should be empty at every starting download)
-                        i_temp_dwnld_clear = 0
-                        for entry in os.scandir(download_temp_path):
-                            if entry.is_file():
-                                i_temp_dwnld_clear += 1
-                                #print("del: " + entry.name)
-                                os.remove(download_temp_path + entry.name)
-
-                        #print("deleted " + str(i_temp_dwnld_clear) + " files remaining in /tmp")
-
-                        i_empty_check = 0
-                        for entry in os.scandir(download_temp_path):
-                            if entry.is_file():
-                                i_empty_check += 1
-
-                        if i_empty_check > 0:
-                            pylogs.write_to_logfile(pylogs_filepointer,
-                                "Error: folder " + download_temp_path + "not empty"
+                        if self.download_manager is not None:
+                            amount_downloads += self.download_semester_http(
+                                materials_download_link,
+                                download_move_path_semester,
+                                course_number_URL,
+                                course_title,
+                                academic_program_name,
+                                process_semester,
+                                pylogs_filepointer,
+                                f_failed_downloads
+                            )
+                        else:
+                            amount_downloads += self.download_semester_browser(
+                                driver,
+                                materials_download_link,
+                                download_move_path_semester,
+                                course_number_URL,
+                                course_title,
+                                academic_program_name,
+                                process_semester,
+                                pylogs_filepointer,
+                                f_failed_downloads
                             )
 
         else:
@@ -1607,67 +1457,344 @@ class crawler:
 
         return amount_downloads
 
-    def extract_course_info_lecturers(self, extract_info):
-        cutstr1 = '<span>'
-        cutstr2 = '</span>'
+    def set_download_dir(self, driver, download_dir):
+        """Set the download folder of a running webdriver (Firefox).
+
+        The preference browser.download.dir can only be changed in the
+        chrome context (privileged JS). Returns False if this is not
+        possible (e.g., the browser does not allow the chrome context), in
+        which case the browser keeps downloading into the temp folder of
+        the instance.
+        """
+        try:
+            with driver.context(driver.CONTEXT_CHROME):
+                driver.execute_script(
+                    "Services.prefs.setStringPref('browser.download.dir', arguments[0]);",
+                    os.path.abspath(download_dir)
+                )
+        except Exception:
+            return False
+
+        return True
+
+    def cancel_browser_download(self, driver, file_path):
+        """Cancel a running download of the webdriver (Firefox).
+
+        The downloads of the browser are only accessible in the chrome
+        context (see self.set_download_dir(...)). The download is cancelled
+        and its partial file removed by the browser. Returns False if this is
+        not possible, i.e., the browser may still write to file_path.
+        """
+        try:
+            with driver.context(driver.CONTEXT_CHROME):
+                return driver.execute_async_script(
+                    "const [filePath, done] = arguments;"
+                    "const { Downloads } = ChromeUtils.importESModule ?"
+                    "    ChromeUtils.importESModule('resource://gre/modules/Downloads.sys.mjs') :"
+                    "    ChromeUtils.import('resource://gre/modules/Downloads.jsm');"
+                    "Downloads.getList(Downloads.ALL).then(async list => {"
+                    "    let cancelled = false;"
+                    "    for (const download of await list.getAll()) {"
+                    "        if (download.target.path === filePath && !download.succeeded) {"
+                    "            await download.finalize(true);"
+                    "            await list.remove(download);"
+                    "            cancelled = true;"
+                    "        }"
+                    "    }"
+                    "    done(cancelled);"
+                    "}).catch(() => done(false));",
+                    os.path.abspath(file_path)
+                ) == True
+        except Exception:
+            return False
+
+    def download_semester_browser(
+        self,
+        driver,
+        materials_download_link,
+        download_move_path_semester,
+        course_number_URL,
+        course_title,
+        academic_program_name,
+        process_semester,
+        pylogs_filepointer,
+        f_failed_downloads
+    ):
+        """Download the files of one semester using the webdriver.
+
+        The download actions of the documents page are executed in the
+        browser, which downloads into an own staging folder of this job
+        (temp/<job>/, see downloads.create_staging_dir(...)). Only this
+        folder is watched (dirwatch.DownloadWatcher): after every action, the
+        watcher waits until the file it starts appears (the file is mapped to
+        the action), the downloads themselves run in parallel. When all
+        downloads are finished, the files are moved to
+        download_move_path_semester. Stalled downloads are cancelled and
+        started again.
+        Returns the amount of downloaded files.
+        """
+        amount_downloads = 0
+        download_temp_path = self.download_path_root + self.download_path_temp
+
+        # own staging folder per job -> several jobs (courses, semesters) can
+        # download at the same time without mixing up their files
+        download_staging_path = downloads.create_staging_dir(download_temp_path,
+            course_title + "_" + process_semester)
+        staging_dir_set = self.set_download_dir(driver, download_staging_path)
+
+        if not staging_dir_set:
+            # the browser still downloads into the temp folder of this instance
+            # (one job at a time) -> use it as staging folder and start empty
+            downloads.discard_staging_dir(download_staging_path)
+            download_staging_path = download_temp_path
+            for entry in os.scandir(download_staging_path):
+                if entry.is_file():
+                    os.remove(download_staging_path + entry.name)
+
+            pylogs.write_to_logfile(pylogs_filepointer,
+                'download folder could not be set, staging in: ' + download_staging_path
+            )
 
-        extract_lecturer = []
+        # queue the files to download
+        download_source_raw = self.fetch_page(driver, materials_download_link)
+        i_amount_downloads = 0
+        str_download_needle = 'onclick="'
+        amt_finished_dwnload = 0
+        amt_not_finished_dwnload = 0
+
+        ## wait for downloads to finish (and move them afterwards):
+        # the watcher (dirwatch.DownloadWatcher) follows the files in the staging
+        # folder. When all downloads are finished (no file with *.part ending),
+        # move them to the final location.
+        downloads_finished = False
+        time_download_start = time.time()
+        time_abort = 1000
+
+        watcher = dirwatch.DownloadWatcher(download_staging_path, self.download_stall_timeout)
+        download_actions = {}		# {file name: download action}, to retry stalled downloads
+        stall_retries = {}			# {file name: amount of retries}
+        abandoned_files = []		# stalled downloads which could not be cancelled (removed at the end)
+
+        while download_source_raw.find(str_download_needle) != -1:
+            download_source_raw = download_source_raw[download_source_raw.find(str_download_needle) + len(str_download_needle):]
+            download_source_extract = download_source_raw[:download_source_raw.find('ui-widget"')]
+
+            if (download_source_extract.find("Download all files as ZIP-File") != -1 or
+                download_source_extract.find("Alle Dateien als ZIP-Datei herunterladen") != -1):
+                break
 
-        while extract_info.find(cutstr1) != -1:
-            cutpos1 = extract_info.find(cutstr1)
-            cutpos2 = extract_info.find(cutstr2)
+            download_link = download_source_extract[:download_source_extract.find('"')]
 
-            if cutpos2 > cutpos1:
-                extract_lecturer.append(extract_info[cutpos1 + len(cutstr1):cutpos2])
+            # every action is a request to TISS -> crawl delay in between
+            self.respect_crawl_delay(materials_download_link)
+            known_files = set(watcher.files)
+            driver.execute_script(download_link)
 
-            extract_info = extract_info[cutpos2 + len(cutstr2):]
+            # the file(s) appearing after the action belong to it (the download
+            # continues while the next action is executed)
+            new_files = watcher.wait_for_new(known_files, self.page_timeout)
+            if len(new_files) == 0:
+                pylogs.write_to_logfile(pylogs_filepointer, 'no download started by action: ' + download_link)
+            for file_name in new_files:
+                download_actions[file_name] = download_link
 
-        return extract_lecturer
+            i_amount_downloads += 1
 
-    def extract_course_info_curricula(self, extract_info):
-        curricula_return_list = []
-        needle = ''
+        #print("Downloads queued: " + str(i_amount_downloads))
 
-        if extract_info.find('semester=NEXT">') != -1:
-            needle = 'semester=NEXT">'
-        elif extract_info.find('semester=CURRENT">') != -1:
-            needle = 'semester=CURRENT">'
-        else:
-            warnings.warn("Error processing curricula")
+        # wait for changes in the staging folder. Stalled downloads (no growth
+        # for self.download_stall_timeout seconds) are started again right away
+        # (at most self.download_stall_retries times) instead of waiting for time_abort.
+        while downloads_finished == False:
+            watcher.update(1.0)
+            amt_finished_dwnload, amt_not_finished_dwnload = watcher.status()
 
-        if needle != "":
-            while extract_info.find(needle) != -1:
-                pos = extract_info.find(needle)
-                extract_info = extract_info[pos + len(needle):]
+            if amt_not_finished_dwnload == 0:
+                downloads_finished = True
+                break
 
-                if extract_info.find(needle) != -1:
-                    pos1 = extract_info.find(needle)
-                    extract_info_temp = extract_info[:pos1]
+            stalled_for_good = False
+            for file_name in watcher.stalled():
+                # finished (or gone) while waiting for the retry of another download
+                progress = watcher.files.get(file_name)
+                if progress is None or progress.finished:
+                    continue
+
+                if file_name in download_actions and stall_retries.get(file_name, 0) < self.download_stall_retries:
+                    retry = stall_retries.get(file_name, 0) + 1
+                    pylogs.write_to_logfile(pylogs_filepointer, 'download stalled, retry ' +
+                        str(retry) + ': ' + file_name + ' (' + str(progress.size) + ' bytes)'
+                    )
+
+                    # cancel the download in the browser before starting it again. If
+                    # this is not possible, its files are left alone (the browser may
+                    # still write them) and the file of the retry is followed instead
+                    if self.cancel_browser_download(driver, download_staging_path + file_name):
+                        watcher.forget(file_name)
+                    else:
+                        watcher.ignore(file_name)
+                        abandoned_files.append(file_name)
+
+                    known_files = set(watcher.files)
+                    driver.execute_script(download_actions[file_name])
+
+                    for retry_file_name in watcher.wait_for_new(known_files, self.page_timeout):
+                        download_actions[retry_file_name] = download_actions[file_name]
+                        stall_retries[retry_file_name] = retry
                 else:
-                    extract_info_temp = extract_info
+                    pylogs.write_to_logfile(f_failed_downloads, "download stalled: " + file_name +
+                        "; course: " + course_title + "; academic program: " +
+                        academic_program_name + "; semester: " + process_semester
+                    )
+                    stalled_for_good = True
+
+            # a download stalled for good -> do not wait for the others to time out
+            if stalled_for_good:
+                break
+
+            # download takes too long -> abort
+            if time.time() - time_download_start > time_abort:
+                pylogs.write_to_logfile(f_failed_downloads, "time_abort_reached for: " +
+                    course_title + "; academic program: " + academic_program_name +
+                    "; semester: " + process_semester
+                )
+                break
 
-                sempreconinfo_list = []
-                study_code = extract_info_temp[:extract_info_temp.find('</a>')]
-                curricula_return_list.append(study_code)
+        delta_t = time.time() - time_download_start
+        watcher.close()
+
+        # files of stalled downloads which have been started again are not moved
+        for file_name in abandoned_files:
+            for abandoned_path in (download_staging_path + file_name, download_staging_path + file_name + dirwatch.part_suffix):
+                if os.path.isfile(abandoned_path):
+                    os.remove(abandoned_path)
+
+        pylogs.write_to_logfile(pylogs_filepointer,
+            'amt_finished_dwnload: ' + str(amt_finished_dwnload) +
+            ' ; amt_not_finished_dwnload: ' + str(amt_not_finished_dwnload) +
+            ' ; downloads_finished: ' + str(downloads_finished) +
+            ' ; time: ' + str(delta_t) +
+            ' ; downloads queued: ' + str(i_amount_downloads)
+        )
+
+        # in case all downloads are private (e.g. only available if enrolled),
+        # remove the folder since it is only empty
+        if i_amount_downloads == 0:
+            if os.path.isdir(download_move_path_semester) and len(os.listdir(download_move_path_semester)) == 0:
+                os.rmdir(download_move_path_semester)
+
+        # download successful -> move files to final location
+        if downloads_finished == True and i_amount_downloads > 0 and amt_finished_dwnload > 0:
+            if amt_finished_dwnload == i_amount_downloads:
+                amount_downloads += i_amount_downloads
 
-                # Semester,	Precon.	and Info
-                for j in range(0, 3):
-                    needle2 = 'td role="gridcell">'
-                    pos2 = extract_info_temp.find(needle2)
-                    extract_info_temp = extract_info_temp[pos2 + len(needle2):]
-                    pos3 = extract_info_temp.find('</td>')
-                    extract_print = extract_info_temp[:pos3]
-                    # check steop condition
-                    steop_str1 = 'Studieneingangs- und Orientierungsphase'
+                if staging_dir_set:
+                    moved_files = downloads.commit_staging_dir(download_staging_path, download_move_path_semester)
+                else:
+                    moved_files = []
+                    for entry in os.scandir(download_staging_path):
+                        if entry.is_file():
+                            os.replace(download_staging_path + entry.name, download_move_path_semester + entry.name)
+                            moved_files.append(entry.name)
+
+                # deduplicate the downloaded files (hard links to the blobs)
+                if self.blob_store is not None:
+                    for file_name in moved_files:
+                        self.blob_store.add_file(download_move_path_semester + file_name,
+                            course_number_URL, process_semester)
+            else:
+                pylogs.write_to_logfile(pylogs_filepointer,
+                    'Amount of queued files and amount of downloaded files differs!'
+                )
+                pylogs.write_to_logfile(f_failed_downloads,
+                    'Amount of queued files and amount of downloaded files differs: '+
+                    course_title + "; academic program: " + academic_program_name +
+                    "; semester: " + process_semester + "; downloads_finished: " +
+                    str(downloads_finished) + "; i_amount_downloads: " +
+                    str(i_amount_downloads) + "; amt_finished_dwnload: " +
+                    str(amt_finished_dwnload)
+                )
 
-                    if j == 2 and (extract_print.find(steop_str1) != -1 or extract_print.find("STEOP") != -1):
-                        extract_print = "STEOP"
+        # remove the staging folder (and any remaining files) in any way;
+        # only the files of this job are affected
+        if staging_dir_set:
+            downloads.discard_staging_dir(download_staging_path)
+        else:
+            for entry in os.scandir(download_staging_path):
+                if entry.is_file():
+                    os.remove(download_staging_path + entry.name)
 
-                    #print(extract_print + "|", end = " ")
-                    sempreconinfo_list.append(extract_print)
+        return amount_downloads
 
-                curricula_return_list.append(sempreconinfo_list)
-        return curricula_return_list
+    def download_semester_http(
+        self,
+        materials_download_link,
+        download_move_path_semester,
+        course_number_URL,
+        course_title,
+        academic_program_name,
+        process_semester,
+        pylogs_filepointer,
+        f_failed_downloads
+    ):
+        """Download the files of one semester using the download manager.
+
+        The download actions of the documents page are resolved to direct
+        requests (see downloads.DownloadManager) which stream the files
+        into download_move_path_semester (concurrently). Returns the amount
+        of downloaded files.
+        """
+        time_download_start = time.time()
+        download_requests, amt_unresolved = self.download_manager.download_requests(materials_download_link)
+
+        job_name = course_title + "|" + process_semester
+        download_results = self.download_manager.download_all(download_requests,
+            download_move_path_semester, job_name, course_number_URL, process_semester)
+
+        amt_finished_dwnload = sum(1 for result in download_results if result.ok())
+        amt_deduplicated = sum(1 for result in download_results if result.deduplicated)
+        amt_skipped = sum(1 for result in download_results if result.skipped)
+        amt_resumed = sum(1 for result in download_results if result.resumed > 0)
+
+        pylogs.write_to_logfile(pylogs_filepointer,
+            'amt_finished_dwnload: ' + str(amt_finished_dwnload) +
+            ' ; amt_deduplicated: ' + str(amt_deduplicated) +
+            ' ; amt_skipped: ' + str(amt_skipped) +
+            ' ; amt_resumed: ' + str(amt_resumed) +
+            ' ; amt_failed_dwnload: ' + str(len(download_results) - amt_finished_dwnload) +
+            ' ; amt_unresolved_actions: ' + str(amt_unresolved) +
+            ' ; time: ' + str(time.time() - time_download_start) +
+            ' ; downloads queued: ' + str(len(download_requests))
+        )
+
+        for result in download_results:
+            if not result.ok():
+                pylogs.write_to_logfile(f_failed_downloads, 'download failed: ' +
+                    course_title + "; academic program: " + academic_program_name +
+                    "; semester: " + process_semester + "; error: " + result.error
+                )
+
+        if amt_unresolved > 0:
+            pylogs.write_to_logfile(f_failed_downloads, 'unresolved download actions (' +
+                str(amt_unresolved) + '): ' + course_title + "; academic program: " +
+                academic_program_name + "; semester: " + process_semester
+            )
+
+        # in case all downloads are private (e.g. only available if enrolled),
+        # remove the folder since it is only empty
+        if len(download_requests) == 0 and os.path.isdir(download_move_path_semester):
+            if len(os.listdir(download_move_path_semester)) == 0:
+                os.rmdir(download_move_path_semester)
+
+        return amt_finished_dwnload
+
+    def extract_course_info_lecturers(self, extract_info):
+        '''see courseparser.parse_lecturers(...)'''
+        return courseparser.parse_lecturers(extract_info)
+
+    def extract_course_info_curricula(self, extract_info):
+        '''see courseparser.parse_curricula(...)'''
+        return courseparser.parse_curricula(extract_info)
 
     def close_driver(self, driver, pylogs_filepointer):
         '''Close the webdriver properly.'''
@@ -1689,7 +1816,7 @@ class crawler:
         - A list of URLs found within the specified range in the table.
         """
         driver.get(URL)
-        time.sleep(self.sleeptime_fetchpage)  # Ensure page loads fully
+        readiness.wait_for_content(driver, self.page_timeout)  # Ensure page loads fully
 
         # Identify start and end cells by course name
         start_course = "FDS/FD - Fundamentals of Data Science - Foundations"
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+from collections import deque
+import threading
+
+"""
+Adaptive crawl delay (AIMD: additive decrease, multiplicative increase).
+
+A fixed crawl delay has to be chosen for the worst case (TISS under load).
+Instead, the delay is adapted to the observed behaviour of TISS:
+1) every successful and fast request decreases the delay by a fixed step
+   (as long as the recent error rate is low)
+2) every error (exception, JS error page "Something went seriously wrong",
+   missing content, etc.) multiplies the delay
+3) slow responses (latency above latency_threshold) increase the delay
+   slightly
+
+The delay always stays within [min_delay, max_delay].
+"""
+
+class AdaptiveCrawlDelay:
+    """Crawl delay controller driven by the observed latency and errors.
+
+    The controller is thread-safe and may be shared between several
+    crawler instances (e.g., the slots of a driver pool).
+    """
+    def __init__(
+        self,
+        initial_delay,
+        min_delay = 1.0,
+        max_delay = 480.0,
+        decrease_step = 0.25,
+        backoff_factor = 2.0,
+        slow_factor = 1.25,
+        latency_threshold = 5.0,
+        max_error_rate = 0.05,
+        window = 50
+    ):
+        """Set the parameters of the controller.
+
+        decrease_step:		seconds the delay decreases per healthy request
+        backoff_factor:		factor the delay is multiplied with per error
+        slow_factor:		factor the delay is multiplied with per slow request
+        latency_threshold:	requests taking longer (in seconds) count as slow
+        max_error_rate:		the delay only decreases if the error rate of the
+                            last 'window' requests is below this value
+        """
+        self.delay = min(max(initial_delay, min_delay), max_delay)
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.decrease_step = decrease_step
+        self.backoff_factor = backoff_factor
+        self.slow_factor = slow_factor
+        self.latency_threshold = latency_threshold
+        self.max_error_rate = max_error_rate
+
+        self.recent_errors = deque(maxlen = window)	# True/False for the last requests
+        self.latency_ewma = None							# moving average of the latency (successful requests)
+        self.consecutive_errors = 0
+        self.amt_requests = 0
+        self.amt_errors = 0
+        self.lock = threading.Lock()
+
+    def error_rate(self):
+        '''error rate of the last requests (call with self.lock held)'''
+        if len(self.recent_errors) == 0:
+            return 0.0
+
+        return sum(self.recent_errors) / len(self.recent_errors)
+
+    def record(self, latency, error = False):
+        """Report the outcome of a single request and adapt the delay.
+
+        latency is the time (in seconds) the request took, error marks
+        failed requests (exceptions, error pages, etc.). Returns the new delay.
+        """
+        with self.lock:
+            self.amt_requests += 1
+            self.recent_errors.append(error)
+
+            if error:
+                self.amt_errors += 1
+                self.consecutive_errors += 1
+                self.delay = self.delay * self.backoff_factor
+            else:
+                self.consecutive_errors = 0
+
+                if self.latency_ewma is None:
+                    self.latency_ewma = latency
+                else:
+                    self.latency_ewma = 0.8 * self.latency_ewma + 0.2 * latency
+
+                if latency > self.latency_threshold:
+                    self.delay = self.delay * self.slow_factor
+                elif self.error_rate() <= self.max_error_rate:
+                    self.delay = self.delay - self.decrease_step
+
+            self.delay = min(max(self.delay, self.min_delay), self.max_delay)
+
+            return self.delay
+
+    def state(self):
+        '''returns the current state of the controller (e.g., for logging)'''
+        with self.lock:
+            return {
+                "delay": round(self.delay, 3),
+                "latency_ewma": None if self.latency_ewma is None else round(self.latency_ewma, 3),
+                "error_rate": round(self.error_rate(), 3),
+                "consecutive_errors": self.consecutive_errors,
+                "requests": self.amt_requests,
+                "errors": self.amt_errors,
+            }
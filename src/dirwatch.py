@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+import ctypes
+import ctypes.util
+from dataclasses import dataclass
+import os
+import select
+import sys
+import time
+
+"""
+Watching a download folder of the browser (completion, progress, stalls).
+
+Firefox downloads a file <name> as <name>.part (and creates an empty <name>
+right away). When the download is complete, <name>.part is renamed to
+<name>. A download is therefore finished when its .part file is gone, but
+a stalled download never gets there: its .part file just stops growing.
+
+DownloadWatcher keeps the size of every file in a folder and the time of
+its last growth. Instead of rescanning the folder every second, it sleeps
+until the folder changes (inotify on Linux, via ctypes) and only then
+scans the folder again. Without inotify (other systems, no more watches
+available), the folder is polled.
+
+usage:
+watcher = DownloadWatcher(folder, stall_timeout = 60)
+while not watcher.is_complete(amt_expected):
+    watcher.update(1.0)				# wait for changes (at most 1 s)
+    for name in watcher.stalled():	# no growth for 60 s
+        ...							# retry the download of name
+watcher.close()
+"""
+
+part_suffix = ".part"
+
+# Firefox creates the empty <name> shortly before <name>.part -> an empty file
+# only counts as finished download after this time (in seconds)
+empty_file_settle_time = 2.0
+
+# inotify (see man 7 inotify)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+watch_mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+
+def inotify_libc():
+    '''libc with the inotify functions (None if not available)'''
+    if not sys.platform.startswith("linux"):
+        return None
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno = True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+    except (OSError, AttributeError):
+        return None
+
+    return libc
+
+
+@dataclass
+class FileProgress:
+    """Download state of a single file (name without .part)."""
+    name: str
+    size: int = 0						# current size in bytes
+    first_seen: float = 0.0			# time the file appeared
+    last_growth: float = 0.0			# last time the size changed
+    finished: bool = False			# no .part file (anymore)
+
+
+class DownloadWatcher:
+    """Watch a download folder for completion, progress and stalls.
+
+    stall_timeout:	seconds without growth after which a download counts as stalled
+    min_interval:	minimum time between two scans (writes cause many events)
+    """
+    def __init__(self, path, stall_timeout = 60.0, min_interval = 0.25):
+        self.path = path
+        self.stall_timeout = stall_timeout
+        self.min_interval = min_interval
+        self.files = {}				# {name: FileProgress}
+        self.ignored = set()			# names which are not followed anymore (see ignore(...))
+        self.last_scan = 0.0
+        self.inotify_fd = None
+
+        libc = inotify_libc()
+        if libc is not None:
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0:
+                if libc.inotify_add_watch(fd, os.fsencode(path), watch_mask) >= 0:
+                    self.inotify_fd = fd
+                else:
+                    os.close(fd)
+
+        self.scan()
+
+    def uses_inotify(self):
+        return self.inotify_fd is not None
+
+    def scan(self):
+        '''read the sizes of all files in the folder and update their progress'''
+        now = time.monotonic()
+        self.last_scan = now
+        sizes = {}
+        parts = set()
+
+        for entry in os.scandir(self.path):
+            try:
+                if not entry.is_file():
+                    continue
+                size = entry.stat().st_size
+            except FileNotFoundError:
+                # renamed/removed in the meantime (e.g., .part -> final name)
+                continue
+
+            if entry.name.endswith(part_suffix):
+                name = entry.name[:-len(part_suffix)]
+                parts.add(name)
+                sizes[name] = size
+            else:
+                sizes[entry.name] = max(size, sizes.get(entry.name, 0))
+
+        for name, size in sizes.items():
+            if name in self.ignored:
+                continue
+
+            progress = self.files.get(name)
+            if progress is None:
+                progress = self.files[name] = FileProgress(name, size, now, now)
+            elif size != progress.size:
+                progress.size = size
+                progress.last_growth = now
+
+            progress.finished = name not in parts and (progress.size > 0 or
+                now - progress.first_seen > empty_file_settle_time)
+
+        # files which have been removed
+        for name in [name for name in self.files if name not in sizes]:
+            del self.files[name]
+
+    def update(self, timeout = 1.0):
+        """Wait for changes in the folder (at most timeout seconds) and scan it.
+
+        With inotify, this returns as soon as the folder has changed (but
+        not more often than every min_interval seconds), else it sleeps for
+        timeout seconds.
+        """
+        if self.inotify_fd is None:
+            if timeout > 0:
+                time.sleep(timeout)
+        else:
+            readable, _, _ = select.select([self.inotify_fd], [], [], timeout)
+            if readable:
+                # the events only wake the watcher up, the state is read by scan()
+                try:
+                    while os.read(self.inotify_fd, 64 * 1024):
+                        pass
+                except BlockingIOError:
+                    pass
+
+                remaining = self.min_interval - (time.monotonic() - self.last_scan)
+                if remaining > 0:
+                    time.sleep(remaining)
+
+        self.scan()
+
+    def status(self):
+        '''amount of finished files and amount of files which are still downloading'''
+        amt_finished = sum(1 for progress in self.files.values() if progress.finished)
+
+        return amt_finished, len(self.files) - amt_finished
+
+    def is_complete(self, amt_expected = 0):
+        '''True, if no file is downloading and at least amt_expected files are finished'''
+        amt_finished, amt_not_finished = self.status()
+
+        return amt_not_finished == 0 and amt_finished >= amt_expected
+
+    def stalled(self):
+        '''names of the downloads which have not grown for stall_timeout seconds'''
+        now = time.monotonic()
+
+        return [progress.name for progress in self.files.values()
+            if not progress.finished and now - progress.last_growth > self.stall_timeout]
+
+    def wait_for_new(self, known_names, timeout):
+        '''wait (at most timeout seconds) for files which are not in known_names, returns their names'''
+        time_end = time.monotonic() + timeout
+
+        while True:
+            new_names = [name for name in self.files if name not in known_names]
+            remaining = time_end - time.monotonic()
+            if new_names or remaining <= 0:
+                return new_names
+
+            self.update(min(remaining, 1.0))
+
+    def progress(self):
+        '''{name: bytes} of all files in the folder'''
+        return {name: progress.size for name, progress in self.files.items()}
+
+    def forget(self, name):
+        '''remove a download (and its partial file) to retry it'''
+        for file_name in (name, name + part_suffix):
+            try:
+                os.remove(os.path.join(self.path, file_name))
+            except FileNotFoundError:
+                pass
+
+        self.files.pop(name, None)
+
+    def ignore(self, name):
+        '''stop following a download without touching its files (e.g., still written by the browser)'''
+        self.ignored.add(name)
+        self.files.pop(name, None)
+
+    def close(self):
+        if self.inotify_fd is not None:
+            os.close(self.inotify_fd)
+            self.inotify_fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
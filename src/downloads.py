@@ -0,0 +1,657 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+from concurrent.futures import ThreadPoolExecutor
+import copy
+from dataclasses import dataclass, field
+import html
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from urllib.parse import urljoin, urlsplit, unquote
+
+import requests
+
+try:
+    import ratelimit
+except ModuleNotFoundError:
+    from src import ratelimit
+
+"""
+Download manager for course materials (no browser).
+
+The documents page of a course (education/course/documents.xhtml) offers
+each file via a JSF action, e.g.,
+onclick="PrimeFaces.addSubmitParam('j_id_4b',{'j_id_4b:j_id_4g:0:j_id_4k':'j_id_4b:j_id_4g:0:j_id_4k'}).submit('j_id_4b');return false;"
+i.e., clicking the link submits the form j_id_4b (with its hidden fields,
+e.g., javax.faces.ViewState) together with the given parameters. The
+response of this POST request is the file.
+
+Instead of executing these actions in the browser and waiting for the
+browser to finish the downloads, the actions are resolved to the POST
+requests and performed with the session cookies of the (logged in)
+webdriver. Files are streamed directly into their final folder (as
+<name>.part, renamed when complete) with
+1) several downloads at once (at most per_host_limit per host)
+2) a cap on the transferred bytes per second (all downloads together)
+3) a progress record (JSON line) per file
+4) optional deduplication (see blobstore.py): files already stored with the
+   same name and size in the same course are linked instead of being
+   transferred again
+5) resumable downloads: partial files (<name>.part) are kept when a
+   download breaks off and are resumed with a Range request (again or in the
+   next run) instead of being downloaded from the start
+6) a manifest of the completed downloads (JSON lines), i.e., a rerun skips
+   all files which have already been downloaded completely
+
+Downloads by the browser (crawler.download_semester_browser(...)) are
+staged per job: every job (course, semester) gets its own folder below the
+temp folder of the webdriver (see create_staging_dir(...)). Completion is
+only checked within this folder and on success its files are moved into
+the final folder with os.replace (atomic), i.e., jobs never see or remove
+the files of other jobs.
+"""
+
+# marker of the download actions in the documents page (see crawler.download_course_files(...))
+download_action_needle = 'onclick="'
+zip_download_needles = ["Download all files as ZIP-File", "Alle Dateien als ZIP-Datei herunterladen"]
+
+re_form_tag = re.compile(r"<form\b[^>]*>", re.IGNORECASE)
+re_input_tag = re.compile(r"<input\b[^>]*>", re.IGNORECASE)
+re_tag_attribute = re.compile(r'([\w:.-]+)\s*=\s*"([^"]*)"')
+
+# form and parameters of a JSF action (PrimeFaces and Mojarra)
+re_submit_params = re.compile(
+    r"(?:addSubmitParam\(\s*'([^']+)'\s*,|jsfcljs\(\s*document\.getElementById\(\s*'([^']+)'\s*\)\s*,)\s*\{([^}]*)\}"
+)
+re_param_pair = re.compile(r"'([^']*)'\s*:\s*'([^']*)'")
+
+# Content-Range: bytes <first>-<last>/<total or *>
+re_content_range = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+# errors after which a download is resumed (connection lost, stalled, cut off)
+resumable_errors = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+# file name of a download (Content-Disposition: attachment; filename="...")
+re_filename_star = re.compile(r"filename\*\s*=\s*[^']*'[^']*'([^;]+)", re.IGNORECASE)
+re_filename = re.compile(r'filename\s*=\s*"?([^";]+)"?', re.IGNORECASE)
+
+
+re_unsafe_name_chars = re.compile(r"[^\w.-]+")
+
+
+def create_staging_dir(parent_dir, job_name):
+    '''create an own (empty) staging folder for a download job below parent_dir'''
+    os.makedirs(parent_dir, exist_ok = True)
+    prefix = re_unsafe_name_chars.sub("_", job_name)[:40] + "_"
+
+    return tempfile.mkdtemp(prefix = prefix, dir = parent_dir) + "/"
+
+
+def commit_staging_dir(staging_dir, target_dir):
+    """Move the files of a (finished) staging folder into target_dir.
+
+    If target_dir is empty (or does not exist), the staging folder is
+    renamed to target_dir at once, else the files are moved one by one
+    (os.replace, existing files are overwritten). Returns the moved file names.
+    """
+    file_names = [entry.name for entry in os.scandir(staging_dir) if entry.is_file()]
+    staging_dir = os.path.normpath(staging_dir)
+    target_dir = os.path.normpath(target_dir)
+
+    try:
+        if os.path.isdir(target_dir) and len(os.listdir(target_dir)) == 0:
+            os.rmdir(target_dir)
+        if not os.path.exists(target_dir):
+            os.replace(staging_dir, target_dir)
+            return file_names
+    except OSError:
+        os.makedirs(target_dir, exist_ok = True)
+
+    for file_name in file_names:
+        os.replace(os.path.join(staging_dir, file_name), os.path.join(target_dir, file_name))
+
+    discard_staging_dir(staging_dir)
+
+    return file_names
+
+
+def discard_staging_dir(staging_dir):
+    '''remove a staging folder with all remaining (partial) files'''
+    shutil.rmtree(staging_dir, ignore_errors = True)
+
+
+def tag_attributes(tag):
+    '''attributes of a single HTML tag, e.g., <form id="x" ...> -> {"id": "x", ...}'''
+    return {name.lower(): html.unescape(value) for name, value in re_tag_attribute.findall(tag)}
+
+
+def parse_forms(page_source):
+    """Extract all forms of a page with their action and hidden fields.
+
+    Returns a dict with indices being the ids of the forms and the data a
+    dict {"action": URL, "fields": {name: value}}.
+    """
+    forms = {}
+
+    for form_match in re_form_tag.finditer(page_source):
+        attributes = tag_attributes(form_match.group(0))
+        form_end = page_source.find("</form>", form_match.end())
+        if form_end == -1:
+            form_end = len(page_source)
+
+        fields = {}
+        for input_tag in re_input_tag.findall(page_source, form_match.end(), form_end):
+            input_attributes = tag_attributes(input_tag)
+            if input_attributes.get("type", "").lower() == "hidden" and "name" in input_attributes:
+                fields[input_attributes["name"]] = input_attributes.get("value", "")
+
+        form_id = attributes.get("id", attributes.get("name", ""))
+        forms[form_id] = {"action": attributes.get("action", ""), "fields": fields}
+
+    return forms
+
+
+def parse_download_actions(page_source):
+    """Extract the download actions (onclick JS) of a documents page.
+
+    The same rules as in crawler.download_course_files(...) apply: all
+    onclick attributes up to the button to download all files as ZIP file.
+    """
+    actions = []
+
+    while page_source.find(download_action_needle) != -1:
+        page_source = page_source[page_source.find(download_action_needle) + len(download_action_needle):]
+        action_extract = page_source[:page_source.find('ui-widget"')]
+
+        if any(action_extract.find(needle) != -1 for needle in zip_download_needles):
+            break
+
+        actions.append(html.unescape(action_extract[:action_extract.find('"')]))
+
+    return actions
+
+
+@dataclass
+class DownloadRequest:
+    """A single file to download (data = None -> GET request).
+
+    key identifies the download across sessions (see CompletedDownloads),
+    i.e., it does not contain session dependent fields like
+    javax.faces.ViewState.
+    """
+    url: str
+    data: dict = None
+    name: str = ""
+    key: str = ""
+
+    def __post_init__(self):
+        if self.key == "":
+            self.key = self.url
+
+
+def resolve_download_action(action, forms, page_url):
+    """Resolve a JSF action (onclick JS) to the request it submits.
+
+    Returns a DownloadRequest (POST to the action of the form with its
+    hidden fields and the parameters of the action) or None if the action
+    is no form submit.
+    """
+    match = re_submit_params.search(action)
+    if match is None:
+        return None
+
+    form_id = match.group(1) or match.group(2)
+    form = forms.get(form_id)
+    if form is None:
+        return None
+
+    action_params = re_param_pair.findall(match.group(3))
+    data = dict(form["fields"])
+    data.update(action_params)
+    # JSF expects the submit marker of the form
+    data.setdefault(form_id + "_SUBMIT", "1")
+
+    # the documents page (course, semester) and the parameters of the action
+    key = page_url + "|" + json.dumps(sorted(action_params))
+
+    return DownloadRequest(urljoin(page_url, form["action"] or page_url), data, key = key)
+
+
+def response_filename(response, default_name):
+    '''file name of a download (Content-Disposition or the last part of the URL)'''
+    content_disposition = response.headers.get("Content-Disposition", "")
+
+    match = re_filename_star.search(content_disposition)
+    if match is not None:
+        name = unquote(match.group(1).strip())
+    else:
+        match = re_filename.search(content_disposition)
+        if match is not None:
+            # requests decodes headers as latin-1, TISS sends UTF-8 names
+            name = match.group(1).strip()
+            try:
+                name = name.encode("latin-1").decode("utf-8")
+            except UnicodeError:
+                pass
+        else:
+            name = unquote(os.path.basename(urlsplit(response.url).path)) or default_name
+
+    # no folders in file names
+    name = name.replace("/", "-").replace("\\", "-").strip()
+
+    return name if name not in ("", ".", "..") else default_name
+
+
+@dataclass
+class DownloadResult:
+    """Outcome of a single download (error = "" -> success)."""
+    request: DownloadRequest
+    file_path: str = ""
+    size: int = 0
+    duration: float = 0.0
+    error: str = ""
+    headers: dict = field(default_factory = dict)
+    deduplicated: bool = False
+    resumed: int = 0					# bytes which have not been transferred again (resumed download)
+    skipped: bool = False				# already downloaded completely (see CompletedDownloads)
+
+    def ok(self):
+        return self.error == ""
+
+
+def content_range(response):
+    '''first byte and total size (None if unknown) of a partial response (206)'''
+    match = re_content_range.search(response.headers.get("Content-Range", ""))
+    if match is None:
+        return None, None
+
+    total = int(match.group(3)) if match.group(3) != "*" else None
+
+    return int(match.group(1)), total
+
+
+class CompletedDownloads:
+    """Persistent manifest of the completed downloads (JSON lines).
+
+    Each record maps the key of a DownloadRequest to the downloaded file
+    and its size. A download counts as completed as long as the file still
+    exists with this size; delete the manifest to download everything again.
+
+    The key of a JSF download only identifies the row of the file list (the
+    parameters of the action are positional row ids), i.e., after the list
+    has changed, the same key may submit another file. A record therefore
+    only matches if the file name (Content-Disposition) and size of the
+    response are the ones of the recorded file (see lookup(...)).
+    """
+    def __init__(self, manifest_path):
+        self.manifest_path = manifest_path
+        self.records = {}
+        self.lock = threading.Lock()
+
+        if os.path.isfile(manifest_path):
+            with open(manifest_path, encoding = "utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+
+                    self.records[record["key"]] = record
+
+        self.f_manifest = open(manifest_path, "a", encoding = "utf-8")
+
+    def lookup(self, key, file_path, content_length = ""):
+        """Record of a completed download of key into file_path (None if there is none).
+
+        file_path is the path the response would be written to (name of the
+        Content-Disposition), content_length its Content-Length (if known).
+        """
+        with self.lock:
+            record = self.records.get(key)
+
+        if record is None or record["file"] != os.path.normpath(file_path):
+            return None
+
+        if content_length.isdigit() and int(content_length) != record["size"]:
+            return None
+
+        if not os.path.isfile(record["file"]) or os.path.getsize(record["file"]) != record["size"]:
+            return None
+
+        return record
+
+    def add(self, result):
+        record = {
+            "time": time.strftime("%Y-%m-%d_%H:%M:%S"),
+            "key": result.request.key,
+            "file": os.path.normpath(result.file_path),
+            "size": result.size,
+        }
+
+        with self.lock:
+            self.records[record["key"]] = record
+            self.f_manifest.write(json.dumps(record, ensure_ascii = False) + "\n")
+            self.f_manifest.flush()
+
+    def close(self):
+        self.f_manifest.close()
+
+
+class DownloadManager:
+    """Concurrent downloads with the session of an httpfetch.HttpFetcher.
+
+    The session (cookies) is the one of the fetcher, i.e., copy the cookies
+    of the logged in webdriver into it first (HttpFetcher.set_cookies_from_driver(...)).
+    """
+    def __init__(
+        self,
+        http_fetcher,
+        per_host_limit = 2,
+        bytes_per_second = 0,
+        rate_limiter = None,
+        progress_path = "",
+        chunk_size = 64 * 1024,
+        timeout = 120,
+        blob_store = None,
+        manifest_path = "",
+        resume_attempts = 3
+    ):
+        """Set up the download threads.
+
+        per_host_limit:		maximum amount of concurrent downloads per host
+        bytes_per_second:	cap of the transferred bytes per second (0 -> no cap)
+        rate_limiter:		shared ratelimit.HostRateLimiter (each download is a request)
+        progress_path:		file for the progress records (one JSON line per file)
+        blob_store:		blobstore.BlobStore for deduplication (None -> plain files)
+        manifest_path:		manifest of the completed downloads (see CompletedDownloads, "" -> none)
+        resume_attempts:	how often a broken off download is resumed within one attempt
+        """
+        self.http_fetcher = http_fetcher
+        self.per_host_limit = per_host_limit
+        self.rate_limiter = rate_limiter
+        self.chunk_size = chunk_size
+        self.timeout = timeout
+        self.blob_store = blob_store
+        self.resume_attempts = resume_attempts
+        self.completed_downloads = CompletedDownloads(manifest_path) if manifest_path else None
+
+        self.byte_bucket = None
+        if bytes_per_second > 0:
+            self.byte_bucket = ratelimit.TokenBucket(bytes_per_second, max(bytes_per_second, chunk_size))
+
+        self.host_semaphores = {}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers = max(1, per_host_limit) * 4)
+
+        self.f_progress = open(progress_path, "a", encoding = "utf-8") if progress_path else None
+
+    def with_fetcher(self, http_fetcher):
+        """A manager with its own session (http_fetcher), e.g., for another login.
+
+        The threads, limits (per host, bytes per second) and the progress
+        file are shared with this manager (only close() this manager).
+        """
+        manager = copy.copy(self)
+        manager.http_fetcher = http_fetcher
+
+        return manager
+
+    def host_semaphore(self, url):
+        host = urlsplit(url).hostname or ""
+
+        with self.lock:
+            if host not in self.host_semaphores:
+                self.host_semaphores[host] = threading.BoundedSemaphore(self.per_host_limit)
+
+            return self.host_semaphores[host]
+
+    def record_progress(self, job_name, result, status):
+        '''write a progress record (one JSON line) for a file'''
+        if self.f_progress is None:
+            return
+
+        record = {
+            "time": time.strftime("%Y-%m-%d_%H:%M:%S"),
+            "job": job_name,
+            "url": result.request.url,
+            "file": result.file_path,
+            "bytes": result.size,
+            "resumed": result.resumed,
+            "duration": round(result.duration, 3),
+            "status": status,
+            "error": result.error,
+        }
+
+        with self.lock:
+            self.f_progress.write(json.dumps(record, ensure_ascii = False) + "\n")
+            self.f_progress.flush()
+
+    def fetch_documents_page(self, documents_url):
+        '''fetch the documents page of a course with the session of the manager'''
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(documents_url)
+
+        return self.http_fetcher.fetch(documents_url)
+
+    def download_requests(self, documents_url):
+        """Fetch a documents page and resolve all its download actions.
+
+        Returns the list of DownloadRequest and the amount of actions which
+        could not be resolved.
+        """
+        fetch_result = self.fetch_documents_page(documents_url)
+        forms = parse_forms(fetch_result.html)
+
+        pending = []
+        amt_unresolved = 0
+        for action in parse_download_actions(fetch_result.content or fetch_result.html):
+            request = resolve_download_action(action, forms, fetch_result.url)
+
+            if request is None:
+                amt_unresolved += 1
+            else:
+                request.name = "download_" + str(len(pending))
+                pending.append(request)
+
+        return pending, amt_unresolved
+
+    def open_response(self, request, range_start = 0, first_response = None):
+        """Send the request of a download (streamed).
+
+        With range_start > 0 only the rest of the file is requested (Range).
+        If the first response of this download (first_response) has been
+        redirected to the file, the final URL is requested (GET) and its
+        validator (ETag/Last-Modified) is sent as If-Range, i.e., the server
+        sends the complete file again if it has changed in the meantime.
+        """
+        session = self.http_fetcher.session
+        url = request.url
+        data = request.data
+        headers = {}
+
+        if range_start > 0:
+            headers["Range"] = "bytes=" + str(range_start) + "-"
+
+            if first_response is not None:
+                validator = first_response.headers.get("ETag", first_response.headers.get("Last-Modified", ""))
+                if validator != "":
+                    headers["If-Range"] = validator
+
+                if len(first_response.history) > 0:
+                    url = first_response.url
+                    data = None
+
+        if data is None:
+            return session.get(url, headers = headers, stream = True, timeout = self.timeout)
+
+        return session.post(url, data = data, headers = headers, stream = True, timeout = self.timeout)
+
+    def transfer(self, request, part_path, response, result):
+        """Stream a download into part_path and resume it if it breaks off.
+
+        An existing part_path (e.g., of a previous run) is resumed with a
+        Range request. If the server ignores the range (200 instead of 206),
+        the file is downloaded from the start. After a connection error,
+        the download is resumed up to self.resume_attempts times.
+        """
+        first_response = response
+        attempt = 0
+
+        while True:
+            offset = os.path.getsize(part_path) if os.path.isfile(part_path) else 0
+
+            try:
+                if response is None or offset > 0:
+                    if response is not None:
+                        response.close()
+
+                    if self.rate_limiter is not None:
+                        self.rate_limiter.acquire(request.url)
+
+                    response = self.open_response(request, offset, first_response)
+
+                with response:
+                    response.raise_for_status()
+
+                    range_start, expected_size = content_range(response)
+                    if response.status_code == 206 and range_start == offset:
+                        mode = "ab"
+                        result.resumed = max(result.resumed, offset)
+                    else:
+                        # complete file (no range requested or the range was ignored)
+                        mode = "wb"
+                        offset = 0
+                        content_length = response.headers.get("Content-Length", "")
+                        expected_size = int(content_length) if content_length.isdigit() else None
+
+                    with open(part_path, mode) as f:
+                        for chunk in response.iter_content(chunk_size = self.chunk_size):
+                            if self.byte_bucket is not None:
+                                self.byte_bucket.acquire(len(chunk))
+
+                            f.write(chunk)
+
+                result.size = os.path.getsize(part_path)
+                if expected_size is not None and result.size < expected_size:
+                    raise requests.exceptions.ChunkedEncodingError("download cut off at " +
+                        str(result.size) + " of " + str(expected_size) + " bytes")
+
+                return
+            except resumable_errors:
+                attempt += 1
+                if attempt > self.resume_attempts:
+                    raise
+
+                response = None
+
+    def download(self, request, target_dir, job_name = "", course = "", semester = ""):
+        """Download a single file into target_dir (blocking).
+
+        The file is written as <name>.part and renamed to its final name
+        when it is complete. A partial file is kept if the download fails
+        and resumed by the next attempt (see self.transfer(...)). Downloads
+        which are recorded as completed (self.completed_downloads) are
+        skipped after the response headers (same key, file name and size),
+        i.e., without transferring the content. With a blob store, a file whose name and size (Content-Length)
+        are already stored for the same course is linked from the store
+        instead of being transferred; new files are added to the store.
+        """
+        result = DownloadResult(request)
+        time_start = time.time()
+
+        with self.host_semaphore(request.url):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(request.url)
+
+            try:
+                response = self.open_response(request)
+
+                with response:
+                    response.raise_for_status()
+
+                    # a HTML page instead of a file -> session expired/JSF error
+                    if response.headers.get("Content-Type", "").startswith("text/html"):
+                        raise ValueError("received a HTML page instead of a file")
+
+                    result.headers = dict(response.headers)
+                    file_name = response_filename(response, request.name)
+                    result.file_path = os.path.join(target_dir, file_name)
+                    part_path = result.file_path + ".part"
+                    content_length = response.headers.get("Content-Length", "")
+
+                    # downloaded completely by an earlier run (same key, name and size) -> skip
+                    record = None
+                    if self.completed_downloads is not None:
+                        record = self.completed_downloads.lookup(request.key, result.file_path, content_length)
+
+                    if record is not None:
+                        result.size = record["size"]
+                        result.skipped = True
+                    else:
+                        self.record_progress(job_name, result, "started")
+
+                        # already stored (same course, name and size) -> do not transfer the content
+                        file_hash = None
+                        if (self.blob_store is not None and content_length.isdigit() and
+                            not os.path.isfile(part_path)
+                        ):
+                            file_hash = self.blob_store.lookup(course, file_name, int(content_length))
+
+                        if file_hash is not None:
+                            self.blob_store.add_linked(file_hash, result.file_path, course, semester)
+                            result.size = int(content_length)
+                            result.deduplicated = True
+                        else:
+                            self.transfer(request, part_path, response, result)
+                            os.replace(part_path, result.file_path)
+
+                            if self.blob_store is not None:
+                                self.blob_store.add_file(result.file_path, course, semester)
+
+                if self.completed_downloads is not None and not result.skipped:
+                    self.completed_downloads.add(result)
+            except Exception as e:
+                result.error = str(e)
+
+        result.duration = time.time() - time_start
+        if not result.ok():
+            status = "failed"
+        elif result.skipped:
+            status = "skipped"
+        elif result.deduplicated:
+            status = "deduplicated"
+        elif result.resumed > 0:
+            status = "resumed"
+        else:
+            status = "finished"
+
+        self.record_progress(job_name, result, status)
+
+        return result
+
+    def download_all(self, pending, target_dir, job_name = "", course = "", semester = ""):
+        '''download several files concurrently (blocking), returns the DownloadResults'''
+        os.makedirs(target_dir, exist_ok = True)
+
+        futures = [self.executor.submit(self.download, request, target_dir, job_name, course, semester)
+            for request in pending]
+
+        return [future.result() for future in futures]
+
+    def close(self):
+        self.executor.shutdown()
+
+        if self.f_progress is not None:
+            self.f_progress.close()
+
+        if self.completed_downloads is not None:
+            self.completed_downloads.close()
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+from contextlib import contextmanager
+import queue
+import threading
+
+"""
+Pool of webdriver sessions.
+
+Some interactions with TISS (JSF select elements, downloads, etc.) need
+a browser. A single webdriver only uses one core, therefore a pool of
+several sessions is kept. Each slot of the pool is a crawler instance
+together with its webdriver (see crawl.crawler.init_driver_pool(...)),
+i.e., each slot keeps its own login state and language.
+"""
+
+class DriverPool:
+    """A fixed amount of slots (crawler instance, webdriver).
+
+    Slots are either leased one at a time (lease()) or all slots work
+    through a shared queue of items (run(...)): every slot runs in its
+    own thread and takes the next item as soon as it is idle.
+    """
+    def __init__(self, create_slot, close_slot, pool_size):
+        """Create all slots.
+
+        create_slot(slot_number) returns a new slot, close_slot(slot)
+        closes it (e.g., quits the webdriver).
+        """
+        self.close_slot = close_slot
+        self.slots = [create_slot(slot_number) for slot_number in range(pool_size)]
+        self.idle_slots = queue.Queue()
+
+        for slot in self.slots:
+            self.idle_slots.put(slot)
+
+    @contextmanager
+    def lease(self):
+        '''borrow an idle slot (block until one is available)'''
+        slot = self.idle_slots.get()
+        try:
+            yield slot
+        finally:
+            self.idle_slots.put(slot)
+
+    def run(self, items, work, on_result):
+        """Process all items with all slots and block until all are finished.
+
+        work(slot, item) is called in the thread of the slot. The results
+        are passed to on_result(item, result, error) in the calling thread
+        (in the order they finish), error being the raised exception or None.
+        """
+        work_queue = queue.Queue()
+        for item in items:
+            work_queue.put(item)
+
+        result_queue = queue.Queue()
+        finished = object()
+
+        def process_queue():
+            with self.lease() as slot:
+                while True:
+                    try:
+                        item = work_queue.get_nowait()
+                    except queue.Empty:
+                        break
+
+                    try:
+                        result_queue.put((item, work(slot, item), None))
+                    except Exception as e:
+                        result_queue.put((item, None, e))
+
+            result_queue.put(finished)
+
+        threads = [threading.Thread(target = process_queue, daemon = True) for slot in self.slots]
+        for thread in threads:
+            thread.start()
+
+        amt_running = len(threads)
+        while amt_running > 0:
+            result = result_queue.get()
+
+            if result is finished:
+                amt_running -= 1
+            else:
+                on_result(*result)
+
+    def close(self):
+        '''close all slots'''
+        for slot in self.slots:
+            self.close_slot(slot)
+
+        self.slots = []
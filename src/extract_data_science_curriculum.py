@@ -38,4 +38,4 @@ driver = driver_instance.init_driver()
 # - - -
 # end of section copied from src/extract_process_study_programs.py
 
-urls_in_range = driver_instance.extract_fundamentals(driver, "https://tiss.tuwien.ac.at/curriculum/public/curriculum.xhtml?dswid=7871&dsrid=370&key=67853")
+urls_in_range = driver_instance.extract_fundamentals(driver, tiss_url + "/curriculum/public/curriculum.xhtml?dswid=7871&dsrid=370&key=67853")
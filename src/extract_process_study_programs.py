@@ -30,7 +30,7 @@ write_folder = root_dir + logging_folder + study_prgms_folder
 f_study_programs_insert = open(write_folder + "study_programs_insert" + ".txt", "a")
 
 # get a list of academic programs (fetch both languages -> en/ger)
-academic_program_URL = "https://tiss.tuwien.ac.at/curriculum/studyCodes.xhtml"
+academic_program_URL = tiss_url + "/curriculum/studyCodes.xhtml"
 
 # language 1
 acad_program_list_lang1 = set_language
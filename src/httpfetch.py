@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+from dataclasses import dataclass, field
+import random
+import re
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+"""
+Plain HTTP fetch backend for public TISS pages.
+
+Most TISS pages (courseDetails.xhtml, curriculumSemester.xhtml,
+studyCodes.xhtml, etc.) are rendered on the server and do not need a
+browser. The only obstacle is the JS window handler of TISS: the first
+request to a page returns a small page which sets a cookie via JS and
+reloads the page with the URL parameters 'dswid' (window id) and 'dsrid'
+(request token), e.g.,
+https://tiss.tuwien.ac.at/curriculum/public/curriculum.xhtml?dswid=7871&dsrid=370&key=67853
+
+The class HttpFetcher in this file resolves this redirect without JS and
+keeps a pool of keep-alive connections so that consecutive requests do
+not have to open a new TLS connection every time.
+"""
+
+# marker of the div which contains the information desired for crawling
+# (see crawler.verify_page_crawl(...))
+content_inner_needle = 'id="contentInner"'
+
+# error page (JS not loaded properly), see crawler.fetch_page(...)
+js_error_needle = "Something went seriously wrong Please try refreshing the page"
+
+# cookies which are set by JS, e.g., document.cookie = 'dsrwid-370=7871; path=/'
+re_js_cookie = re.compile(r"""document\.cookie\s*=\s*['"]([^=;'"\s]+)=([^;'"]*)""")
+
+# opening and closing div tags (used to determine the end of contentInner)
+re_div_tag = re.compile(r"<(/?)div\b", re.IGNORECASE)
+
+
+@dataclass
+class FetchResult:
+    """Result of a single HTTP fetch.
+
+    html is the complete page source and content the inner HTML of the
+    div with the id contentInner (empty string if the div is missing).
+    """
+    url: str
+    status: int
+    html: str
+    content: str
+    headers: dict = field(default_factory = dict)
+
+    def is_valid(self):
+        '''True, if the page has usable content (same checks as fetch_page(...))'''
+        return (self.status == 200 and self.content != "" and
+            self.content.find(js_error_needle) == -1)
+
+
+def extract_content_inner(html):
+    """Extract the inner HTML of the div with the id 'contentInner'.
+
+    This is the counterpart to the JS call in crawler.verify_page_crawl(...)
+    ('return window.document.getElementById("contentInner").innerHTML').
+    The matching closing tag is determined by counting nested div elements.
+    Returns an empty string if the div is not found.
+    """
+    pos_id = html.find(content_inner_needle)
+    if pos_id == -1:
+        return ""
+
+    pos_tag_start = html.rfind("<", 0, pos_id)
+    pos_tag_end = html.find(">", pos_id)
+    if pos_tag_start == -1 or pos_tag_end == -1:
+        return ""
+
+    depth = 1
+    for match in re_div_tag.finditer(html, pos_tag_end + 1):
+        if match.group(1) == "/":
+            depth -= 1
+        else:
+            depth += 1
+
+        if depth == 0:
+            return html[pos_tag_end + 1:match.start()]
+
+    # closing tag missing (truncated page) -> return the rest of the page
+    return html[pos_tag_end + 1:]
+
+
+def get_url_param(url, name, default = ""):
+    '''value of the $_GET parameter name of a URL (default if it is not set)'''
+    return dict(parse_qsl(urlsplit(url).query, keep_blank_values = True)).get(name, default)
+
+
+def set_url_params(url, params):
+    """Add (or overwrite) $_GET parameters of a URL.
+
+    set_url_params("https://tiss.tuwien.ac.at/course/courseDetails.xhtml?courseNr=160208", {"locale": "en"})
+    ->
+    https://tiss.tuwien.ac.at/course/courseDetails.xhtml?courseNr=160208&locale=en
+    """
+    split_url = urlsplit(url)
+    query = dict(parse_qsl(split_url.query, keep_blank_values = True))
+    query.update(params)
+
+    return urlunsplit((split_url.scheme, split_url.netloc, split_url.path,
+        urlencode(query, safe = "|"), split_url.fragment))
+
+
+def url_param(url, name, default = ""):
+    '''value of a $_GET parameter of a URL, e.g., url_param(url, "key")'''
+    return dict(parse_qsl(urlsplit(url).query)).get(name, default)
+
+
+class HttpFetcher:
+    """Fetch TISS pages via plain HTTP (no browser).
+
+    A requests session with a pool of keep-alive connections is used for
+    all requests. Cookies (JS cookies, login state copied from the
+    webdriver) are kept in the session.
+    """
+    def __init__(self, user_agent, timeout = 60, pool_size = 10, max_redirect_rounds = 3):
+        """Set up the session and the connection pool.
+
+        timeout is the timeout (in seconds) of a single request and
+        max_redirect_rounds the number of times the JS window handler
+        is resolved before giving up.
+        """
+        self.timeout = timeout
+        self.max_redirect_rounds = max_redirect_rounds
+
+        self.session = requests.Session()
+        self.session.headers.update({
+            "User-Agent": user_agent,
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Connection": "keep-alive",
+        })
+
+        adapter = HTTPAdapter(pool_connections = pool_size, pool_maxsize = pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def resolve_js_redirect(self, url, html):
+        """Emulate the JS window handler of TISS.
+
+        Sets all cookies found in the page (document.cookie = ...) and
+        returns the URL to be fetched next. The window id and request
+        token are generated the same way as the JS of the page does
+        (random numbers) and the window id is stored in the cookie
+        'dsrwid-<request token>'.
+        """
+        host = urlsplit(url).hostname
+
+        for name, value in re_js_cookie.findall(html):
+            self.session.cookies.set(name, value, domain = host, path = "/")
+
+        window_id = str(random.randint(0, 9999))
+        request_token = str(random.randint(0, 999))
+        self.session.cookies.set("dsrwid-" + request_token, window_id, domain = host, path = "/")
+
+        return set_url_params(url, {"dswid": window_id, "dsrid": request_token})
+
+    def fetch(self, url, headers = None):
+        """Fetch a single page and return it as FetchResult.
+
+        In case the JS window handler page is returned (no contentInner div
+        present), the redirect is resolved and the page is fetched again.
+        Exceptions of the requests library (timeouts, connection errors)
+        are passed on to the caller.
+        """
+        fetch_url = url
+
+        for x in range(0, self.max_redirect_rounds + 1):
+            response = self.session.get(fetch_url, headers = headers, timeout = self.timeout)
+            html = response.text
+            content = extract_content_inner(html)
+
+            if content != "" or response.status_code != 200:
+                break
+
+            # no content -> JS window handler (or a broken page)
+            if html.find("dswid") == -1 and html.find("document.cookie") == -1:
+                break
+
+            fetch_url = self.resolve_js_redirect(fetch_url, html)
+
+        # response.headers (CaseInsensitiveDict) -> header names in any case
+        return FetchResult(url, response.status_code, html, content, response.headers)
+
+    def set_cookies_from_driver(self, driver):
+        '''Copy the cookies of the webdriver session (e.g., login state) into the HTTP session'''
+        for cookie in driver.get_cookies():
+            self.session.cookies.set(cookie["name"], cookie["value"],
+                domain = cookie.get("domain"), path = cookie.get("path", "/"))
+
+    def close(self):
+        '''Close all pooled connections'''
+        self.session.close()
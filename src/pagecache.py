@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+"""
+Persistent on-disk cache of fetched pages.
+
+Structure of the cache folder:
+.
+├── index.jsonl		(one JSON entry per line, the last entry of a key is valid)
+└── blobs
+    ├── 00
+    │   └── 00c3...e1	(page source, file name = sha256 of the content)
+    ├── 01
+    .
+    .
+
+Entries are keyed by URL, locale and semester. The URL is normalized, i.e.,
+the parameters of the JS window handler (dswid, dsrid) and the locale are
+removed and the remaining parameters are sorted. Identical pages are
+stored only once (content-addressed blobs).
+
+Each entry has a time to live (TTL). Expired entries are not dropped but
+revalidated: if the server sent an ETag or Last-Modified header, the next
+request is a conditional GET and a '304 Not Modified' refreshes the entry
+without transferring the page again.
+"""
+
+# URL parameters which do not change the content of a page
+ignored_url_params = ["dswid", "dsrid", "locale"]
+
+
+def normalize_url(url):
+    '''remove parameters not affecting the content and sort the remaining ones'''
+    split_url = urlsplit(url)
+    query = [(key, value) for key, value in parse_qsl(split_url.query, keep_blank_values = True)
+        if key not in ignored_url_params]
+
+    return split_url.netloc + split_url.path + "?" + urlencode(sorted(query), safe = "|")
+
+
+def url_semester(url):
+    '''semester of a URL (parameter semester or semesterCode), e.g., 2022W'''
+    query = dict(parse_qsl(urlsplit(url).query))
+
+    return query.get("semester", query.get("semesterCode", ""))
+
+
+class ResponseCache:
+    """Content-addressed page cache with an index file.
+
+    All functions are thread-safe (the cache may be shared by the slots
+    of a driver pool).
+    """
+    def __init__(self, cache_dir, ttl = 7 * 24 * 3600):
+        """Open (or create) the cache in the folder cache_dir.
+
+        ttl is the default time to live (in seconds) of new entries.
+        """
+        self.cache_dir = cache_dir
+        self.blob_dir = os.path.join(cache_dir, "blobs")
+        self.index_path = os.path.join(cache_dir, "index.jsonl")
+        self.ttl = ttl
+        self.index = {}
+        self.lock = threading.Lock()
+
+        os.makedirs(self.blob_dir, exist_ok = True)
+
+        if os.path.isfile(self.index_path):
+            with open(self.index_path, encoding = "utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # incomplete last line (program interrupted while writing)
+                        continue
+                    self.index[entry["key"]] = entry
+
+        self.f_index = open(self.index_path, "a", encoding = "utf-8")
+
+    def cache_key(self, url, locale):
+        return normalize_url(url) + "|" + locale + "|" + url_semester(url)
+
+    def blob_path(self, content_hash):
+        return os.path.join(self.blob_dir, content_hash[:2], content_hash)
+
+    def write_entry(self, entry):
+        '''add an entry to the index (call with self.lock held)'''
+        self.index[entry["key"]] = entry
+        self.f_index.write(json.dumps(entry, ensure_ascii = False) + "\n")
+        self.f_index.flush()
+
+    def get(self, url, locale):
+        """Returns the entry (dict) for the URL/locale or None.
+
+        The page source is in entry["html"]. The entry is returned even if
+        it is expired (see is_fresh(...)) so that it can be revalidated.
+        """
+        with self.lock:
+            entry = self.index.get(self.cache_key(url, locale))
+
+        if entry is None:
+            return None
+
+        try:
+            with open(self.blob_path(entry["hash"]), encoding = "utf-8") as f:
+                return dict(entry, html = f.read())
+        except OSError:
+            return None
+
+    def is_fresh(self, entry):
+        return time.time() - entry["fetched"] < entry["ttl"]
+
+    def conditional_headers(self, entry):
+        '''headers for revalidating an entry (conditional GET)'''
+        headers = {}
+
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+
+        return headers
+
+    def put(self, url, locale, html, headers = None, ttl = None):
+        '''store a page (headers: response headers, used for revalidation)'''
+        # header names are case-insensitive (e.g., etag, last-modified)
+        headers = {name.lower(): value for name, value in (headers or {}).items()}
+        content_hash = hashlib.sha256(html.encode("utf-8")).hexdigest()
+        blob_path = self.blob_path(content_hash)
+
+        if not os.path.isfile(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok = True)
+            # write into a temporary file first (no partial blobs)
+            temp_path = blob_path + "." + str(threading.get_ident()) + ".tmp"
+            with open(temp_path, "w", encoding = "utf-8") as f:
+                f.write(html)
+            os.replace(temp_path, blob_path)
+
+        entry = {
+            "key": self.cache_key(url, locale),
+            "url": url,
+            "locale": locale,
+            "semester": url_semester(url),
+            "hash": content_hash,
+            "fetched": time.time(),
+            "ttl": self.ttl if ttl is None else ttl,
+            "etag": headers.get("etag", ""),
+            "last_modified": headers.get("last-modified", ""),
+        }
+
+        with self.lock:
+            self.write_entry(entry)
+
+    def touch(self, entry):
+        '''mark an entry as fresh again (after a '304 Not Modified')'''
+        refreshed_entry = dict(entry, fetched = time.time())
+        refreshed_entry.pop("html", None)
+
+        with self.lock:
+            self.write_entry(refreshed_entry)
+
+    def compact(self):
+        '''rewrite the index file with only the valid entry per key'''
+        with self.lock:
+            self.f_index.close()
+
+            temp_path = self.index_path + ".tmp"
+            with open(temp_path, "w", encoding = "utf-8") as f:
+                for entry in self.index.values():
+                    f.write(json.dumps(entry, ensure_ascii = False) + "\n")
+            os.replace(temp_path, self.index_path)
+
+            self.f_index = open(self.index_path, "a", encoding = "utf-8")
+
+    def close(self):
+        self.compact()
+        self.f_index.close()
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+import enum
+import re
+
+"""
+Classification of fetched TISS pages (course exists, not found, ...).
+
+All markers are combined into one compiled regex, i.e., the page source is
+scanned once instead of once per marker (and, with the webdriver, read once
+instead of once per marker, see crawler.check_course_exists(...)). If
+markers of several verdicts are found, the verdict with the highest
+priority wins (a JS error page does not tell anything about the course).
+"""
+
+
+class PageVerdict(enum.Enum):
+    EXISTS = "exists"
+    NOT_FOUND = "not found"
+    NOT_PUBLIC = "not public"			# not (yet) published in this semester
+    JS_ERROR = "js error"				# page has not been loaded properly -> fetch again
+    LOGIN_REQUIRED = "login required"
+
+
+# {marker: verdict}
+page_markers = {
+    # german and english pages of courses which do not exist
+    "Ressource nicht gefunden": PageVerdict.NOT_FOUND,
+    "Die angeforderte Ressource wurde nicht gefunden": PageVerdict.NOT_FOUND,
+    "Bad request": PageVerdict.NOT_FOUND,
+    "The requested resource could not be found": PageVerdict.NOT_FOUND,
+    # title of the error page (study programs and courses)
+    "Error page": PageVerdict.NOT_FOUND,
+
+    # Die LVA ist im Semester 2004S noch nicht veröffentlicht.
+    "noch nicht veröffentlicht": PageVerdict.NOT_PUBLIC,
+    # The Course is not public in semester 2004S.
+    "The Course is not public": PageVerdict.NOT_PUBLIC,
+
+    # JS error page (see httpfetch.js_error_needle)
+    "Something went seriously wrong": PageVerdict.JS_ERROR,
+
+    # login form of the identity provider (see crawler.tiss_login(...))
+    "samlloginbutton": PageVerdict.LOGIN_REQUIRED,
+}
+
+# highest priority first
+verdict_priority = [
+    PageVerdict.JS_ERROR,
+    PageVerdict.LOGIN_REQUIRED,
+    PageVerdict.NOT_PUBLIC,
+    PageVerdict.NOT_FOUND,
+]
+
+# longest markers first (the alternation takes the first one which matches)
+re_page_markers = re.compile("|".join(re.escape(marker)
+    for marker in sorted(page_markers, key = len, reverse = True)))
+
+
+def classify_page(page_source):
+    '''verdict (PageVerdict) of a page, EXISTS if no marker is found'''
+    found_verdicts = {page_markers[match.group(0)] for match in re_page_markers.finditer(page_source)}
+
+    for verdict in verdict_priority:
+        if verdict in found_verdicts:
+            return verdict
+
+    return PageVerdict.EXISTS
+
+
+def course_missing(verdict):
+    '''True, if the verdict means that there is no (public) course'''
+    return verdict == PageVerdict.NOT_FOUND or verdict == PageVerdict.NOT_PUBLIC
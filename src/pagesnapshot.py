@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+from dataclasses import dataclass
+from functools import cached_property
+
+from selenium.webdriver.support.events import AbstractEventListener, EventFiringWebDriver
+
+try:
+    import courseparser
+except ModuleNotFoundError:
+    from src import courseparser
+
+"""
+Snapshot of the page currently loaded in a webdriver.
+
+Every read of driver.page_source serialises the whole DOM and ships it over
+the WebDriver protocol (hundreds of kB per course page). After a single
+navigation, the source is needed several times (language, language links,
+semester options, markers, ...). SnapshotDriver wraps the webdriver (see
+crawler.init_driver(...)) and keeps one PageSnapshot per loaded page:
+
+driver.get(...)		-> snapshot invalidated
+driver.page_source	-> snapshot taken (one WebDriver call), then served from it
+element.click()		-> snapshot invalidated (the page may change)
+
+The snapshot is invalidated by the events of selenium's EventFiringWebDriver
+(navigation, clicks, changed input values, executed scripts) and by
+refresh(). The landmarks (language, language links) are parsed on first
+use only.
+"""
+
+# source of a webdriver without any loaded page
+blank_page_source = "<html><head></head><body></body></html>"
+
+# links to switch the language (see crawler.switch_language(...))
+language_link_needles = (
+    "language_en",
+    '<a href="/?locale=en">English</a>',
+    "language_de",
+    '<a href="/?locale=de">Deutsch</a>',
+)
+
+
+@dataclass(frozen = True)
+class PageSnapshot:
+    """Immutable source of a loaded page and its parsed landmarks."""
+    html: str
+    url: str
+
+    def is_blank(self):
+        '''True, if no page has been loaded yet'''
+        return self.html == blank_page_source
+
+    @cached_property
+    def language(self):
+        '''see courseparser.parse_language(...)'''
+        return courseparser.parse_language(self.html)
+
+    @cached_property
+    def language_links(self):
+        '''the needles of language_link_needles present in the page'''
+        return frozenset(needle for needle in language_link_needles if self.html.find(needle) != -1)
+
+
+class SnapshotListener(AbstractEventListener):
+    """Drop the snapshot before anything which may change the page."""
+    def __init__(self):
+        self.snapshot = None
+
+    def invalidate(self, *args):
+        self.snapshot = None
+
+    before_navigate_to = invalidate
+    before_navigate_back = invalidate
+    before_navigate_forward = invalidate
+    before_click = invalidate
+    before_change_value_of = invalidate
+    before_execute_script = invalidate
+    before_close = invalidate
+    before_quit = invalidate
+
+
+class SnapshotDriver(EventFiringWebDriver):
+    """Webdriver which serves page_source from a snapshot per loaded page."""
+    def __init__(self, driver):
+        super().__init__(driver, SnapshotListener())
+
+    def snapshot(self):
+        '''snapshot of the loaded page (taken on first use after a change)'''
+        if self._listener.snapshot is None:
+            self._listener.snapshot = PageSnapshot(self.wrapped_driver.page_source, self.wrapped_driver.current_url)
+
+        return self._listener.snapshot
+
+    def invalidate_snapshot(self):
+        self._listener.invalidate()
+
+    @property
+    def page_source(self):
+        return self.snapshot().html
+
+    def refresh(self):
+        self._listener.invalidate()
+        self.wrapped_driver.refresh()
+
+
+def page_snapshot(driver):
+    '''snapshot of the page loaded in driver (a new one for drivers without SnapshotDriver)'''
+    if isinstance(driver, SnapshotDriver):
+        return driver.snapshot()
+
+    return PageSnapshot(driver.page_source, driver.current_url)
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+
+"""
+Pool of worker processes for the parsers (see courseparser.py).
+
+The parsers are pure functions (html -> record) and CPU-bound string work.
+Run in the threads of the crawler, they hold the GIL and slow down the
+threads waiting for pages. ParserPool hands them to a ProcessPoolExecutor,
+i.e., parsing scales across cores independently of fetching:
+
+parser_pool = ParserPool(4)
+future = parser_pool.submit(courseparser.parse_course_record, html, "de", program)
+record, unknown_fields = future.result()
+
+The workers are forked (no new interpreter): the crawl scripts have side
+effects on import (webdriver, logfiles), which the spawn/forkserver start
+methods would run again in every worker. The pool starts its workers right
+away, i.e., create it before any other threads are running. Without fork
+(or with max_workers = 0), the parsers run inline in the calling thread.
+"""
+
+
+def warm_up():
+    '''no-op task to start the workers'''
+    return None
+
+
+class ParserPool:
+    """Run parser functions in worker processes (inline as fallback).
+
+    max_workers:	amount of worker processes (None: amount of CPUs, 0: inline)
+    """
+    def __init__(self, max_workers = None):
+        self.executor = None
+
+        if max_workers != 0 and "fork" in multiprocessing.get_all_start_methods():
+            self.executor = ProcessPoolExecutor(max_workers = max_workers,
+                mp_context = multiprocessing.get_context("fork"))
+            self.executor.submit(warm_up).result()
+
+    def is_parallel(self):
+        return self.executor is not None
+
+    def submit(self, parse_function, *args):
+        """Run parse_function(*args) in a worker, returns a Future of the result.
+
+        parse_function must be a module level function (pickled by name). If
+        the pool is broken (e.g., a worker has been killed), the parser runs
+        inline instead.
+        """
+        if self.executor is not None:
+            try:
+                return self.executor.submit(parse_function, *args)
+            except (BrokenProcessPool, RuntimeError):
+                self.executor = None
+
+        future = Future()
+        try:
+            future.set_result(parse_function(*args))
+        except Exception as e:
+            future.set_exception(e)
+
+        return future
+
+    def map(self, parse_function, args_list):
+        """Run parse_function(*args) for every args of args_list.
+
+        All calls are submitted right away, the returned generator yields
+        the results in the order of args_list (blocking until each is done).
+        Calls lost with a broken pool are run inline.
+        """
+        futures = [self.submit(parse_function, *args) for args in args_list]
+
+        return self.results(futures, parse_function, args_list)
+
+    def results(self, futures, parse_function, args_list):
+        for future, args in zip(futures, args_list):
+            try:
+                yield future.result()
+            except BrokenProcessPool:
+                self.executor = None
+                yield parse_function(*args)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+
+
+# parsers without worker processes (e.g., crawler without parser pool)
+inline_pool = ParserPool(0)
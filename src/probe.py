@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import threading
+import time
+import traceback
+
+try:
+    from config import *
+except ModuleNotFoundError:
+    from src.config import *
+
+try:
+    import httpfetch
+    import pageclass
+except ModuleNotFoundError:
+    from src import httpfetch
+    from src import pageclass
+
+"""
+Concurrent probing of course numbers via plain HTTP (see bruteforce.py).
+
+Instead of loading every candidate course page in Firefox (and waiting the
+crawl delay after each one), the pages are requested with an
+httpfetch.HttpFetcher and classified by their status code and a few
+markers in the body (pageclass.py, as in crawler.check_course_exists(...)):
+
+exists		the course page has been delivered
+missing		error page (resource not found, course not public, ...)
+error		the request failed (connection error, 5xx, JS error page, ...),
+			the number has to be probed again
+
+Many probes are in flight at once, but all of them draw from one rate
+limiter (ratelimit.HostRateLimiter), i.e., the amount of requests per second
+to TISS is the budget set there, independent of the concurrency. The
+results are appended to a JSON lines file (ProbeResults) as they come in;
+numbers with a final verdict (exists, missing) are skipped when probing is
+restarted. The space of numbers can be split into shards (shard_range(...))
+so that several workers each probe their own sub-range.
+"""
+
+# verdicts of a probe
+PROBE_EXISTS = "exists"
+PROBE_MISSING = "missing"
+PROBE_ERROR = "error"
+
+
+def course_number_candidates(start, end):
+    """Course numbers to probe for the numbers in range(start, end).
+
+    Same scheme as bruteforce.py: the fourth digit has to be 0 and is
+    replaced by 'K' (000K00 -> 999K99), all other numbers are skipped.
+    """
+    for number in range(start, end):
+        digits = list(str(number).zfill(6))
+
+        if int(digits[3]) > 0:
+            continue
+
+        digits[3] = "K"
+        yield "".join(digits)
+
+
+def shard_range(start, end, shard_index, shard_count):
+    '''sub-range (start, end) of shard shard_index (0 ... shard_count - 1) of range(start, end)'''
+    shard_size = -(-(end - start) // shard_count)
+    shard_start = min(start + shard_index * shard_size, end)
+
+    return shard_start, min(shard_start + shard_size, end)
+
+
+def classify_probe(status, html):
+    """Classify the response to a course page.
+
+    Returns PROBE_EXISTS, PROBE_MISSING or PROBE_ERROR (probe again).
+    """
+    if status == 404 or status == 400:
+        return PROBE_MISSING
+
+    if status != 200:
+        return PROBE_ERROR
+
+    page_verdict = pageclass.classify_page(html)
+    if pageclass.course_missing(page_verdict):
+        return PROBE_MISSING
+    if page_verdict != pageclass.PageVerdict.EXISTS:
+        return PROBE_ERROR
+
+    # no course page (e.g., unresolved JS window handler) -> try again
+    if httpfetch.extract_content_inner(html) == "":
+        return PROBE_ERROR
+
+    return PROBE_EXISTS
+
+
+class ProbeResults:
+    """Append-only store of probe results (one JSON line per probe).
+
+    On opening, the existing records are read (read_existing = True): the
+    course numbers with a final verdict (exists, missing) are in
+    self.decided and are not probed again. With a probestate.ProbeState,
+    reading the records is not necessary (see Prober.run(...)).
+    """
+    def __init__(self, path, read_existing = True):
+        self.path = path
+        self.decided = {}			# {course number: verdict}
+        self.lock = threading.Lock()
+
+        if read_existing and os.path.isfile(path):
+            with open(path, encoding = "utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+
+                    if record["verdict"] != PROBE_ERROR:
+                        self.decided[record["course"]] = record["verdict"]
+
+        self.f_results = open(path, "a", encoding = "utf-8")
+
+    def append(self, record):
+        with self.lock:
+            if record["verdict"] != PROBE_ERROR:
+                self.decided[record["course"]] = record["verdict"]
+
+            self.f_results.write(json.dumps(record, ensure_ascii = False) + "\n")
+            self.f_results.flush()
+
+    def close(self):
+        self.f_results.close()
+
+
+class Prober:
+    """Probe many course numbers concurrently under a global rate budget.
+
+    http_fetcher:		httpfetch.HttpFetcher (its pool size should be >= concurrency)
+    rate_limiter:		ratelimit.HostRateLimiter shared by all probes (the budget)
+    concurrency:		maximum amount of probes in flight
+    delay_controller:	crawldelay.AdaptiveCrawlDelay, slows the rate limiter down on errors
+    """
+    def __init__(self, http_fetcher, rate_limiter, concurrency = 16, delay_controller = None):
+        self.http_fetcher = http_fetcher
+        self.rate_limiter = rate_limiter
+        self.concurrency = concurrency
+        self.delay_controller = delay_controller
+        self.executor = ThreadPoolExecutor(max_workers = concurrency)
+
+    def course_url(self, course_number):
+        return tiss_url + "/course/courseDetails.xhtml?courseNr=" + course_number
+
+    def probe(self, course_number):
+        '''probe a single course number (blocking), returns the record of the result'''
+        return self.probe_page(course_number)[0]
+
+    def probe_page(self, course_number):
+        '''probe a single course number (blocking), returns the record and the fetched page (None on errors)'''
+        url = self.course_url(course_number)
+        self.rate_limiter.acquire(url)
+
+        time_request_start = time.time()
+        try:
+            fetch_result = self.http_fetcher.fetch(url)
+            status = fetch_result.status
+            html = fetch_result.html
+            verdict = classify_probe(status, html)
+            error = ""
+        except Exception as e:
+            status = 0
+            html = None
+            verdict = PROBE_ERROR
+            error = str(e)
+        latency = time.time() - time_request_start
+
+        if self.delay_controller is not None:
+            new_delay = self.delay_controller.record(latency, verdict == PROBE_ERROR)
+            self.rate_limiter.set_rate(1 / new_delay)
+
+        record = {
+            "time": time.strftime("%Y-%m-%d_%H:%M:%S"),
+            "course": course_number,
+            "url": url,
+            "status": status,
+            "verdict": verdict,
+            "latency": round(latency, 3),
+            "error": error,
+        }
+
+        return record, html
+
+    def run(self, course_numbers, results, on_result = None, state = None, on_page = None):
+        """Probe all course_numbers (iterable) which have not been decided yet.
+
+        At most self.concurrency probes are in flight. Every result is
+        appended to results (ProbeResults) and passed to on_result(record).
+        The page of every existing course is passed to on_page(record, html)
+        (e.g., to extract it without fetching it again, see coursepipeline.py).
+        With a state (probestate.ProbeState), the numbers probed before are
+        looked up in its bitmaps, final verdicts are recorded in it and it is
+        saved regularly (checkpoint). Returns the amount of probes per verdict.
+        """
+        counts = {PROBE_EXISTS: 0, PROBE_MISSING: 0, PROBE_ERROR: 0}
+        in_flight = threading.BoundedSemaphore(self.concurrency)
+        lock = threading.Lock()
+
+        def done(future):
+            # the slot is released in any case, else the drain loop below never returns
+            try:
+                record, html = future.result()
+                results.append(record)
+
+                if state is not None and record["verdict"] != PROBE_ERROR:
+                    state.record(record["course"], record["verdict"] == PROBE_EXISTS)
+
+                with lock:
+                    counts[record["verdict"]] += 1
+                    if on_result is not None:
+                        on_result(record)
+
+                if on_page is not None and record["verdict"] == PROBE_EXISTS:
+                    on_page(record, html)
+            except Exception:
+                print("error processing probe result:\n" + traceback.format_exc())
+            finally:
+                in_flight.release()
+
+        for course_number in course_numbers:
+            if course_number in results.decided:
+                continue
+            if state is not None and state.is_probed(course_number):
+                continue
+
+            in_flight.acquire()
+            self.executor.submit(self.probe_page, course_number).add_done_callback(done)
+
+            if state is not None:
+                state.checkpoint_if_due()
+
+        # wait for the probes in flight
+        for x in range(self.concurrency):
+            in_flight.acquire()
+        for x in range(self.concurrency):
+            in_flight.release()
+
+        if state is not None:
+            state.save()
+
+        return counts
+
+    def close(self):
+        self.executor.shutdown()
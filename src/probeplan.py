@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+import random
+
+import numpy as np
+
+"""
+Prioritised order of the course numbers to probe (see bruteforce.py).
+
+Course numbers are not spread evenly: they cluster by the institute prefix
+(the first three digits). Instead of probing the space from start to end,
+the planner estimates a hit density for every prefix and probes the
+densest prefixes first:
+
+density[prefix] = (known[prefix] + hits[prefix] + 2 * base) / (probed[prefix] + 2)
+
+known		courses with this prefix in the database (the tables read by
+			fetch_processed_courses(), counted with np.bincount)
+hits		courses found by probing (probestate.ProbeState, exists)
+probed		numbers of this prefix probed so far (probestate.ProbeState)
+base		hit rate over all probed numbers (prior of prefixes without data)
+
+The densities are computed again after every round (the state is updated
+by the prober while the plan is consumed), i.e., a prefix which does not
+yield any courses drops in the ranking. A share of the probes (exploration)
+goes to randomly chosen sparse prefixes, so that institutes without any
+known course are found as well.
+"""
+
+amt_prefixes = 1000
+numbers_per_prefix = 100
+
+
+def known_prefix_counts(course_numbers):
+    """Amount of known courses per prefix (numpy array with 1000 entries).
+
+    course_numbers are the numbers as stored in the database (e.g.,
+    "104.590") or in URLs ("104590").
+    """
+    prefixes = [int(number[:3]) for number in course_numbers if number[:3].isdigit()]
+
+    return np.bincount(np.array(prefixes, dtype = np.int64), minlength = amt_prefixes)[:amt_prefixes]
+
+
+class ProbePlanner:
+    """Yield the course numbers of a pattern densest prefix first.
+
+    known_counts:		known courses per prefix (see known_prefix_counts(...))
+    pattern:			letter of the probed numbers (000K00 -> 999K99, see probe.py)
+    state:				probestate.ProbeState (probed numbers are skipped, hits are learned)
+    exploration:		share of the probes which go to sparse prefixes
+    round_prefixes:		amount of prefixes probed per round (densest first)
+    chunk_size:			numbers per prefix and round
+    """
+    def __init__(
+        self,
+        known_counts,
+        pattern = "K",
+        state = None,
+        exploration = 0.1,
+        round_prefixes = 10,
+        chunk_size = 10,
+        seed = None
+    ):
+        self.known_counts = np.asarray(known_counts, dtype = np.float64)
+        self.pattern = pattern
+        self.state = state
+        self.exploration = exploration
+        self.round_prefixes = round_prefixes
+        self.chunk_size = chunk_size
+        self.random = random.Random(seed)
+
+        self.amt_exploit = 0		# numbers yielded from the densest prefixes
+        self.amt_explore = 0		# numbers yielded from sparse prefixes
+
+    def state_counts(self):
+        '''probed numbers and hits per prefix (from the state)'''
+        if self.state is None:
+            return np.zeros(amt_prefixes), np.zeros(amt_prefixes)
+
+        with self.state.lock:
+            bitmaps = self.state.bitmaps.get(self.pattern)
+            if bitmaps is None:
+                return np.zeros(amt_prefixes), np.zeros(amt_prefixes)
+
+            probed = np.frombuffer(bytes(bitmaps["probed"]), dtype = np.uint8)
+            exists = np.frombuffer(bytes(bitmaps["exists"]), dtype = np.uint8)
+
+        # bit i of the bitmap -> index i = prefix * 100 + suffix
+        probed = np.unpackbits(probed, bitorder = "little").reshape(amt_prefixes, numbers_per_prefix).sum(axis = 1)
+        exists = np.unpackbits(exists, bitorder = "little").reshape(amt_prefixes, numbers_per_prefix).sum(axis = 1)
+
+        return probed, exists
+
+    def densities(self):
+        '''estimated hit density of every prefix'''
+        probed, exists = self.state_counts()
+        base = (exists.sum() + 1) / (probed.sum() + 2)
+
+        return (self.known_counts + exists + 2 * base) / (probed + 2)
+
+    def course_number(self, prefix, suffix):
+        return str(prefix).zfill(3) + self.pattern + str(suffix).zfill(2)
+
+    def plan(self, start = 0, end = 1000000):
+        """Generator of the course numbers to probe, highest density first.
+
+        Only numbers of range(start, end) (see probe.course_number_candidates(...))
+        which have not been probed yet are yielded, each at most once.
+        """
+        # next suffix per prefix, restricted to range(start, end): number = prefix * 1000 + suffix
+        prefixes = np.arange(amt_prefixes)
+        cursors = np.clip(start - prefixes * 1000, 0, numbers_per_prefix)
+        limits = np.clip(end - prefixes * 1000, 0, numbers_per_prefix)
+
+        explore_credit = 0.0
+
+        def next_number(prefix):
+            '''next number of a prefix which has not been probed yet (None if exhausted)'''
+            while cursors[prefix] < limits[prefix]:
+                number = self.course_number(prefix, int(cursors[prefix]))
+                cursors[prefix] += 1
+
+                if self.state is None or not self.state.is_probed(number):
+                    return number
+
+            return None
+
+        while True:
+            available = cursors < limits
+            if not available.any():
+                return
+
+            densities = np.where(available, self.densities(), -1.0)
+            ranking = np.argsort(-densities, kind = "stable")
+            top_prefixes = ranking[:min(self.round_prefixes, int(available.sum()))]
+
+            # sparse prefixes: below the median density of the available prefixes
+            median_density = np.median(densities[available])
+            sparse_prefixes = np.flatnonzero(available & (densities <= median_density))
+            sparse_prefixes = sparse_prefixes[~np.isin(sparse_prefixes, top_prefixes)]
+
+            for prefix in top_prefixes:
+                for x in range(self.chunk_size):
+                    number = next_number(int(prefix))
+                    if number is None:
+                        break
+
+                    self.amt_exploit += 1
+                    yield number
+
+                    # exploration budget: one sparse probe per 1 / exploration dense probes
+                    explore_credit += self.exploration / max(1.0 - self.exploration, 1e-9)
+                    while explore_credit >= 1.0 and len(sparse_prefixes) > 0:
+                        explore_credit -= 1.0
+                        explore_number = next_number(int(self.random.choice(sparse_prefixes)))
+
+                        if explore_number is not None:
+                            self.amt_explore += 1
+                            yield explore_number
+
+    def state_summary(self):
+        '''top prefixes and the amount of planned numbers (e.g., for logging)'''
+        densities = self.densities()
+        top_prefixes = np.argsort(-densities, kind = "stable")[:5]
+
+        return {
+            "top_prefixes": {str(prefix).zfill(3): round(float(densities[prefix]), 3) for prefix in top_prefixes},
+            "exploit": self.amt_exploit,
+            "explore": self.amt_explore,
+        }
@@ -0,0 +1,229 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+"""
+Compact, persistent state of the probed course numbers (see bruteforce.py).
+
+Course numbers consist of a three digit prefix, a letter (pattern) and a
+two digit suffix, e.g., 511K79. For every letter, the state keeps three
+bitmaps over the 100000 numbers of this pattern (index = prefix * 100 + suffix):
+
+probed		the number has been probed with a final verdict
+exists		the course exists
+invalid		the course does not exist
+
+i.e., 3 * 12.5 kB per letter instead of text logs with one line per number.
+"Already probed?" is a single bit test, the state is written to disk as a
+numpy .npz file (checkpoint, atomic via os.replace) and loaded again on
+restart. The states of several workers (shards) are merged with a bitwise
+OR.
+
+usage:
+python3 probestate.py merge <target.npz> <state.npz> [<state.npz> ...]
+python3 probestate.py import <target.npz> <probe_results.jsonl> [...]
+python3 probestate.py import-logs <target.npz> <courses_to_process.txt> <courses_invalid.txt>
+python3 probestate.py stats <state.npz>
+"""
+
+numbers_per_pattern = 100000
+bitmap_bytes = numbers_per_pattern // 8
+bitmap_kinds = ("probed", "exists", "invalid")
+
+
+def course_index(course_number):
+    '''pattern (letter) and index in its bitmaps of a course number, e.g., 511K79 -> ("K", 51179)'''
+    return course_number[3], int(course_number[:3]) * 100 + int(course_number[4:6])
+
+
+def course_number(pattern, index):
+    '''inverse of course_index(...)'''
+    return str(index // 100).zfill(3) + pattern + str(index % 100).zfill(2)
+
+
+class ProbeState:
+    """Bitmaps (probed, exists, invalid) per pattern, thread-safe.
+
+    path:					file of the state (.npz), loaded if it exists
+    checkpoint_interval:	seconds between two checkpoints (see checkpoint_if_due())
+    """
+    def __init__(self, path = "", checkpoint_interval = 60):
+        self.path = path
+        self.checkpoint_interval = checkpoint_interval
+        self.bitmaps = {}			# {pattern: {kind: bytearray}}
+        self.lock = threading.Lock()
+        self.last_checkpoint = time.time()
+        self.amt_changes = 0		# changes since the last checkpoint
+
+        if path != "" and os.path.isfile(path):
+            self.merge_file(path)
+            self.amt_changes = 0
+
+    def pattern_bitmaps(self, pattern):
+        '''bitmaps of a pattern (created if missing, call with self.lock held)'''
+        if pattern not in self.bitmaps:
+            self.bitmaps[pattern] = {kind: bytearray(bitmap_bytes) for kind in bitmap_kinds}
+
+        return self.bitmaps[pattern]
+
+    def test(self, course_number, kind = "probed"):
+        pattern, index = course_index(course_number)
+
+        with self.lock:
+            bitmaps = self.bitmaps.get(pattern)
+            if bitmaps is None:
+                return False
+
+            return bool(bitmaps[kind][index >> 3] & (1 << (index & 7)))
+
+    def is_probed(self, course_number):
+        return self.test(course_number, "probed")
+
+    def record(self, course_number, exists):
+        '''record the final verdict of a probe (exists or invalid)'''
+        pattern, index = course_index(course_number)
+
+        with self.lock:
+            bitmaps = self.pattern_bitmaps(pattern)
+            bit = 1 << (index & 7)
+
+            bitmaps["probed"][index >> 3] |= bit
+            bitmaps["exists" if exists else "invalid"][index >> 3] |= bit
+            self.amt_changes += 1
+
+    def merge(self, bitmaps):
+        '''merge bitmaps ({pattern: {kind: bytes}}) of another state into this one (bitwise OR)'''
+        with self.lock:
+            for pattern, other_bitmaps in bitmaps.items():
+                own_bitmaps = self.pattern_bitmaps(pattern)
+
+                for kind in bitmap_kinds:
+                    merged = np.bitwise_or(np.frombuffer(own_bitmaps[kind], dtype = np.uint8),
+                        np.frombuffer(other_bitmaps[kind], dtype = np.uint8))
+                    own_bitmaps[kind] = bytearray(merged.tobytes())
+
+            self.amt_changes += 1
+
+    def merge_file(self, path):
+        '''merge the state stored in path (.npz) into this one'''
+        bitmaps = {}
+
+        with np.load(path) as data:
+            for key in data.files:
+                pattern, kind = key.split("_", 1)
+                bitmaps.setdefault(pattern, {})[kind] = data[key].tobytes()
+
+        self.merge(bitmaps)
+
+    def save(self, path = ""):
+        '''write the state to path (default: self.path), atomic'''
+        path = path if path != "" else self.path
+
+        with self.lock:
+            arrays = {pattern + "_" + kind: np.frombuffer(bitmap, dtype = np.uint8).copy()
+                for pattern, bitmaps in self.bitmaps.items() for kind, bitmap in bitmaps.items()}
+            self.amt_changes = 0
+            self.last_checkpoint = time.time()
+
+        # np.savez appends .npz to names without this ending
+        temp_path = path + ".tmp.npz"
+        np.savez_compressed(temp_path, **arrays)
+        os.replace(temp_path, path)
+
+    def checkpoint_if_due(self):
+        '''save the state if there are changes and the last checkpoint is checkpoint_interval seconds ago'''
+        if self.amt_changes > 0 and time.time() - self.last_checkpoint > self.checkpoint_interval:
+            self.save()
+
+    def numbers(self, kind = "exists"):
+        '''all course numbers with the bit kind set (sorted by pattern and index)'''
+        with self.lock:
+            bitmaps = {pattern: bytes(bitmaps[kind]) for pattern, bitmaps in self.bitmaps.items()}
+
+        for pattern in sorted(bitmaps):
+            bits = np.unpackbits(np.frombuffer(bitmaps[pattern], dtype = np.uint8), bitorder = "little")
+            for index in np.flatnonzero(bits):
+                yield course_number(pattern, int(index))
+
+    def stats(self):
+        '''amount of set bits per pattern and kind'''
+        with self.lock:
+            return {pattern: {kind: int(np.unpackbits(np.frombuffer(bitmap, dtype = np.uint8)).sum())
+                for kind, bitmap in bitmaps.items()} for pattern, bitmaps in sorted(self.bitmaps.items())}
+
+
+def import_probe_results(state, results_path):
+    '''record the final verdicts of a probe results file (probe.ProbeResults) in state'''
+    with open(results_path, encoding = "utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+
+            if record["verdict"] == "exists" or record["verdict"] == "missing":
+                state.record(record["course"], record["verdict"] == "exists")
+
+
+def import_text_logs(state, to_process_path, invalid_path):
+    '''record the courses of the text logs of bruteforce.py (one URL per line) in state'''
+    for path, exists in ((to_process_path, True), (invalid_path, False)):
+        with open(path, encoding = "utf-8") as f:
+            for line in f:
+                course_number = line.split("courseNr=")[-1].split("|")[0].strip()
+
+                if len(course_number) == 6 and course_number[:3].isdigit() and course_number[4:].isdigit():
+                    state.record(course_number, exists)
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "merge/import/inspect probe states (see bruteforce.py)")
+    subparsers = parser.add_subparsers(dest = "command", required = True)
+
+    parser_merge = subparsers.add_parser("merge", help = "merge the states of several workers")
+    parser_merge.add_argument("target")
+    parser_merge.add_argument("states", nargs = "+")
+
+    parser_import = subparsers.add_parser("import", help = "import probe results (JSON lines)")
+    parser_import.add_argument("target")
+    parser_import.add_argument("results", nargs = "+")
+
+    parser_import_logs = subparsers.add_parser("import-logs", help = "import the text logs of bruteforce.py")
+    parser_import_logs.add_argument("target")
+    parser_import_logs.add_argument("courses_to_process")
+    parser_import_logs.add_argument("courses_invalid")
+
+    parser_stats = subparsers.add_parser("stats", help = "print the amount of probed/existing/invalid numbers")
+    parser_stats.add_argument("state")
+
+    args = parser.parse_args()
+
+    if args.command == "stats":
+        print(json.dumps(ProbeState(args.state).stats(), indent = 2))
+        return
+
+    state = ProbeState(args.target)
+
+    if args.command == "merge":
+        for path in args.states:
+            state.merge_file(path)
+    elif args.command == "import-logs":
+        import_text_logs(state, args.courses_to_process, args.courses_invalid)
+    else:
+        for path in args.results:
+            import_probe_results(state, path)
+
+    state.save()
+    print(json.dumps(state.stats(), indent = 2))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
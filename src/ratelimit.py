@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+"""
+Rate limiting of requests to TISS (politeness).
+
+Instead of sleeping a fixed crawl delay after every page, requests are
+drawn from a token bucket which is shared between all fetching threads.
+This way several courses can be crawled at once while the total amount
+of requests per second to a host stays the same.
+"""
+
+class TokenBucket:
+    """Thread-safe token bucket.
+
+    The bucket is refilled with 'rate' tokens per second up to a maximum
+    of 'capacity' tokens. Each request takes one token. If no token is
+    available, the token is reserved (the bucket goes negative) and the
+    caller waits until it has been refilled, i.e., waiting callers are
+    served in the order they arrived.
+    """
+    def __init__(self, rate, capacity = 1):
+        self.rate = rate							# tokens (requests) per second
+        self.capacity = capacity				# maximum burst size
+        self.tokens = capacity					# currently available tokens
+        self.last_refill = time.monotonic()	# last time the bucket has been refilled
+        self.lock = threading.Lock()
+
+    def set_rate(self, rate):
+        '''change the refill rate (tokens per second)'''
+        with self.lock:
+            self.refill()
+            self.rate = rate
+
+    def refill(self):
+        '''add the tokens accumulated since the last refill (call with self.lock held)'''
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def reserve(self, tokens = 1):
+        """Take tokens from the bucket and return the time to wait (in seconds).
+
+        The tokens are taken immediately (reserved), the caller has to
+        wait the returned amount of time before performing the request.
+        """
+        with self.lock:
+            self.refill()
+            self.tokens -= tokens
+
+            if self.tokens >= 0:
+                return 0.0
+
+            return -self.tokens / self.rate
+
+    def acquire(self, tokens = 1):
+        '''block until the tokens are available'''
+        wait_time = self.reserve(tokens)
+
+        if wait_time > 0:
+            time.sleep(wait_time)
+
+        return wait_time
+
+
+class HostRateLimiter:
+    """One token bucket per host.
+
+    Requests to different hosts (e.g., tiss.tuwien.ac.at and the login
+    server idp.zid.tuwien.ac.at) do not count against each other.
+    """
+    def __init__(self, requests_per_second, burst = 1):
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def bucket(self, url):
+        '''returns the token bucket of the host of the given URL'''
+        host = urlsplit(url).hostname or ""
+
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.requests_per_second, self.burst)
+
+            return self.buckets[host]
+
+    def set_rate(self, requests_per_second):
+        '''change the rate of all hosts'''
+        with self.lock:
+            self.requests_per_second = requests_per_second
+            buckets = list(self.buckets.values())
+
+        for bucket in buckets:
+            bucket.set_rate(requests_per_second)
+
+    def acquire(self, url):
+        '''block until a request to the host of the URL is allowed'''
+        return self.bucket(url).acquire()
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+"""
+Wait for concrete page conditions instead of sleeping a fixed time.
+
+Each function returns as soon as the page is usable (True) or when the
+timeout is reached (False). The timeout is the only upper bound, i.e.,
+nothing in here sleeps longer than necessary.
+
+Conditions:
+1) content ready: the document is loaded and the div contentInner exists
+2) page settled: either the page or an error page has been loaded
+3) language: the language marker of the page (language_en/language_de) flipped
+"""
+
+# interval between two checks of a condition (in seconds)
+poll_interval = 0.1
+
+# True if the document is loaded and contains the div contentInner (see crawler.verify_page_crawl(...))
+js_content_ready = """
+return document.readyState === 'complete' &&
+    document.getElementById('contentInner') !== null;
+"""
+
+# True if the document is loaded and it is either a regular page (contentInner) or
+# an error page (e.g., title "Error page" for pages which could not be found)
+js_page_settled = """
+return document.readyState === 'complete' &&
+    (document.getElementById('contentInner') !== null || /error|fehler/i.test(document.title));
+"""
+
+# the same needles as crawler.get_language(...): the link to switch to english is
+# present -> the set language is german (and vice versa)
+js_language = """
+if (document.getElementById('language_en') !== null ||
+    document.querySelector('a[href="/?locale=en"]') !== null) { return 'de'; }
+if (document.getElementById('language_de') !== null ||
+    document.querySelector('a[href="/?locale=de"]') !== null) { return 'en'; }
+return '';
+"""
+
+def wait_until(driver, condition, timeout):
+    """Wait until condition(driver) returns a truthy value.
+
+    Exceptions of the webdriver (e.g., a JS error while the page is being
+    replaced) count as 'not yet'. Returns the last value of condition.
+    """
+    def check(driver):
+        try:
+            return condition(driver)
+        except WebDriverException:
+            return False
+
+    try:
+        return WebDriverWait(driver, timeout, poll_frequency = poll_interval).until(check)
+    except WebDriverException:
+        return False
+
+
+def content_ready(driver):
+    return driver.execute_script(js_content_ready)
+
+
+def wait_for_content(driver, timeout):
+    '''wait until the page is loaded and the div contentInner exists'''
+    return wait_until(driver, content_ready, timeout)
+
+
+def wait_for_page(driver, timeout):
+    '''wait until either the page or an error page has been loaded'''
+    return wait_until(driver, lambda driver: driver.execute_script(js_page_settled), timeout)
+
+
+def wait_for_language(driver, language, timeout):
+    '''wait until the page is displayed in the given language (de/en)'''
+    return wait_until(driver,
+        lambda driver: driver.execute_script(js_language) == language and content_ready(driver),
+        timeout
+    )
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import json
+import os
+import sys
+import time
+
+try:
+    from config import *
+except ModuleNotFoundError:
+    from src.config import *
+
+try:
+    import courseparser
+except ModuleNotFoundError:
+    from src import courseparser
+
+try:
+    import pylogs
+except ModuleNotFoundError:
+    from src import pylogs
+
+try:
+    import sqlhandler
+except ModuleNotFoundError:
+    from src import sqlhandler
+
+"""
+Offline replay: parse archived page sources again (no webdriver, no network).
+
+During crawling, every course page is archived by crawler.extract_course_info(...)
+in the folder of its academic program:
+
+logs
+├── academic_program_name - studycode	(e.g., 'Technische Physik - 033261')
+│   ├── course_number|lang|semester|time|course title.txt
+│   .
+└── study_prgms
+    └── academic_program_name
+        └── academic_program_name|sub program|semester.txt	(curriculum pages)
+
+Each course file consists of a header line (course_number|lang|semester|time|title),
+two empty lines and the page source after the course number. These files are
+passed through the same parser as during crawling (see courseparser.py), i.e.,
+after changing the parser the data can be extracted again within minutes instead
+of crawling TISS again for days. The files are processed in parallel (one
+process per core).
+
+For every (course, semester, language) only the latest archived page is used.
+The output is the same as the one of a crawl: the rows of return_info_dict
+(one JSON object per line) and the INSERT statements (see tiss_crawler.py,
+writeInsertToFile = True).
+
+usage:
+python3 replay.py [-t table] [-w workers] [--curricula] [program folder ...]
+"""
+
+# separator between the header line and the page source (see crawler.extract_course_info(...))
+header_separator = "\n\n\n"
+
+
+def read_archive(file_path):
+    """Read an archived course page.
+
+    Returns the header (dict) and the page source after the course number
+    (None for files which are no archived course pages).
+    """
+    with open(file_path, encoding = "utf-8", errors = "replace") as f:
+        content = f.read()
+
+    header_line, separator, course_raw_info = content.partition(header_separator)
+    header_split = header_line.split("|", 4)
+
+    if separator == "" or len(header_split) != 5:
+        return None, None
+
+    header = {
+        "course_number_URL": header_split[0],
+        "language": header_split[1],
+        "semester": header_split[2],
+        "time": header_split[3],
+        "course_title": header_split[4],
+    }
+
+    return header, course_raw_info
+
+
+def latest_archives(program_folder):
+    """Group the archived pages of a program folder by course.
+
+    Returns a dict with indices being the course numbers (as in the URL) and
+    the data a dict {semester + language: file path} of the latest archived
+    page for each semester and language.
+    """
+    courses = {}
+    archive_times = {}
+
+    for file_name in sorted(os.listdir(program_folder)):
+        file_path = os.path.join(program_folder, file_name)
+
+        if not file_name.endswith(".txt") or not os.path.isfile(file_path):
+            continue
+
+        # file name: course_number|lang|semester|time|title.txt (the title may be shortened)
+        name_split = file_name.split("|", 4)
+        if len(name_split) < 4:
+            continue
+
+        course_number_URL, language, semester, archive_time = name_split[:4]
+        index = semester + language
+
+        # time format %Y-%m-%d_%H:%M:%S -> later archives compare greater
+        if archive_time >= archive_times.get((course_number_URL, index), ""):
+            archive_times[(course_number_URL, index)] = archive_time
+            courses.setdefault(course_number_URL, {})[index] = file_path
+
+    return courses
+
+
+def replay_course(job):
+    """Parse all archived pages (semesters, languages) of one course.
+
+    job is a tuple (academic_program_name, course_number_URL, {index: file path}).
+    Returns the course number, return_info_dict (as returned by
+    crawler.extract_course_info(...)) and the unknown fields.
+    """
+    academic_program_name, course_number_URL, archive_files = job
+
+    return_info_dict = {}
+    unknown_fields = []
+
+    for index, file_path in archive_files.items():
+        header, course_raw_info = read_archive(file_path)
+
+        if header is None:
+            continue
+
+        # the archive only contains the page after the course number (104.590 -> 104590)
+        course_number = course_number_URL[:3] + "." + course_number_URL[3:]
+
+        extract_dict = {}
+        extract_dict["page_fetch_lang"] = header["language"]
+        extract_dict["course number"] = course_number
+
+        try:
+            course_details, course_unknown_fields = courseparser.parse_course_details(
+                course_raw_info, header["language"], course_number, academic_program_name
+            )
+        except Exception as e:
+            unknown_fields.append("replay error|" + file_path + "|" + str(e))
+            continue
+
+        extract_dict.update(course_details)
+        unknown_fields += course_unknown_fields
+
+        return_info_dict[header["semester"] + header["language"]] = extract_dict
+
+    return course_number_URL, return_info_dict, list(dict.fromkeys(unknown_fields))
+
+
+def replay_curriculum(file_path):
+    '''parse an archived curriculum page (returns the program code and the courses per semester)'''
+    with open(file_path, encoding = "utf-8", errors = "replace") as f:
+        raw_page_source = f.read()
+
+    return courseparser.parse_curriculum_page(raw_page_source)
+
+
+def program_folders(logs_path):
+    '''all folders containing archived course pages (academic_program_name - studycode)'''
+    return [os.path.join(logs_path, folder) for folder in sorted(os.listdir(logs_path))
+        if " - " in folder and os.path.isdir(os.path.join(logs_path, folder))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "parse archived page sources again (no crawling)")
+    parser.add_argument("folders", nargs = "*",
+        help = "program folders (default: all program folders in the logging folder)")
+    parser.add_argument("-t", "--table", default = "",
+        help = "table name of the INSERT statements (default: academic program name)")
+    parser.add_argument("-w", "--workers", type = int, default = os.cpu_count(),
+        help = "amount of processes (default: amount of cores)")
+    parser.add_argument("-o", "--output", default = root_dir + logging_folder + "replay/",
+        help = "output folder")
+    parser.add_argument("--curricula", action = "store_true",
+        help = "also parse the archived curriculum pages (study_prgms)")
+    args = parser.parse_args()
+
+    logs_path = root_dir + logging_folder
+    folders = args.folders if args.folders else program_folders(logs_path)
+
+    os.makedirs(args.output, exist_ok = True)
+    time_now = pylogs.get_time()
+
+    f_runtime_log = pylogs.open_logfile(args.output + "replay_" + time_now)
+    f_insertionStatements = pylogs.open_logfile(args.output + "insertionStatements_" + time_now)
+    f_unknown_fields = pylogs.open_logfile(args.output + "unknown_fields_" + time_now)
+    f_rows = open(args.output + "rows_" + time_now + ".jsonl", "w", encoding = "utf-8")
+
+    # one job per course (all its semesters and languages)
+    jobs = []
+    for program_folder in folders:
+        academic_program_name = os.path.basename(os.path.normpath(program_folder)).split(" - ")[0]
+        for course_number_URL, archive_files in latest_archives(program_folder).items():
+            jobs.append((academic_program_name, course_number_URL, archive_files))
+
+    pylogs.write_to_logfile(f_runtime_log, 'program folders: ' + str(len(folders)) +
+        ' | courses: ' + str(len(jobs)) + ' | workers: ' + str(args.workers))
+
+    amt_rows = 0
+    start_time = time.time()
+
+    with ProcessPoolExecutor(max_workers = args.workers) as executor:
+        results = executor.map(replay_course, jobs, chunksize = 16)
+
+        # results are returned in the order of the jobs (deterministic output)
+        for job, (course_number_URL, return_info_dict, unknown_fields) in zip(jobs, results):
+            academic_program_name = job[0]
+            table_name = args.table if args.table != "" else academic_program_name
+
+            insertStatement, connectorAddStr = sqlhandler.course_insert_statement(table_name)
+
+            for index, chosen_semester_dict in return_info_dict.items():
+                f_rows.write(json.dumps(dict(chosen_semester_dict, program = academic_program_name),
+                    ensure_ascii = False) + "\n")
+
+                insertData = sqlhandler.course_insert_data(chosen_semester_dict)
+                pylogs.write_to_logfile(f_insertionStatements,
+                    insertStatement + " VALUES " + str(insertData) + ";\n", False, False)
+                amt_rows += 1
+
+            for list_element in unknown_fields:
+                pylogs.write_to_logfile(f_unknown_fields, list_element, False)
+
+        if args.curricula:
+            curricula_path = logs_path + study_prgms_folder
+            curriculum_files = [os.path.join(folder, file_name)
+                for folder, _, file_names in sorted(os.walk(curricula_path))
+                for file_name in sorted(file_names) if file_name.endswith(".txt")]
+
+            with open(args.output + "curricula_" + time_now + ".jsonl", "w", encoding = "utf-8") as f_curricula:
+                for file_path, (program_code, collected_courses) in zip(curriculum_files,
+                    executor.map(replay_curriculum, curriculum_files, chunksize = 4)
+                ):
+                    f_curricula.write(json.dumps({
+                        "file": os.path.relpath(file_path, curricula_path),
+                        "program_code": program_code,
+                        "courses": collected_courses,
+                    }, ensure_ascii = False) + "\n")
+
+            pylogs.write_to_logfile(f_runtime_log, 'curriculum pages: ' + str(len(curriculum_files)))
+
+    f_rows.close()
+
+    pylogs.write_to_logfile(f_runtime_log, 'rows: ' + str(amt_rows) +
+        ' | time: ' + str(round(time.time() - start_time, 2)) + 's')
+
+    pylogs.close_logfile(f_unknown_fields)
+    pylogs.close_logfile(f_insertionStatements)
+    pylogs.close_logfile(f_runtime_log)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
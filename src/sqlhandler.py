@@ -18,6 +18,120 @@ if my_file.is_file():
 else:
 	print("could not find sql config file -> check path!")
 
+def course_table_columns():
+	"""Column definitions (CREATE TABLE) of a table of extracted courses.
+
+	The columns match course_insert_statement(...).
+	"""
+	return " \
+		`page_fetch_lang` char(2) NOT NULL, \
+		`course number` char(7) NOT NULL, \
+		`course title` tinytext NOT NULL, \
+		`semester` char(5) NOT NULL, \
+		`type` char(2) NOT NULL, \
+		`sws` varchar(5) CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci NOT NULL, \
+		`ECTS` varchar(6) NOT NULL, \
+		`add_info` tinytext NOT NULL, \
+		`Merkmale` text CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci NOT NULL, \
+		`Weitere Informationen` text CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci NOT NULL, \
+		`Inhalt der Lehrveranstaltung` text CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci NOT NULL, \
+		`Methoden` text CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci NOT NULL, \
+		`Prüfungsmodus` text CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci NOT NULL, \
+		`Leistungsnachweis` text CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci NOT NULL, \
+		`LVA_Anmeldung` text CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci NOT NULL, \
+		`Literatur` text NOT NULL, \
+		`Vorkenntnisse` text NOT NULL, \
+		`Vorausgehende Lehrveranstaltungen` text NOT NULL, \
+		`Vortragende Personen` text NOT NULL, \
+		`Sprache` text NOT NULL, \
+		`Institut` text NOT NULL, \
+		`Gruppentermine` text NOT NULL, \
+		`Prüfungen` text NOT NULL, \
+		`Gruppen_Anmeldung` text CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci NOT NULL, \
+		`LVA Termine` text NOT NULL, \
+		`Curricula` text NOT NULL, \
+		`Ziele der Lehrveranstaltung` text NOT NULL, \
+		`Lernergebnisse` text NOT NULL \
+	"
+
+
+def course_insert_statement(table_name):
+	"""INSERT statement (columns) for the extracted information of a course.
+
+	Returns the statement and the additional string (placeholders) when
+	inserting directly into the sql DB. The data is composed by
+	course_insert_data(...) (in the same order as the columns).
+	"""
+	insertStatement = (
+		"INSERT INTO `" + table_name + "` (page_fetch_lang, \
+		`course number`, `course title`, semester, type, sws, ECTS, \
+		add_info, Merkmale, `Weitere Informationen`, \
+		`Inhalt der Lehrveranstaltung`, Methoden, Prüfungsmodus, \
+		Leistungsnachweis, LVA_Anmeldung, Literatur, Vorkenntnisse, \
+		`Vorausgehende Lehrveranstaltungen`, `Vortragende Personen`, \
+		Sprache, Institut, Gruppentermine, Prüfungen, Gruppen_Anmeldung, \
+		`LVA Termine`, Curricula, `Ziele der Lehrveranstaltung`, Lernergebnisse) "
+	)
+
+	# additional string when inserting directly into the sql DB
+	connectorAddStr = "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, \
+		%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+
+	return insertStatement, connectorAddStr
+
+
+def course_insert_data(chosen_semester_dict):
+	"""Values for course_insert_statement(...) of one course.
+
+	chosen_semester_dict is the dict of one semester (and language) as
+	returned by crawl.crawler.extract_course_info(...).
+	"""
+	try:
+		if chosen_semester_dict["Vortragende Personen"] != "":
+			joined_lecturers = "|".join(chosen_semester_dict["Vortragende Personen"])
+		else:
+			joined_lecturers = "None"
+	except KeyError:
+		 joined_lecturers = "None"
+
+	page_fetch_lang = str(chosen_semester_dict.get("page_fetch_lang"))
+	course_number = str(chosen_semester_dict.get("course number"))
+	course_title = str(chosen_semester_dict.get("course title"))
+	semester = str(chosen_semester_dict.get("semester"))
+	lecture_type = str(chosen_semester_dict.get("type"))
+	sws = str(chosen_semester_dict.get("sws"))
+	ects = str(chosen_semester_dict.get("ECTS"))
+	add_info = str(chosen_semester_dict.get("add_info"))
+	properties = str(chosen_semester_dict.get("Merkmale"))
+	additional_information = str(chosen_semester_dict.get("Weitere Informationen0"))
+	subject_of_course = str(chosen_semester_dict.get("Inhalt der Lehrveranstaltung"))
+	methods = str(chosen_semester_dict.get("Methoden"))
+	mode_of_examination = str(chosen_semester_dict.get("Prüfungsmodus"))
+	examination_modalities = str(chosen_semester_dict.get("Leistungsnachweis"))
+	course_registration = str(chosen_semester_dict.get("LVA-Anmeldung"))
+	literature = str(chosen_semester_dict.get("Literatur"))
+	previous_knowledge = str(chosen_semester_dict.get("Vorkenntnisse"))
+	preceding_courses = str(chosen_semester_dict.get("Vorausgehende Lehrveranstaltungen"))
+	lecturers = joined_lecturers
+	language = str(chosen_semester_dict.get("Sprache"))
+	institute = str(chosen_semester_dict.get("Institut"))
+	group_dates = str(chosen_semester_dict.get("Gruppentermine"))
+	exams = str(chosen_semester_dict.get("Prüfungen"))
+	group_registration = str(chosen_semester_dict.get("Gruppen-Anmeldung"))
+	course_dates = str(chosen_semester_dict.get("LVA Termine"))
+	curricula = str(chosen_semester_dict.get("Curricula"))
+	aim_of_the_course = str(chosen_semester_dict.get("Ziele der Lehrveranstaltung"))
+	learning_outcomes = str(chosen_semester_dict.get("Lernergebnisse"))
+
+	insertData = (page_fetch_lang, course_number, course_title, semester,
+		lecture_type, sws, ects, add_info, properties, additional_information,
+		subject_of_course, methods, mode_of_examination, examination_modalities,
+		course_registration, literature, previous_knowledge, preceding_courses,
+		lecturers, language, institute, group_dates, exams, group_registration,
+		course_dates, curricula, aim_of_the_course, learning_outcomes)
+
+	return insertData
+
 class SqlHandler:
 	"""This class handles access to the SQL server (connection, data manipulation, etc.).
 
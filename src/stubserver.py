@@ -0,0 +1,349 @@
+# -*- coding: utf-8 -*-
+#!/usr/bin/python3
+
+import argparse
+from http.cookies import SimpleCookie
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit, parse_qsl, urlencode
+
+try:
+    import pagecache
+except ModuleNotFoundError:
+    from src import pagecache
+
+try:
+    import replay
+except ModuleNotFoundError:
+    from src import replay
+
+"""
+Local stand-in server for TISS (no network needed).
+
+Serves recorded pages so that the crawler (both the webdriver and the HTTP
+backend), its retry logic and the parsers can be exercised and benchmarked
+locally. Set tiss_url in config.py to the address of this server, e.g.,
+tiss_url = 'http://localhost:8080'.
+
+Recorded pages are looked up (in this order) in
+1) a fixture folder: one file per page, the path of the file is the path of
+   the URL and the file name the (sorted) URL parameters courseNr, semester,
+   semesterCode and key, optionally followed by the language:
+   fixtures
+   ├── course
+   │   └── courseDetails.xhtml
+   │       ├── courseNr=104590&semester=2022W|de.html
+   │       └── courseNr=104590&semester=2022W.html	(used for both languages)
+   ├── curriculum
+   │   ├── studyCodes.xhtml
+   │   │   └── index.html	(page without parameters)
+   │   .
+   .
+2) the page cache of the crawler (see pagecache.py)
+3) the archived course pages of the crawler (see replay.py). These only
+   contain the content after the course number, i.e., a minimal page
+   (contentInner, language links, semester select) is generated around them.
+
+The language is set via the URL parameter locale (and kept in a cookie) the
+same way TISS does. Pages which are not found are answered with the TISS
+error page ('Error page', 404).
+
+Failure modes of TISS can be emulated:
+1) latency: every response is delayed by latency +- jitter seconds
+2) JS error page: a share of responses is the page "Something went seriously
+   wrong" (error_rate) or a '503 Service Unavailable' (http_error_rate)
+3) JS window handler: the first request to a page returns a page which sets
+   a cookie via JS and reloads the page with the parameters dswid and dsrid
+   (see httpfetch.HttpFetcher.resolve_js_redirect(...))
+
+usage:
+python3 stubserver.py [-p port] [-f fixtures] [-c page cache] [-a logs folder]
+    [--latency s] [--jitter s] [--error-rate r] [--http-error-rate r] [--js-redirect]
+"""
+
+# URL parameters which select a recorded page
+page_url_params = ["courseNr", "semester", "semesterCode", "key"]
+
+# host of the recorded pages (absolute links are rewritten to the stand-in server)
+recorded_host = "tiss.tuwien.ac.at"
+
+# the same error page as TISS returns when JS was not loaded properly (see crawler.fetch_page(...))
+js_error_page = """<html><head><title>TISS</title></head><body>
+<div id="contentInner"><h1>Something went seriously wrong Please try refreshing the page</h1></div>
+</body></html>"""
+
+not_found_page = """<html><head><title>Error page</title></head><body>
+<div id="contentInner"><h1>Error page</h1>
+<p>The requested resource could not be found</p>
+<p>Die angeforderte Ressource wurde nicht gefunden</p></div>
+</body></html>"""
+
+# JS window handler: set a cookie and reload the page with window id and request token
+js_redirect_page = """<html><head><title>TISS</title><script type="text/javascript">
+var dswid = Math.floor(Math.random() * 10000);
+var dsrid = Math.floor(Math.random() * 1000);
+document.cookie = 'dsrwid-' + dsrid + '=' + dswid + '; path=/';
+var url = window.location.href;
+window.location.replace(url + (url.indexOf('?') === -1 ? '?' : '&') + 'dswid=' + dswid + '&dsrid=' + dsrid);
+</script></head><body></body></html>"""
+
+# minimal page around an archived course page (content after the course number)
+archived_course_page = """<html><head><title>TISS - {course_number}</title></head><body>
+<div id="toolNav">{language_link}</div>
+<form id="semesterForm"><select name="semesterForm:j_id_25">{semester_options}</select></form>
+<div id="contentInner"><h1><span class="light">{course_number}</span>{course_raw_info}</div>
+</body></html>"""
+
+language_links = {
+    "de": '<a id="language_en" href="?{query}">English</a>',
+    "en": '<a id="language_de" href="?{query}">Deutsch</a>',
+}
+
+
+class RecordedPages:
+    """Lookup of recorded pages by URL path, parameters and language."""
+    def __init__(self, fixture_dir = "", cache_dir = "", archive_dir = ""):
+        self.fixture_dir = fixture_dir
+        self.page_cache = pagecache.ResponseCache(cache_dir) if cache_dir else None
+
+        # archived course pages: {(course number, semester, language): file path}
+        self.course_archives = {}
+        # archived semesters of a course: {course number: [semester, ...]} (latest first)
+        self.course_semesters = {}
+
+        if archive_dir:
+            for program_folder in replay.program_folders(archive_dir):
+                for course_number_URL, archive_files in replay.latest_archives(program_folder).items():
+                    for index, file_path in archive_files.items():
+                        semester, language = index[:-2], index[-2:]
+                        self.course_archives[(course_number_URL, semester, language)] = file_path
+
+                        self.course_semesters.setdefault(course_number_URL, set()).add(semester)
+
+            for course_number_URL, semesters in self.course_semesters.items():
+                self.course_semesters[course_number_URL] = sorted(semesters, reverse = True)
+
+    def fixture_names(self, params, language):
+        '''file names of a page, most specific first'''
+        query = "&".join(key + "=" + params[key] for key in sorted(params) if key in page_url_params)
+        name = query if query != "" else "index"
+
+        return [name + "|" + language + ".html", name + ".html"]
+
+    def from_fixtures(self, path, params, language):
+        if not self.fixture_dir:
+            return None
+
+        for file_name in self.fixture_names(params, language):
+            file_path = os.path.join(self.fixture_dir, path.strip("/"), file_name)
+            if os.path.isfile(file_path):
+                with open(file_path, encoding = "utf-8") as f:
+                    return f.read()
+
+        return None
+
+    def from_page_cache(self, path, params, language):
+        if self.page_cache is None:
+            return None
+
+        query = {key: value for key, value in params.items() if key in page_url_params}
+        entry = self.page_cache.get("https://" + recorded_host + path + "?" + urlencode(query), language)
+
+        return None if entry is None else entry["html"]
+
+    def from_archives(self, path, params, language):
+        if not path.endswith("/courseDetails.xhtml") or "courseNr" not in params:
+            return None
+
+        course_number_URL = params["courseNr"]
+        semesters = self.course_semesters.get(course_number_URL, [])
+        semester = params.get("semester", semesters[0] if semesters else "")
+        file_path = self.course_archives.get((course_number_URL, semester, language))
+
+        if file_path is None:
+            return None
+
+        header, course_raw_info = replay.read_archive(file_path)
+        if header is None:
+            return None
+
+        other_language = "en" if language == "de" else "de"
+        language_query = urlencode(dict(params, locale = other_language))
+
+        return archived_course_page.format(
+            course_number = course_number_URL[:3] + "." + course_number_URL[3:],
+            course_raw_info = course_raw_info,
+            language_link = language_links[language].format(query = language_query),
+            semester_options = "".join('<option value="' + option + '"' +
+                (' selected="selected"' if option == semester else '') + '>' + option + '</option>'
+                for option in semesters),
+        )
+
+    def get(self, path, params, language):
+        '''returns the recorded page or None'''
+        for lookup in (self.from_fixtures, self.from_page_cache, self.from_archives):
+            html = lookup(path, params, language)
+            if html is not None:
+                return html
+
+        return None
+
+
+class StubServer(ThreadingHTTPServer):
+    """HTTP server answering with recorded pages (see RecordedPages)."""
+    daemon_threads = True
+
+    def __init__(
+        self,
+        server_address,
+        recorded_pages,
+        latency = 0.0,
+        jitter = 0.0,
+        error_rate = 0.0,
+        http_error_rate = 0.0,
+        js_redirect = False
+    ):
+        super().__init__(server_address, StubRequestHandler)
+        self.recorded_pages = recorded_pages
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.http_error_rate = http_error_rate
+        self.js_redirect = js_redirect
+
+        self.base_url = "http://" + self.server_address[0] + ":" + str(self.server_address[1])
+        self.stats = {"requests": 0, "pages": 0, "not_found": 0, "js_errors": 0,
+            "http_errors": 0, "js_redirects": 0}
+        self.lock = threading.Lock()
+
+    def count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+
+class StubRequestHandler(BaseHTTPRequestHandler):
+    server_version = "TissStub/1.0"
+
+    def log_message(self, format, *args):
+        '''no logging of every single request'''
+        pass
+
+    def send_page(self, status, html, cookies = None):
+        body = html.encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (cookies or {}).items():
+            self.send_header("Set-Cookie", name + "=" + value + "; Path=/")
+        self.end_headers()
+
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def window_handler_passed(self, params, cookies):
+        '''True if the JS window handler has been passed (dswid/dsrid and the matching cookie)'''
+        if "dswid" not in params or "dsrid" not in params:
+            return False
+
+        cookie = cookies.get("dsrwid-" + params["dsrid"])
+
+        return cookie is not None and cookie.value == params["dswid"]
+
+    def do_GET(self):
+        server = self.server
+        server.count("requests")
+
+        split_url = urlsplit(self.path)
+        params = dict(parse_qsl(split_url.query, keep_blank_values = True))
+        cookies = SimpleCookie(self.headers.get("Cookie", ""))
+
+        delay = server.latency + random.uniform(-server.jitter, server.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        # language: parameter locale (stored in a cookie) > cookie > german
+        set_cookies = {}
+        if params.get("locale") in ("de", "en"):
+            language = params["locale"]
+            set_cookies["TISS_LANG"] = language
+        elif "TISS_LANG" in cookies:
+            language = cookies["TISS_LANG"].value
+        else:
+            language = "de"
+
+        # the start page only switches the language (links '/?locale=en')
+        if split_url.path in ("", "/"):
+            self.send_response(302)
+            self.send_header("Location", self.headers.get("Referer", "/curriculum/studyCodes.xhtml"))
+            for name, value in set_cookies.items():
+                self.send_header("Set-Cookie", name + "=" + value + "; Path=/")
+            self.end_headers()
+            return
+
+        if random.random() < server.http_error_rate:
+            server.count("http_errors")
+            self.send_page(503, "<html><body>Service Unavailable</body></html>")
+            return
+
+        if server.js_redirect and not self.window_handler_passed(params, cookies):
+            server.count("js_redirects")
+            self.send_page(200, js_redirect_page, set_cookies)
+            return
+
+        if random.random() < server.error_rate:
+            server.count("js_errors")
+            self.send_page(200, js_error_page, set_cookies)
+            return
+
+        html = server.recorded_pages.get(split_url.path, params, language)
+
+        if html is None:
+            server.count("not_found")
+            self.send_page(404, not_found_page, set_cookies)
+            return
+
+        server.count("pages")
+        self.send_page(200, html.replace("https://" + recorded_host, server.base_url), set_cookies)
+
+    do_HEAD = do_GET
+
+
+def main():
+    parser = argparse.ArgumentParser(description = "local stand-in server for TISS")
+    parser.add_argument("-p", "--port", type = int, default = 8080)
+    parser.add_argument("-b", "--bind", default = "127.0.0.1")
+    parser.add_argument("-f", "--fixtures", default = "", help = "fixture folder")
+    parser.add_argument("-c", "--cache", default = "", help = "page cache folder (see pagecache.py)")
+    parser.add_argument("-a", "--archives", default = "",
+        help = "logging folder with archived course pages (see replay.py)")
+    parser.add_argument("--latency", type = float, default = 0.0, help = "delay of each response (s)")
+    parser.add_argument("--jitter", type = float, default = 0.0, help = "random +- delay (s)")
+    parser.add_argument("--error-rate", type = float, default = 0.0,
+        help = "share of JS error pages ('Something went seriously wrong')")
+    parser.add_argument("--http-error-rate", type = float, default = 0.0,
+        help = "share of '503 Service Unavailable' responses")
+    parser.add_argument("--js-redirect", action = "store_true", help = "emulate the JS window handler")
+    args = parser.parse_args()
+
+    recorded_pages = RecordedPages(args.fixtures, args.cache, args.archives)
+    server = StubServer((args.bind, args.port), recorded_pages, args.latency, args.jitter,
+        args.error_rate, args.http_error_rate, args.js_redirect)
+
+    print("serving on " + server.base_url + " (archived courses: " +
+        str(len(recorded_pages.course_archives)) + ")")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(str(server.stats))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,8 +7,10 @@ import sys
 import time
 
 from config import *
+import asynccrawl
 import crawl
 import pylogs
+import ratelimit
 import sqlhandler
 
 """
@@ -87,6 +89,49 @@ insertIntoTableName = "crawl2023S"
 # this data is used to add data to the DB (no "initial crawl").
 fetchSingleSem = "2023S"
 
+# True -> public pages which do not need a browser (e.g., studyCodes.xhtml) are
+# fetched via plain HTTP first. The webdriver is only used as fallback, i.e., when
+# the HTTP fetch does not yield valid content.
+useHttpBackend = True
+
+# True -> pages fetched via fetch_content() (HTTP backend) are stored on disk and
+# reused when the crawler is restarted. Pages older than pageCacheTTL seconds are
+# revalidated (conditional GET).
+usePageCache = True
+pageCacheFolder = root_dir + logging_folder + "page_cache/"
+pageCacheTTL = 7 * 24 * 3600
+
+# True -> course materials are downloaded via direct requests (with the cookies of
+# the logged in webdriver) instead of the browser (see downloads.py). At most
+# downloadsPerHost files are downloaded at once, all downloads together are capped
+# at downloadBytesPerSecond (0 -> no cap). Each file gets a record in the progress file.
+useDownloadManager = True
+downloadsPerHost = 2
+downloadBytesPerSecond = 2 * 1024 * 1024
+downloadProgressFile = root_dir + logging_folder + "download_progress.jsonl"
+# broken off downloads are resumed (Range requests, up to downloadResumeAttempts times per
+# attempt), partial files (*.part) are kept for the next run. Downloads recorded in the
+# manifest of completed downloads are skipped (delete it to download everything again).
+downloadManifestFile = root_dir + logging_folder + "download_manifest.jsonl"
+downloadResumeAttempts = 3
+
+# True -> downloaded files are deduplicated: every file is hashed and replaced by a hard
+# link to its blob in blobStoreFolder (same file system as download_folder), the manifest
+# (blobs/manifest.jsonl) records course, semester, file name, hash and size of every file.
+# Downloads with the name and size of an already stored file are not transferred again.
+useBlobStore = True
+blobStoreFolder = download_folder + "blobs/"
+
+# browser downloads (useDownloadManager = False): a download which has not grown for
+# downloadStallTimeout seconds is started again (at most downloadStallRetries times)
+downloadStallTimeout = 60
+downloadStallRetries = 2
+
+# True -> the fetched course pages are parsed in parserPoolWorkers worker processes
+# (None -> amount of CPUs) instead of the crawling threads (see parsepool.py)
+useParserPool = True
+parserPoolWorkers = None
+
 def sql_insert_courses(return_info_dict, pylogs_filepointer, academic_program_name):
 	"""Insert data into a SQL database
 	"""
@@ -149,64 +194,8 @@ def sql_insert_courses(return_info_dict, pylogs_filepointer, academic_program_na
 				academic_program_name = insertIntoTableName
 
 			# perform the insertion into the DB
-			insertStatement = (
-				"INSERT INTO `" + academic_program_name + "` (page_fetch_lang, \
-				`course number`, `course title`, semester, type, sws, ECTS, \
-				add_info, Merkmale, `Weitere Informationen`, \
-				`Inhalt der Lehrveranstaltung`, Methoden, Prüfungsmodus, \
-				Leistungsnachweis, LVA_Anmeldung, Literatur, Vorkenntnisse, \
-				`Vorausgehende Lehrveranstaltungen`, `Vortragende Personen`, \
-				Sprache, Institut, Gruppentermine, Prüfungen, Gruppen_Anmeldung, \
-				`LVA Termine`, Curricula, `Ziele der Lehrveranstaltung`, Lernergebnisse) "
-			)
-
-			# additional string when inserting directly into the sql DB
-			connectorAddStr = "VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, \
-				%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
-
-			try:
-				if chosen_semester_dict["Vortragende Personen"] != "":
-					joined_lecturers = "|".join(chosen_semester_dict["Vortragende Personen"])
-				else:
-					joined_lecturers = "None"
-			except KeyError:
-				 joined_lecturers = "None"
-
-			page_fetch_lang = str(chosen_semester_dict.get("page_fetch_lang"))
-			course_number = str(chosen_semester_dict.get("course number"))
-			course_title = str(chosen_semester_dict.get("course title"))
-			semester = str(chosen_semester_dict.get("semester"))
-			lecture_type = str(chosen_semester_dict.get("type"))
-			sws = str(chosen_semester_dict.get("sws"))
-			ects = str(chosen_semester_dict.get("ECTS"))
-			add_info = str(chosen_semester_dict.get("add_info"))
-			properties = str(chosen_semester_dict.get("Merkmale"))
-			additional_information = str(chosen_semester_dict.get("Weitere Informationen0"))
-			subject_of_course = str(chosen_semester_dict.get("Inhalt der Lehrveranstaltung"))
-			methods = str(chosen_semester_dict.get("Methoden"))
-			mode_of_examination = str(chosen_semester_dict.get("Prüfungsmodus"))
-			examination_modalities = str(chosen_semester_dict.get("Leistungsnachweis"))
-			course_registration = str(chosen_semester_dict.get("LVA-Anmeldung"))
-			literature = str(chosen_semester_dict.get("Literatur"))
-			previous_knowledge = str(chosen_semester_dict.get("Vorkenntnisse"))
-			preceding_courses = str(chosen_semester_dict.get("Vorausgehende Lehrveranstaltungen"))
-			lecturers = joined_lecturers
-			language = str(chosen_semester_dict.get("Sprache"))
-			institute = str(chosen_semester_dict.get("Institut"))
-			group_dates = str(chosen_semester_dict.get("Gruppentermine"))
-			exams = str(chosen_semester_dict.get("Prüfungen"))
-			group_registration = str(chosen_semester_dict.get("Gruppen-Anmeldung"))
-			course_dates = str(chosen_semester_dict.get("LVA Termine"))
-			curricula = str(chosen_semester_dict.get("Curricula"))
-			aim_of_the_course = str(chosen_semester_dict.get("Ziele der Lehrveranstaltung"))
-			learning_outcomes = str(chosen_semester_dict.get("Lernergebnisse"))
-
-			insertData = (page_fetch_lang, course_number, course_title, semester,
-				lecture_type, sws, ects, add_info, properties, additional_information,
-				subject_of_course, methods, mode_of_examination, examination_modalities,
-				course_registration, literature, previous_knowledge, preceding_courses,
-				lecturers, language, institute, group_dates, exams, group_registration,
-				course_dates, curricula, aim_of_the_course, learning_outcomes)
+			insertStatement, connectorAddStr = sqlhandler.course_insert_statement(academic_program_name)
+			insertData = sqlhandler.course_insert_data(chosen_semester_dict)
 
 			# executing each SQL insertion statement sequentially takes a significant amount
 			# of time. Either do this or write the statements into a file (and process them
@@ -239,10 +228,9 @@ def process_courses(
 	which returns a dict containing the extracted data with the key
 	being the semester and language (2022en, 2022de, etc.). This data
 	is then inserted into a database for store.
-	"""
-	global total_downloaded_files
-	global total_page_crawls
 
+	If asyncCrawl is set, asyncMaxInFlight courses are processed at once.
+	"""
 	pylogs.write_to_logfile(f_runtime_log, 'processing courses: ' + str(len(acad_course_list)) +
 		'| academic program name: ' + academic_program_name + ' | academic program studycode: ' +
 		acad_prgm_studycode
@@ -251,36 +239,7 @@ def process_courses(
 	# create the SQL table
 	sqlhandlerObj = sqlhandler.SqlHandler()
 
-	create_info = " \
-		`page_fetch_lang` char(2) NOT NULL, \
-		`course number` char(7) NOT NULL, \
-		`course title` tinytext NOT NULL, \
-		`semester` char(5) NOT NULL, \
-		`type` char(2) NOT NULL, \
-		`sws` varchar(5) CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci NOT NULL, \
-		`ECTS` varchar(6) NOT NULL, \
-		`add_info` tinytext NOT NULL, \
-		`Merkmale` text CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci NOT NULL, \
-		`Weitere Informationen` text CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci NOT NULL, \
-		`Inhalt der Lehrveranstaltung` text CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci NOT NULL, \
-		`Methoden` text CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci NOT NULL, \
-		`Prüfungsmodus` text CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci NOT NULL, \
-		`Leistungsnachweis` text CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci NOT NULL, \
-		`LVA_Anmeldung` text CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci NOT NULL, \
-		`Literatur` text NOT NULL, \
-		`Vorkenntnisse` text NOT NULL, \
-		`Vorausgehende Lehrveranstaltungen` text NOT NULL, \
-		`Vortragende Personen` text NOT NULL, \
-		`Sprache` text NOT NULL, \
-		`Institut` text NOT NULL, \
-		`Gruppentermine` text NOT NULL, \
-		`Prüfungen` text NOT NULL, \
-		`Gruppen_Anmeldung` text CHARACTER SET utf8mb3 COLLATE utf8mb3_general_ci NOT NULL, \
-		`LVA Termine` text NOT NULL, \
-		`Curricula` text NOT NULL, \
-		`Ziele der Lehrveranstaltung` text NOT NULL, \
-		`Lernergebnisse` text NOT NULL \
-	"
+	create_info = sqlhandler.course_table_columns()
 
 	table_exists = sqlhandlerObj.create_table(dbDatabase, academic_program_name, create_info, 0)
 
@@ -343,86 +302,161 @@ def process_courses(
 		processed_courses_list.append(dict(append_dict))
 
 	# work the process queue
-	for process_course in acad_course_list[:]:
-		# check if the course is already in the DB, if not -> process this course.
-		# If it is found in the DB, do not process the course and just remove the
-		# entry from the list.
-		# TODO: if the (batch)insertion fails, data will be missing because insertion
-		#		  is skipped in this case!
-		temp_course_number = process_course[process_course.find('=') + 1:]
-		process_course_number = temp_course_number[:3] + "." + temp_course_number [3:]
+	if asyncCrawl == True or driverPoolSize > 1:
+		# process several courses at once (each with a webdriver of the pool).
+		# The results are handled in the order the courses finish.
+		def work(slot, process_course):
+			slot_instance, slot_driver = slot
+			return extract_course(
+				slot_instance,
+				slot_driver,
+				process_course,
+				processed_courses_list,
+				academic_program_name,
+				acad_prgm_studycode,
+				pylogs_filepointer,
+				f_failed_downloads
+			)
 
-		course_already_in_DB = False
-		found_in_table = ""
-
-		# skip DB check (see comment at variable 'fetchSingleSem' definition)
-		if fetchSingleSem == False:
-			"""
-			loop through all fetched courses and determine whether the current (to be processed)
-			course is in any table. This data does not need to be updated since after one passthrough
-			of an academic program, the list is read again and if the program is restarted the list
-			is re-read also.
-			"""
-			for _ in processed_courses_list:
-				for key in _.keys():
-					if process_course_number in _[key]:
-						found_in_table = key
-						course_already_in_DB = True
-						pylogs.write_to_logfile(f_runtime_log, "course: " +
-							process_course_number + " found in DB(" + str(found_in_table) + ") -> skip"
-						)
-						break
-
-			# TODO:	implement this check in crawl.py instead of making another
-			#			call to check_course_exists() here
-			#process_course_number = temp_course_number[:3] + "." + temp_course_number [3:]
-
-			check_url = "https://tiss.tuwien.ac.at/course/courseDetails.xhtml?courseNr=" + temp_course_number
-			course_exists = driver_instance.check_course_exists(driver, check_url)
-		# override the check if the course exists (only used for bruteforce data, which
-		# is not always consistent (reports courses for existing despite the course not existing
+		def on_result(process_course, extract_result, error):
+			if error is not None:
+				# keep the course in the queue (processed again in the next run)
+				pylogs.write_to_logfile(f_runtime_log, process_course + ' failed: ' + str(error))
+				return
+
+			finish_course(process_course, extract_result, acad_course_list,
+				academic_program_name, pylogs_filepointer)
+
+		if asyncCrawl == True:
+			async_crawler.run(acad_course_list[:], work, on_result)
 		else:
-			course_exists = True
-
-		if course_already_in_DB == False and course_exists:
-			# process the course
-			return_info_dict, \
-			ret_dwnlds, \
-			ret_crawls, \
-			unknown_fields = driver_instance.extract_course_info(
+			driver_pool.run(acad_course_list[:], work, on_result)
+	else:
+		for process_course in acad_course_list[:]:
+			extract_result = extract_course(
+				driver_instance,
 				driver,
 				process_course,
+				processed_courses_list,
 				academic_program_name,
 				acad_prgm_studycode,
 				pylogs_filepointer,
-				f_failed_downloads,
-				fetchSingleSem,
-				True
+				f_failed_downloads
 			)
 
-			# update amount of downloads and page crawls
-			total_downloaded_files += ret_dwnlds
-			total_page_crawls += ret_crawls
+			finish_course(process_course, extract_result, acad_course_list,
+				academic_program_name, pylogs_filepointer)
 
-			# write info to logfiles
-			pylogs.write_to_logfile(f_runtime_stats, "downloads: " + str(total_downloaded_files))
-			pylogs.write_to_logfile(f_runtime_stats, "pages processed:  " + str(total_page_crawls))
-			pylogs.write_to_logfile(f_runtime_log, 'amount of unkown fields: ' + str(len(unknown_fields)))
-			for list_element in unknown_fields:
-				pylogs.write_to_logfile(f_runtime_unknowns, list_element)
+def extract_course(
+	course_instance,
+	course_driver,
+	process_course,
+	processed_courses_list,
+	academic_program_name,
+	acad_prgm_studycode,
+	pylogs_filepointer,
+	f_failed_downloads
+):
+	"""Extract the information of a single course (with the given crawler instance).
 
-			# SQL insert the returned data
-			sql_insert_courses(return_info_dict, pylogs_filepointer, academic_program_name)
+	Returns the data of 'course_instance.extract_course_info()' or None if
+	the course is skipped (already in the DB or it does not exist).
+	"""
+	# check if the course is already in the DB, if not -> process this course.
+	# If it is found in the DB, do not process the course and just remove the
+	# entry from the list.
+	# TODO: if the (batch)insertion fails, data will be missing because insertion
+	#		  is skipped in this case!
+	temp_course_number = process_course[process_course.find('=') + 1:]
+	process_course_number = temp_course_number[:3] + "." + temp_course_number [3:]
+
+	course_already_in_DB = False
+	found_in_table = ""
+
+	# skip DB check (see comment at variable 'fetchSingleSem' definition)
+	if fetchSingleSem == False:
+		"""
+		loop through all fetched courses and determine whether the current (to be processed)
+		course is in any table. This data does not need to be updated since after one passthrough
+		of an academic program, the list is read again and if the program is restarted the list
+		is re-read also.
+		"""
+		for _ in processed_courses_list:
+			for key in _.keys():
+				if process_course_number in _[key]:
+					found_in_table = key
+					course_already_in_DB = True
+					pylogs.write_to_logfile(f_runtime_log, "course: " +
+						process_course_number + " found in DB(" + str(found_in_table) + ") -> skip"
+					)
+					break
 
-		# remove the processed entry
-		pylogs.write_to_logfile(f_runtime_log, process_course + ' processed -> remove entry')
-		acad_course_list.remove(process_course)
+		# TODO:	implement this check in crawl.py instead of making another
+		#			call to check_course_exists() here
+		#process_course_number = temp_course_number[:3] + "." + temp_course_number [3:]
 
-		# update the logfile
-		f = open(logging_folder + logging_queued_courses, "w")
-		for i in range(len(acad_course_list)):
-			f.write(acad_course_list[i] + "|" + academic_program_name + "\n")
-		f.close()
+		check_url = tiss_url + "/course/courseDetails.xhtml?courseNr=" + temp_course_number
+		course_exists = course_instance.check_course_exists(course_driver, check_url)
+	# override the check if the course exists (only used for bruteforce data, which
+	# is not always consistent (reports courses for existing despite the course not existing
+	else:
+		course_exists = True
+
+	if course_already_in_DB == False and course_exists:
+		# process the course
+		return course_instance.extract_course_info(
+			course_driver,
+			process_course,
+			academic_program_name,
+			acad_prgm_studycode,
+			pylogs_filepointer,
+			f_failed_downloads,
+			fetchSingleSem,
+			True
+		)
+
+	return None
+
+def finish_course(process_course, extract_result, acad_course_list, academic_program_name, pylogs_filepointer):
+	"""Store the extracted data of a course and remove it from the queue.
+
+	extract_result is the return value of extract_course(...) (None ->
+	the course has been skipped, nothing to store).
+	"""
+	global total_downloaded_files
+	global total_page_crawls
+
+	if extract_result is not None:
+		return_info_dict, \
+		ret_dwnlds, \
+		ret_crawls, \
+		unknown_fields = extract_result
+
+		# update amount of downloads and page crawls
+		total_downloaded_files += ret_dwnlds
+		total_page_crawls += ret_crawls
+
+		# write info to logfiles
+		pylogs.write_to_logfile(f_runtime_stats, "downloads: " + str(total_downloaded_files))
+		pylogs.write_to_logfile(f_runtime_stats, "pages processed:  " + str(total_page_crawls))
+		if driver_instance.delay_controller is not None:
+			pylogs.write_to_logfile(f_runtime_stats, "crawl delay: " + str(driver_instance.delay_controller.state()))
+		pylogs.write_to_logfile(f_runtime_log, 'amount of unkown fields: ' + str(len(unknown_fields)))
+		for list_element in unknown_fields:
+			pylogs.write_to_logfile(f_runtime_unknowns, list_element)
+
+		# SQL insert the returned data
+		sql_insert_courses(return_info_dict, pylogs_filepointer, academic_program_name)
+
+	# remove the processed entry
+	pylogs.write_to_logfile(f_runtime_log, process_course + ' processed -> remove entry')
+	acad_course_list.remove(process_course)
+
+	# update the logfile
+	f = open(logging_folder + logging_queued_courses, "w")
+	for i in range(len(acad_course_list)):
+		f.write(acad_course_list[i] + "|" + academic_program_name + "\n")
+	f.close()
 
 # global logfile
 f_runtime_log_global = pylogs.open_logfile(root_dir + logging_folder + "runtime_global_log_" + pylogs.get_time())
@@ -442,12 +476,86 @@ pylogs.write_to_logfile(f_runtime_log_global, "initiating driver")
 pylogs.write_to_logfile(f_runtime_log_global, "crawl_delay: " + str(crawl_delay))
 pylogs.write_to_logfile(f_runtime_log_global, "fetchSingleSem: " + str(fetchSingleSem))
 
+# concurrent crawling of courses:
+# driverPoolSize > 1 -> a pool of webdrivers works through the queued courses (each
+# idle webdriver takes the next course).
+# asyncCrawl = True -> the courses are processed using asyncio with at most
+# asyncMaxInFlight courses at once (the pool has asyncMaxInFlight webdrivers).
+# In both cases, all requests share one rate limiter which allows requestsPerSecond
+# requests per second to TISS (1/crawl_delay -> same politeness as the sequential
+# crawl, the waiting time is used to process other courses).
+driverPoolSize = 1
+asyncCrawl = False
+asyncMaxInFlight = 4
+requestsPerSecond = 1 / crawl_delay
+
+# adapt the crawl delay to the observed latency and errors of TISS (see crawldelay.py).
+# crawl_delay is the starting value, the delay stays within [minCrawlDelay, maxCrawlDelay].
+# With a rate limiter (concurrent crawling), its rate is adapted accordingly.
+adaptiveCrawlDelay = True
+minCrawlDelay = 2
+maxCrawlDelay = 480
+pylogs.write_to_logfile(f_runtime_log_global, "adaptiveCrawlDelay: " + str(adaptiveCrawlDelay))
+pylogs.write_to_logfile(f_runtime_log_global, "driverPoolSize: " + str(driverPoolSize))
+pylogs.write_to_logfile(f_runtime_log_global, "asyncCrawl: " + str(asyncCrawl))
+
 driver_instance = crawl.crawler(False, 800, 600, crawl_delay)
+
+# the parser workers are forked before any other thread is started
+pylogs.write_to_logfile(f_runtime_log_global, "useParserPool: " + str(useParserPool))
+if useParserPool == True:
+	driver_instance.enable_parser_pool(parserPoolWorkers)
+
 driver = driver_instance.init_driver()
 
+if asyncCrawl == True or driverPoolSize > 1:
+	pylogs.write_to_logfile(f_runtime_log_global, "requestsPerSecond: " + str(requestsPerSecond))
+	driver_instance.rate_limiter = ratelimit.HostRateLimiter(requestsPerSecond)
+
+if adaptiveCrawlDelay == True:
+	pylogs.write_to_logfile(f_runtime_log_global, "minCrawlDelay: " + str(minCrawlDelay) +
+		"; maxCrawlDelay: " + str(maxCrawlDelay))
+	driver_instance.enable_adaptive_delay(minCrawlDelay, maxCrawlDelay)
+
 # set the timeout for page loads (in units of seconds)
 driver.set_page_load_timeout(120)
 
+pylogs.write_to_logfile(f_runtime_log_global, "useHttpBackend: " + str(useHttpBackend))
+if useHttpBackend == True:
+	driver_instance.enable_http_backend()
+
+pylogs.write_to_logfile(f_runtime_log_global, "usePageCache: " + str(usePageCache))
+if usePageCache == True:
+	pylogs.write_to_logfile(f_runtime_log_global, "pageCacheFolder: " + pageCacheFolder)
+	driver_instance.enable_page_cache(pageCacheFolder, pageCacheTTL)
+
+pylogs.write_to_logfile(f_runtime_log_global, "useDownloadManager: " + str(useDownloadManager))
+if useDownloadManager == True:
+	pylogs.write_to_logfile(f_runtime_log_global, "downloadsPerHost: " + str(downloadsPerHost) +
+		"; downloadBytesPerSecond: " + str(downloadBytesPerSecond) +
+		"; downloadResumeAttempts: " + str(downloadResumeAttempts))
+	driver_instance.enable_download_manager(downloadsPerHost, downloadBytesPerSecond,
+		downloadProgressFile, downloadManifestFile, downloadResumeAttempts)
+
+pylogs.write_to_logfile(f_runtime_log_global, "downloadStallTimeout: " + str(downloadStallTimeout) +
+	"; downloadStallRetries: " + str(downloadStallRetries))
+driver_instance.download_stall_timeout = downloadStallTimeout
+driver_instance.download_stall_retries = downloadStallRetries
+
+pylogs.write_to_logfile(f_runtime_log_global, "useBlobStore: " + str(useBlobStore))
+if useBlobStore == True:
+	pylogs.write_to_logfile(f_runtime_log_global, "blobStoreFolder: " + blobStoreFolder)
+	driver_instance.enable_blob_store(blobStoreFolder)
+
+# the pooled webdrivers are set up like the main instance (rate limiter, adaptive delay,
+# page cache, HTTP backend, download manager, blob store)
+if asyncCrawl == True:
+	pylogs.write_to_logfile(f_runtime_log_global, "asyncMaxInFlight: " + str(asyncMaxInFlight))
+	driver_pool = driver_instance.init_driver_pool(asyncMaxInFlight)
+	async_crawler = asynccrawl.AsyncCrawler(driver_pool, asyncMaxInFlight)
+elif driverPoolSize > 1:
+	driver_pool = driver_instance.init_driver_pool(driverPoolSize)
+
 # log in to get more semesters in the academic program
 # which results in more courses found.
 driver_instance.tiss_login(driver)
@@ -475,7 +583,7 @@ else:
 	pylogs.write_to_logfile(f_runtime_log_global, 'file "' + logging_folder + logging_academic_programs + '" does not exist')
 
 	# fetch all available academic programs
-	academic_program_URL = "https://tiss.tuwien.ac.at/curriculum/studyCodes.xhtml"
+	academic_program_URL = tiss_url + "/curriculum/studyCodes.xhtml"
 	pylogs.write_to_logfile(f_runtime_log_global, 'fetching academic programs from ' + academic_program_URL + ':')
 
 	# fetch this page always in the same language (download folder names!)
@@ -632,5 +740,26 @@ for process_acad_prgm in acad_program_list[:]:
 	pylogs.close_logfile(f_runtime_unknowns)
 	pylogs.close_logfile(f_failed_downloads)
 
+if asyncCrawl == True:
+	async_crawler.close()
+
+if asyncCrawl == True or driverPoolSize > 1:
+	driver_pool.close()
+
+if usePageCache == True:
+	driver_instance.page_cache.close()
+
+if useDownloadManager == True:
+	driver_instance.download_manager.close()
+
+if useBlobStore == True:
+	pylogs.write_to_logfile(f_runtime_log_global, "deduplicated files: " +
+		str(driver_instance.blob_store.amt_deduplicated) + "; bytes saved: " +
+		str(driver_instance.blob_store.bytes_saved))
+	driver_instance.blob_store.close()
+
+if useParserPool == True:
+	driver_instance.parser_pool.close()
+
 driver_instance.close_driver(driver, f_runtime_log_global)
 pylogs.close_logfile(f_runtime_log_global)